@@ -6,10 +6,13 @@ from utils.state import (
     get_tender_data,
     set_evaluation_criteria,
     get_evaluation_criteria,
+    file_fingerprint,
+    is_new_upload,
+    remember_upload,
 )
-from utils.pdf_parser import extract_text_from_file
 from utils.ai_engine import extract_tender_data, generate_sample_tender_data
-from utils.ui_helper import setup_sidebar
+from utils.text_prep import strip_boilerplate
+from utils.ui_helper import setup_sidebar, read_document, show_prep_report
 
 st.set_page_config(page_title="Upload Tender - Airo Bid Evaluation", page_icon="📄", layout="wide")
 
@@ -49,38 +52,49 @@ with tab1:
         "Choose a PDF, DOCX, or TXT file",
         type=["pdf", "docx", "txt"],
         help="Upload your RFP or tender document",
+        key=f"tender_uploader_{st.session_state.tender_uploader_round}",
     )
 
     if uploaded_file is not None:
-        with st.spinner("Analyzing tender document..."):
-            try:
-                # Extract text
-                file_content = uploaded_file.read()
-                file_extension = uploaded_file.name.split(".")[-1].lower()
-                tender_text = extract_text_from_file(file_content, file_extension)
-
-                # Send to Claude for analysis
-                tender_data = extract_tender_data(tender_text)
-                set_tender_data(tender_data)
-
-                # Extract criteria
-                criteria = tender_data.get("evaluation_criteria", [])
-                set_evaluation_criteria(criteria)
-
-                st.success("✓ Tender parsed successfully!")
-
-                # Show summary
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Tender Title", tender_data.get("tender_title", "N/A")[:30] + "...")
-                with col2:
-                    st.metric("Organization", tender_data.get("issuing_organization", "N/A"))
-                with col3:
-                    st.metric("Criteria Count", len(criteria))
-
-            except Exception as e:
-                st.error(f"❌ Error processing tender: {str(e)}")
-                st.info("Please ensure the file is a valid PDF, DOCX, or TXT document.")
+        file_content = uploaded_file.getvalue()
+        fingerprint = file_fingerprint(uploaded_file.name, file_content)
+
+        # Only run extraction when a different document arrives, not on every rerun
+        if is_new_upload("tender", fingerprint):
+            with st.spinner("Analyzing tender document..."):
+                try:
+                    # Extract text, previewing pages as they are decoded
+                    pages = read_document(uploaded_file.name, file_content)
+
+                    # Drop headers, footers and boilerplate before prompting
+                    tender_text, prep_report = strip_boilerplate(pages)
+                    show_prep_report(uploaded_file.name, prep_report)
+
+                    # Send to Claude for analysis
+                    tender_data = extract_tender_data(tender_text)
+                    set_tender_data(tender_data)
+
+                    # Extract criteria
+                    criteria = tender_data.get("evaluation_criteria", [])
+                    set_evaluation_criteria(criteria)
+                    remember_upload("tender", fingerprint)
+
+                    st.success("✓ Tender parsed successfully!")
+
+                    # Show summary
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Tender Title", tender_data.get("tender_title", "N/A")[:30] + "...")
+                    with col2:
+                        st.metric("Organization", tender_data.get("issuing_organization", "N/A"))
+                    with col3:
+                        st.metric("Criteria Count", len(criteria))
+
+                except Exception as e:
+                    st.error(f"❌ Error processing tender: {str(e)}")
+                    st.info("Please ensure the file is a valid PDF, DOCX, or TXT document.")
+        else:
+            st.success(f"✓ {uploaded_file.name} already analyzed. Upload a different file to re-run extraction.")
 
 with tab2:
     st.markdown("#### Load Sample Tender")
@@ -91,6 +105,9 @@ with tab2:
             try:
                 tender_data = generate_sample_tender_data()
                 set_tender_data(tender_data)
+                remember_upload("tender", "sample")
+                # Clear the uploader, or its file would be re-extracted over the sample on the next rerun
+                st.session_state.tender_uploader_round += 1
 
                 criteria = tender_data.get("evaluation_criteria", [])
                 set_evaluation_criteria(criteria)
@@ -1,15 +1,29 @@
 import streamlit as st
 import json
+from datetime import datetime
 from utils.state import (
     init_session_state,
     get_tender_data,
     get_evaluation_criteria,
     get_supplier_evaluations,
     set_supplier_evaluations,
+    file_fingerprint,
+    get_cached_bid_evaluation,
+    cache_bid_evaluation,
+    get_batches_to_collect,
+    set_batch_to_collect,
 )
-from utils.pdf_parser import extract_text_from_file
-from utils.ai_engine import evaluate_supplier_bid, generate_sample_supplier_evaluations
-from utils.ui_helper import setup_sidebar
+from utils.ai_engine import (
+    evaluate_supplier_bids,
+    generate_sample_supplier_evaluations,
+    submit_evaluation_batch,
+    list_evaluation_batches,
+    check_evaluation_batch,
+    collect_evaluation_batch,
+)
+from utils.json_stream import set_path
+from utils.text_prep import strip_boilerplate
+from utils.ui_helper import setup_sidebar, read_document, show_prep_report
 
 st.set_page_config(page_title="Upload Bids - Airo Bid Evaluation", page_icon="📋", layout="wide")
 
@@ -30,6 +44,58 @@ elif selected_page == "4_Reports":
 elif selected_page == "5_Chat":
     st.switch_page("pages/5_Chat.py")
 
+
+def render_live_card(slot, file_name, partial, state):
+    """Show the fields of an evaluation received so far."""
+
+    def score(value):
+        try:
+            return f"{float(value):.0f}"
+        except (TypeError, ValueError):
+            return "…"
+
+    parts = [f"**{partial.get('supplier_name') or file_name}**"]
+    if "overall_score" in partial:
+        parts.append(f"Overall {score(partial['overall_score'])}/100")
+    category_scores = partial.get("category_scores") or {}
+    for category in ("technical", "commercial", "compliance"):
+        if isinstance(category_scores.get(category), dict):
+            parts.append(f"{category.title()} {score(category_scores[category].get('score'))}")
+    criteria_scored = [item for item in partial.get("criterion_scores") or [] if item]
+    if criteria_scored:
+        parts.append(f"{len(criteria_scored)} criteria scored")
+    requirements_checked = [item for item in partial.get("mandatory_requirements_status") or [] if item]
+    if requirements_checked:
+        parts.append(f"{len(requirements_checked)} requirements checked")
+    slot.markdown(" · ".join(parts) + f" — _{state}_")
+
+
+def collect_batch_results(batch_id):
+    """Load the evaluations of an ended batch, replacing earlier evaluations of the same files."""
+    collected = 0
+    batch_errors = []
+    evaluations = list(get_supplier_evaluations())
+    for file_name, fingerprint, result in collect_evaluation_batch(batch_id):
+        if isinstance(result, Exception):
+            batch_errors.append(f"{file_name}: {str(result)}")
+            continue
+        # A bid already evaluated (e.g. collected before) is replaced, not duplicated
+        previous = get_cached_bid_evaluation(fingerprint)
+        position = next((i for i, e in enumerate(evaluations) if e is previous), None)
+        if position is None:
+            evaluations.append(result)
+        else:
+            evaluations[position] = result
+        cache_bid_evaluation(fingerprint, result)
+        collected += 1
+    set_supplier_evaluations(evaluations)
+    st.success(f"✓ Loaded {collected} evaluation(s) from batch {batch_id}")
+    if batch_errors:
+        with st.expander("⚠️ Errors in batch"):
+            for error in batch_errors:
+                st.write(f"• {error}")
+
+
 # Check if tender is loaded (but allow access anyway)
 if not get_tender_data():
     st.info("ℹ️ Tip: Upload a tender document first on Page 1 for best results.")
@@ -50,15 +116,26 @@ with tab1:
     st.markdown("#### Upload Supplier Bid Responses")
 
     uploaded_files = st.file_uploader(
-        "Choose PDF, DOCX, or TXT files (max 10 files)",
+        "Choose PDF, DOCX, or TXT files (max 10 files, 100 in batch mode)",
         type=["pdf", "docx", "txt"],
         accept_multiple_files=True,
         help="Each file should be one supplier's bid response",
     )
 
     if uploaded_files:
-        if len(uploaded_files) > 10:
-            st.error("❌ Maximum 10 files allowed. Please upload fewer files.")
+        batch_mode = st.checkbox(
+            "Batch mode: submit as one Message Batch (lower cost, results within 24 hours)",
+            help="For large tenders. Collect the results below once the batch has finished.",
+        )
+        max_files = 100 if batch_mode else 10
+        if len(uploaded_files) > max_files:
+            if batch_mode:
+                st.error(f"❌ Maximum {max_files} files allowed per batch. Please upload fewer files.")
+            else:
+                st.error(
+                    f"❌ Maximum {max_files} files allowed. "
+                    "Please upload fewer files, or turn on batch mode for up to 100."
+                )
         else:
             if st.button("Evaluate All Bids", type="primary", use_container_width=True):
                 with st.spinner("Evaluating bids..."):
@@ -69,41 +146,165 @@ with tab1:
                     progress_bar = st.progress(0)
                     status_text = st.empty()
 
-                    evaluations = []
                     errors = []
 
-                    for idx, uploaded_file in enumerate(uploaded_files, 1):
+                    # Reuse evaluations of files already processed for this tender; fingerprints
+                    # include the content hash, so a changed file under the same name is re-evaluated
+                    fingerprints = [
+                        file_fingerprint(uploaded_file.name, uploaded_file.getvalue())
+                        for uploaded_file in uploaded_files
+                    ]
+
+                    # Extract text from every new file first (local, fast)
+                    bid_files = []
+                    bid_fingerprints = []
+                    bid_texts = []
+                    for uploaded_file, fingerprint in zip(uploaded_files, fingerprints):
+                        if get_cached_bid_evaluation(fingerprint) is not None or fingerprint in bid_fingerprints:
+                            continue
                         try:
-                            status_text.text(f"Evaluating {idx}/{len(uploaded_files)}: {uploaded_file.name}")
-                            progress = idx / len(uploaded_files)
-                            progress_bar.progress(progress)
+                            status_text.text(f"Reading {uploaded_file.name}...")
+                            pages = read_document(uploaded_file.name, uploaded_file.getvalue())
+                            bid_text, prep_report = strip_boilerplate(pages)
+                            show_prep_report(uploaded_file.name, prep_report)
+                            bid_texts.append(bid_text)
+                            bid_files.append(uploaded_file.name)
+                            bid_fingerprints.append(fingerprint)
+                        except Exception as e:
+                            errors.append(f"{uploaded_file.name}: {str(e)}")
 
-                            # Extract text
-                            file_content = uploaded_file.read()
-                            file_extension = uploaded_file.name.split(".")[-1].lower()
-                            bid_text = extract_text_from_file(file_content, file_extension)
+                    if batch_mode:
+                        # Current evaluations stay as they are until the batch is collected
+                        if bid_texts:
+                            try:
+                                record = submit_evaluation_batch(
+                                    bid_texts,
+                                    bid_files,
+                                    bid_fingerprints,
+                                    tender_data,
+                                    criteria,
+                                )
+                                st.success(
+                                    f"✓ Submitted {len(bid_texts)} bid(s) as batch {record['batch_id']}. "
+                                    "Collect the results below when it has finished."
+                                )
+                            except Exception as e:
+                                errors.append(f"Batch submission failed: {str(e)}")
+                    else:
+                        # One card per bid, filled in as fields of its evaluation stream in
+                        live_cards = [st.empty() for _ in bid_files]
+                        partials = [{} for _ in bid_files]
+                        for slot, file_name in zip(live_cards, bid_files):
+                            render_live_card(slot, file_name, {}, "waiting")
+
+                        def show_field(idx, path, value):
+                            set_path(partials[idx], path, value)
+                            render_live_card(live_cards[idx], bid_files[idx], partials[idx], "evaluating")
+
+                        # Evaluate with Claude, several bids at a time
+                        def show_progress(completed, total, idx, result):
+                            progress_bar.progress(completed / total)
+                            outcome = "failed" if isinstance(result, Exception) else "done"
+                            status_text.text(f"Evaluated {completed}/{total}: {bid_files[idx]} ({outcome})")
+                            if isinstance(result, Exception):
+                                render_live_card(live_cards[idx], bid_files[idx], partials[idx], "failed")
+                            else:
+                                render_live_card(live_cards[idx], bid_files[idx], result, "done")
+
+                        def show_queue(position, eta_seconds):
+                            status_text.text(
+                                f"Waiting for API capacity (shared with other users): "
+                                f"position {position} in queue, ~{eta_seconds:.0f}s"
+                            )
+
+                        status_text.text(f"Evaluating {len(bid_texts)} bid(s)...")
+                        try:
+                            results = evaluate_supplier_bids(
+                                bid_texts,
+                                tender_data,
+                                criteria,
+                                on_progress=show_progress,
+                                on_queue=show_queue,
+                                on_field=show_field,
+                            )
+                        except Exception as e:
+                            # Setup failure (e.g. missing API key) applies to every bid
+                            results = [e] * len(bid_texts)
 
-                            # Evaluate with Claude
-                            evaluation = evaluate_supplier_bid(bid_text, tender_data, criteria)
-                            evaluations.append(evaluation)
+                        for file_name, fingerprint, result in zip(bid_files, bid_fingerprints, results):
+                            if isinstance(result, Exception):
+                                errors.append(f"{file_name}: {str(result)}")
+                            else:
+                                cache_bid_evaluation(fingerprint, result)
 
-                        except Exception as e:
-                            errors.append(f"{uploaded_file.name}: {str(e)}")
+                        # Assemble in upload order; the same file uploaded twice is listed once
+                        evaluations = []
+                        for fingerprint in dict.fromkeys(fingerprints):
+                            evaluation = get_cached_bid_evaluation(fingerprint)
+                            if evaluation is not None:
+                                evaluations.append(evaluation)
+
+                        # Save evaluations
+                        set_supplier_evaluations(evaluations)
+
+                        for slot in live_cards:
+                            slot.empty()
 
-                    # Save evaluations
-                    set_supplier_evaluations(evaluations)
+                        if evaluations:
+                            st.success(f"✓ Successfully evaluated {len(evaluations)} bid(s)!")
 
                     progress_bar.empty()
                     status_text.empty()
 
-                    if evaluations:
-                        st.success(f"✓ Successfully evaluated {len(evaluations)} bid(s)!")
-
                     if errors:
                         with st.expander("⚠️ Errors during evaluation"):
                             for error in errors:
                                 st.write(f"• {error}")
 
+    # Batches submitted earlier for this tender; other sessions' batches (e.g. from before
+    # an app restart or page reload) only on request
+    other_sessions = st.checkbox(
+        "Show batches submitted in other sessions for this tender",
+        help="Includes batches submitted before the app restarted or the page was reloaded.",
+    )
+    pending_batches = list_evaluation_batches(get_tender_data(), include_other_sessions=other_sessions)
+    if pending_batches:
+        st.markdown("#### Pending Batches")
+        for record in pending_batches:
+            batch_id = record["batch_id"]
+            if batch_id in get_batches_to_collect():
+                # One status check per rerun instead of holding the page until the batch ends
+                try:
+                    record = check_evaluation_batch(batch_id)
+                    if record["status"] == "ended":
+                        set_batch_to_collect(batch_id, False)
+                        collect_batch_results(batch_id)
+                        continue
+                except Exception as e:
+                    set_batch_to_collect(batch_id, False)
+                    st.error(f"❌ {str(e)}")
+            counts = record.get("request_counts") or {}
+            submitted = datetime.fromtimestamp(record["submitted_at"]).strftime("%Y-%m-%d %H:%M")
+            st.write(
+                f"**{batch_id}** — {len(record['file_names'])} bid(s) for {record['tender_title']}, "
+                f"submitted {submitted}, status: {record['status']}"
+                + (f" ({counts.get('succeeded', 0)} succeeded, {counts.get('errored', 0)} errored)" if counts else "")
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Check status", key=f"check_{batch_id}", use_container_width=True):
+                    try:
+                        check_evaluation_batch(batch_id)
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ {str(e)}")
+            with col2:
+                if batch_id in get_batches_to_collect():
+                    st.caption("Results load here as soon as a status check finds the batch finished.")
+                elif st.button("Collect results when ready", key=f"collect_{batch_id}", use_container_width=True):
+                    set_batch_to_collect(batch_id)
+                    st.rerun()
+
 with tab2:
     st.markdown("#### Load Sample Bids")
     st.markdown("Load realistic sample bids for quick demonstration.")
@@ -10,6 +10,7 @@ from utils.state import (
     get_evaluation_criteria,
 )
 from utils.ai_engine import generate_trade_off_analysis
+from utils.scoring import rescore_evaluations
 from utils.ui_helper import setup_sidebar
 
 st.set_page_config(page_title="Dashboard - Airo Bid Evaluation", page_icon="📊", layout="wide")
@@ -31,9 +32,9 @@ elif selected_page == "4_Reports":
 elif selected_page == "5_Chat":
     st.switch_page("pages/5_Chat.py")
 
-# Load data
+# Load data; scores follow the current criterion weights without re-evaluating any bid
 tender_data = get_tender_data()
-evaluations = get_supplier_evaluations()
+evaluations = rescore_evaluations(get_supplier_evaluations(), get_evaluation_criteria())
 
 # Show info if not enough data
 if not tender_data or len(evaluations) < 2:
@@ -55,6 +56,7 @@ sorted_evals = sorted(evaluations, key=lambda x: float(x.get("overall_score", 0)
 with st.container():
     st.markdown("---")
     st.markdown("### 1️⃣ Overall Ranking")
+    st.caption("Overall and category scores are recomputed from the criterion scores using the current weights.")
 
     # Create ranking table
     ranking_data = []
@@ -5,8 +5,10 @@ from utils.state import (
     init_session_state,
     get_tender_data,
     get_supplier_evaluations,
+    get_evaluation_criteria,
 )
 from utils.report_gen import BidEvaluationReportGenerator
+from utils.scoring import rescore_evaluations
 from utils.ui_helper import setup_sidebar
 
 st.set_page_config(page_title="Reports - Airo Bid Evaluation", page_icon="📑", layout="wide")
@@ -28,9 +30,9 @@ elif selected_page == "3_Dashboard":
 elif selected_page == "5_Chat":
     st.switch_page("pages/5_Chat.py")
 
-# Load data
+# Load data; scores follow the current criterion weights without re-evaluating any bid
 tender_data = get_tender_data()
-evaluations = get_supplier_evaluations()
+evaluations = rescore_evaluations(get_supplier_evaluations(), get_evaluation_criteria())
 
 # Show info if not enough data
 if not tender_data or len(evaluations) < 2:
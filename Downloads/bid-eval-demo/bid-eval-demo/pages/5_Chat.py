@@ -7,8 +7,13 @@ from utils.state import (
     get_evaluation_criteria,
     get_chat_history,
     add_chat_message,
+    clear_chat_history,
 )
-from utils.ai_engine import chat_with_evaluation_data
+from utils.ai_engine import stream_chat_with_evaluation_data, stream_polished_answer
+from utils.answer_cache import answer_cache
+from utils.chat_history import prepare_chat_context
+from utils.local_answers import answer_locally
+from utils.scoring import rescore_evaluations
 from utils.ui_helper import setup_sidebar
 
 st.set_page_config(page_title="Chat - Airo Bid Evaluation", page_icon="💬", layout="wide")
@@ -30,10 +35,10 @@ elif selected_page == "3_Dashboard":
 elif selected_page == "4_Reports":
     st.switch_page("pages/4_Reports.py")
 
-# Load data
+# Load data; scores follow the current criterion weights, as on the Dashboard
 tender_data = get_tender_data()
-evaluations = get_supplier_evaluations()
 criteria = get_evaluation_criteria()
+evaluations = rescore_evaluations(get_supplier_evaluations(), criteria)
 
 # Show info if not enough data
 if not tender_data or len(evaluations) < 2:
@@ -64,6 +69,13 @@ with st.sidebar:
             st.session_state.user_input = action
             st.rerun()
 
+    st.checkbox(
+        "✨ Polish quick answers with Claude",
+        key="polish_local_answers",
+        help="Quick actions are computed instantly from the evaluation data; "
+        "tick to have Claude turn those figures into a narrative.",
+    )
+
     st.markdown("---")
     st.markdown("### Tips")
     st.markdown(
@@ -84,6 +96,9 @@ st.markdown("---")
 # Display chat history
 chat_history = get_chat_history()
 
+if st.session_state.chat_trimmed:
+    st.caption(f"{st.session_state.chat_trimmed} earlier messages are no longer shown; they are kept as a summary.")
+
 for message in chat_history:
     if message["role"] == "user":
         with st.chat_message("user"):
@@ -105,22 +120,68 @@ if user_input:
     with st.chat_message("user"):
         st.markdown(user_input)
 
+    # Quick-action questions are answered from the evaluation data without calling Claude
+    local_answer = answer_locally(user_input, tender_data, evaluations, criteria)
+    polish = local_answer is not None and st.session_state.get("polish_local_answers", False)
+    # Other questions may have been asked before, in any session, about the same data
+    cached_answer = answer_cache.get(user_input, tender_data, evaluations, criteria) if local_answer is None else None
+
+    if local_answer is None and cached_answer is None:
+        # Recent turns go verbatim, older ones as a running summary, within a token budget
+        context_messages, conversation_summary, context_report = prepare_chat_context(get_chat_history())
+        response_stream = stream_chat_with_evaluation_data(
+            user_input, tender_data, evaluations, criteria, context_messages, conversation_summary
+        )
+    elif polish:
+        response_stream = stream_polished_answer(user_input, local_answer)
+
     # Add to chat history
     add_chat_message("user", user_input)
 
-    # Get AI response
-    with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                response = chat_with_evaluation_data(
-                    user_input,
-                    tender_data,
-                    evaluations,
-                    criteria,
-                    get_chat_history()[:-1],  # Exclude the last user message we just added
-                )
+    if local_answer is not None and not polish:
+        with st.chat_message("assistant"):
+            st.markdown(local_answer)
+            st.caption("Computed locally from the evaluation data")
+        add_chat_message("assistant", local_answer)
+    elif cached_answer is not None:
+        with st.chat_message("assistant"):
+            st.markdown(cached_answer)
+            st.caption("Answered from earlier replies to the same question on this data")
+        add_chat_message("assistant", cached_answer)
+    else:
+        # Stream AI response
+        with st.chat_message("assistant"):
+            # Clicking Stop reruns the page, which interrupts the stream and closes the request
+            stop_slot = st.empty()
+            stop_slot.button("⏹ Stop generating", key="stop_chat_stream")
 
-                st.markdown(response)
+            partial = []
+            completed = False
+
+            def track_stream(stream):
+                for chunk in stream:
+                    partial.append(chunk)
+                    yield chunk
+
+            try:
+                response = st.write_stream(track_stream(response_stream))
+                completed = True
+                stop_slot.empty()
+
+                if local_answer is not None:
+                    st.caption("Polished from figures computed locally from the evaluation data")
+                else:
+                    context_note = (
+                        f"Context: {context_report['verbatim']} recent messages, ~{context_report['tokens']:,} tokens"
+                    )
+                    if context_report["summarized"]:
+                        context_note += f" · {context_report['summarized']} earlier messages summarized"
+                    if context_report["omitted"]:
+                        context_note += f" · {context_report['omitted']} left out to fit the budget"
+                    if context_report["summarizing"]:
+                        context_note += " · summary updating"
+                    st.caption(context_note)
+                    answer_cache.put(user_input, tender_data, evaluations, criteria, response)
 
                 # Add response to chat history
                 add_chat_message("assistant", response)
@@ -130,11 +191,17 @@ if user_input:
                     st.info("💡 Switch to the Dashboard tab to see updated rankings if criteria weights were changed.")
 
             except Exception as e:
+                # Stop and rerun interrupt the script with BaseException subclasses, which pass through
+                stop_slot.empty()
                 st.error(f"❌ Error getting response: {str(e)}")
+            finally:
+                # Keep whatever arrived before the user stopped the response
+                if not completed and partial:
+                    add_chat_message("assistant", "".join(partial) + "\n\n_(response stopped)_")
 
 # Clear chat button
 if st.button("🔄 Clear Chat History", use_container_width=True):
-    st.session_state.chat_history = []
+    clear_chat_history()
     st.rerun()
 
 # Navigation
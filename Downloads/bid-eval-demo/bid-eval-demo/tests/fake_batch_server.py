@@ -0,0 +1,126 @@
+"""A local stand-in for the Message Batches endpoints, for tests."""
+
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+PREFIX = "/v1/messages/batches"
+
+
+class FakeBatchServer:
+    """
+    Serve POST /v1/messages/batches, GET /v1/messages/batches/{id} and its
+    /results JSONL on localhost.
+
+    Each request's result is produced by respond(custom_id, params), which
+    returns a Message dict. A batch reports "in_progress" for the first
+    polls_until_ended retrievals, then "ended" with a results_url.
+    """
+
+    def __init__(self, respond: Callable[[str, Dict[str, Any]], Dict[str, Any]], polls_until_ended: int = 1):
+        self.respond = respond
+        self.polls_until_ended = polls_until_ended
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.created: List[Dict[str, Any]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "FakeBatchServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _batch_json(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        ended = batch["polls"] > self.polls_until_ended
+        count = len(batch["requests"])
+        created = datetime.now(timezone.utc)
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": created.isoformat(),
+            "expires_at": (created + timedelta(days=1)).isoformat(),
+            "ended_at": created.isoformat() if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.base_url}{PREFIX}/{batch['id']}/results" if ended else None,
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: str, content_type: str = "application/json"):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if self.path.split("?")[0] != PREFIX:
+                    return self._send(404, json.dumps({"type": "error", "error": {"type": "not_found_error"}}))
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                batch = {"id": f"msgbatch_{uuid.uuid4().hex[:12]}", "requests": body["requests"], "polls": 0}
+                server.batches[batch["id"]] = batch
+                server.created.append(body)
+                self._send(200, json.dumps(server._batch_json(batch)))
+
+            def do_GET(self):
+                parts = self.path.split("?")[0][len(PREFIX) :].strip("/").split("/")
+                batch = server.batches.get(parts[0]) if self.path.startswith(PREFIX) else None
+                if batch is None:
+                    return self._send(404, json.dumps({"type": "error", "error": {"type": "not_found_error"}}))
+                if len(parts) == 1:
+                    batch["polls"] += 1
+                    return self._send(200, json.dumps(server._batch_json(batch)))
+                lines = [
+                    json.dumps(
+                        {
+                            "custom_id": request["custom_id"],
+                            "result": {
+                                "type": "succeeded",
+                                "message": server.respond(request["custom_id"], request["params"]),
+                            },
+                        }
+                    )
+                    for request in batch["requests"]
+                ]
+                self._send(200, "\n".join(lines) + "\n", "application/x-jsonl")
+
+        return Handler
+
+
+def tool_message(tool_input: Dict[str, Any], name: str, stop_reason: str = "tool_use") -> Dict[str, Any]:
+    """Build a Message dict whose only content is one tool call."""
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:12]}",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-sonnet-4-5-20250929",
+        "content": [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:12]}", "name": name, "input": tool_input}],
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 100, "output_tokens": 50},
+    }
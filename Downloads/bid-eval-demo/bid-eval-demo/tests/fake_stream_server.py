@@ -0,0 +1,119 @@
+"""A local stand-in for the streaming Messages endpoint, for tests."""
+
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+# One SSE event: (event name, data)
+Event = Tuple[str, Dict[str, Any]]
+
+
+class FakeStreamServer:
+    """
+    Serve POST /v1/messages as a server-sent event stream on localhost.
+
+    Each request is answered with the next list of events in responses; the
+    last list is repeated once the others are used up. Request bodies are
+    kept in requests.
+    """
+
+    def __init__(self, responses: List[List[Event]]):
+        self.responses = responses
+        self.requests: List[Dict[str, Any]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "FakeStreamServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                server.requests.append(json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0)))))
+                events = server.responses[min(len(server.requests), len(server.responses)) - 1]
+                data = "".join(f"event: {name}\ndata: {json.dumps(body)}\n\n" for name, body in events).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def error_events(error_type: str) -> List[Event]:
+    """A stream that fails at once with an error event, as the API sends mid-stream overloads."""
+    return [("error", {"type": "error", "error": {"type": error_type, "message": error_type}})]
+
+
+def _message_events(block: Dict[str, Any], deltas: List[Dict[str, Any]], stop_reason: str, fail_with: str) -> List[Event]:
+    """A stream of one content block built from the given deltas."""
+    events: List[Event] = [
+        (
+            "message_start",
+            {
+                "type": "message_start",
+                "message": {
+                    "id": f"msg_{uuid.uuid4().hex[:12]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": "claude-sonnet-4-5-20250929",
+                    "content": [],
+                    "stop_reason": None,
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 100, "output_tokens": 1},
+                },
+            },
+        ),
+        ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": block}),
+    ]
+    events += [("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": delta}) for delta in deltas]
+    if fail_with:
+        return events + error_events(fail_with)
+    return events + [
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        (
+            "message_delta",
+            {"type": "message_delta", "delta": {"stop_reason": stop_reason, "stop_sequence": None}, "usage": {"output_tokens": 50}},
+        ),
+        ("message_stop", {"type": "message_stop"}),
+    ]
+
+
+def text_events(chunks: List[str], stop_reason: str = "end_turn", fail_with: str = "") -> List[Event]:
+    """
+    A stream of a text answer arriving in the given chunks.
+
+    If fail_with is set, an error event of that type replaces the end of the stream.
+    """
+    deltas = [{"type": "text_delta", "text": chunk} for chunk in chunks]
+    return _message_events({"type": "text", "text": ""}, deltas, stop_reason, fail_with)
+
+
+def tool_events(name: str, chunks: List[str], stop_reason: str = "tool_use", fail_with: str = "") -> List[Event]:
+    """
+    A stream of one tool call whose input JSON arrives in the given chunks.
+
+    If fail_with is set, an error event of that type replaces the end of the stream.
+    """
+    block = {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:12]}", "name": name, "input": {}}
+    deltas = [{"type": "input_json_delta", "partial_json": chunk} for chunk in chunks]
+    return _message_events(block, deltas, stop_reason, fail_with)
@@ -0,0 +1,67 @@
+"""Tests for the shared chat answer cache."""
+
+import pytest
+
+from utils.answer_cache import AnswerCache
+
+EVALUATIONS = [
+    {"supplier_name": "ValveTech Industries", "overall_score": 87},
+    {"supplier_name": "Flowserve Middle East", "overall_score": 86},
+]
+CRITERIA = [{"criterion": "Technical Capability", "weight_percentage": 100, "category": "technical"}]
+TENDER = {"tender_title": "Valves", "tender_reference": "T-1"}
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(max_entries=50, threshold=0.85)
+
+
+def _ask(cache, question, evaluations=EVALUATIONS):
+    return cache.get(question, TENDER, evaluations, CRITERIA)
+
+
+@pytest.mark.parametrize(
+    "cached, asked",
+    [
+        ("Which suppliers are compliant with HSE?", "Which suppliers are non-compliant with HSE?"),
+        ("Which bidders are HSE compliant?", "Which bidders are not HSE compliant?"),
+        ("Is ValveTech HSE compliant?", "Is ValveTech ESG compliant?"),
+        ("Which suppliers meet the warranty requirement?", "Which suppliers do not meet the warranty requirement?"),
+        ("Which suppliers meet the warranty requirement?", "Which suppliers don't meet the warranty requirement?"),
+        ("Which bidders have ISO 14001?", "Which bidders lack ISO 14001?"),
+        ("Which bidders lack ISO 14001?", "Which bidders lack ISO 9001?"),
+        ("Is ValveTech HSE compliant?", "Is Flowserve HSE compliant?"),
+    ],
+)
+def test_different_meaning_is_a_miss(cache, cached, asked):
+    cache.put(cached, TENDER, EVALUATIONS, CRITERIA, "cached answer")
+    assert _ask(cache, asked) is None
+    cache.put(asked, TENDER, EVALUATIONS, CRITERIA, "other answer")
+    assert _ask(cache, asked) == "other answer"
+    assert _ask(cache, cached) == "cached answer"
+
+
+@pytest.mark.parametrize(
+    "cached, asked",
+    [
+        ("Who is cheapest?", "Which supplier is the cheapest?"),
+        ("Which bidders lack ISO 14001?", "Which suppliers lack ISO 14001"),
+        ("Is ValveTech HSE compliant?", "is valvetech hse compliant"),
+        ("Which bidders are non-compliant with HSE?", "Which bidders are non compliant with HSE?"),
+    ],
+)
+def test_rephrased_question_is_a_hit(cache, cached, asked):
+    cache.put(cached, TENDER, EVALUATIONS, CRITERIA, "cached answer")
+    assert _ask(cache, asked) == "cached answer"
+
+
+def test_changed_data_is_a_miss(cache):
+    cache.put("Who is cheapest?", TENDER, EVALUATIONS, CRITERIA, "cached answer")
+    changed = [dict(EVALUATIONS[0], overall_score=50), EVALUATIONS[1]]
+    assert _ask(cache, "Who is cheapest?", changed) is None
+
+
+def test_follow_up_questions_are_not_cached(cache):
+    cache.put("What about them?", TENDER, EVALUATIONS, CRITERIA, "cached answer")
+    assert _ask(cache, "What about them?") is None
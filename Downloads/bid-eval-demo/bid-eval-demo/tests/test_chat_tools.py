@@ -0,0 +1,43 @@
+"""Chat tool calls with arguments as the model sends them."""
+
+import json
+
+import pytest
+
+from utils.chat_tools import run_chat_tool
+
+EVALUATIONS = [
+    {"supplier_name": "Alpha Valves", "overall_score": 82, "criterion_scores": [{"criterion": "Price", "score": 70}]},
+    {"supplier_name": "Beta Flow", "overall_score": 76, "criterion_scores": [{"criterion": "Price", "score": 90}]},
+]
+CRITERIA = [{"criterion": "Price", "weight_percentage": 100, "category": "commercial"}]
+TENDER = {"mandatory_requirements": ["ISO 9001 certification"]}
+
+
+def _run(name, arguments):
+    return json.loads(run_chat_tool(name, arguments, TENDER, EVALUATIONS, CRITERIA))
+
+
+@pytest.mark.parametrize(
+    "name, arguments",
+    [
+        ("get_ranking", {"limit": "top three"}),
+        ("compliance_for_requirement", {"requirement": None}),
+        ("recompute_with_weights", {"weights": ["Price", 50]}),
+        ("get_supplier", {"supplier": "S1", "sections": 5}),
+        ("get_ranking", {"order": "desc"}),
+    ],
+)
+def test_bad_arguments_come_back_as_tool_errors(name, arguments):
+    result = _run(name, arguments)
+
+    assert result["error"].startswith(f"Invalid arguments for {name}")
+
+
+def test_valid_call():
+    assert [row["supplier"] for row in _run("get_ranking", {"limit": 1})] == ["Alpha Valves"]
+
+
+@pytest.mark.parametrize("supplier", ["", "   "])
+def test_blank_supplier_matches_no_bid(supplier):
+    assert _run("get_supplier", {"supplier": supplier}) == {"error": f"No supplier matches {supplier!r}"}
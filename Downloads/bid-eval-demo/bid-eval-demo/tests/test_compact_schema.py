@@ -0,0 +1,93 @@
+"""Expansion of the compact evaluation wire format."""
+
+import pytest
+
+from utils.json_stream import JsonStreamParser
+from utils.schemas import expand_evaluation, expand_field, validate_evaluation
+
+CRITERIA = ["Technical Capability", "Commercial Terms"]
+REQUIREMENTS = ["ISO 9001 certification", "24/7 support"]
+
+COMPACT = {
+    "n": "Gulf Valves",
+    "co": "UAE",
+    "o": 82,
+    "cat": {"tech": {"s": 85, "sum": "Strong", "pro": ["API 6D"], "con": []}, "comp": {"s": 70}},
+    "hse": {"s": "C", "d": "Certified"},
+    "esg": {"s": "P", "d": "Policy only"},
+    "rk": ["Currency"],
+    "cr": [{"i": 1, "s": 85, "e": "p. 3", "f": "M"}, {"i": 7, "nm": "Local content", "s": 40, "f": "P"}],
+    "mr": [{"i": 2, "s": "N", "e": "Office hours only"}, {"s": "U"}],
+}
+
+
+def test_expand_evaluation():
+    full = expand_evaluation(COMPACT, CRITERIA, REQUIREMENTS)
+
+    assert full["supplier_name"] == "Gulf Valves"
+    assert full["overall_score"] == 82
+    assert full["category_scores"] == {
+        "technical": {"score": 85, "summary": "Strong", "strengths": ["API 6D"], "gaps": []},
+        "compliance": {"score": 70, "summary": None, "strengths": None, "gaps": None},
+    }
+    assert full["hse_compliance"] == {"status": "compliant", "details": "Certified"}
+    assert full["esg_compliance"] == {"status": "partially", "details": "Policy only"}
+    assert full["criterion_scores"] == [
+        {"criterion": "Technical Capability", "score": 85, "evidence": "p. 3", "flag": "met"},
+        # Numbers outside the prompt's list fall back to the name Claude gave
+        {"criterion": "Local content", "score": 40, "evidence": None, "flag": "partially_met"},
+    ]
+    assert full["mandatory_requirements_status"] == [
+        {"requirement": "24/7 support", "status": "non_compliant", "evidence": "Office hours only"},
+        {"requirement": "Not specified", "status": "unclear", "evidence": None},
+    ]
+    assert "bid_reference" not in full
+
+
+def test_expanded_evaluation_validates():
+    evaluation = validate_evaluation(expand_evaluation(COMPACT, CRITERIA, REQUIREMENTS))
+
+    assert evaluation["category_scores"]["commercial"]["score"] == 0
+    assert evaluation["criterion_scores"][1]["flag"] == "partially_met"
+
+
+@pytest.mark.parametrize("key", ["cr", "mr", "cat"])
+@pytest.mark.parametrize("value", ["Met all criteria", 3, None, {"i": 1}])
+def test_malformed_containers_expand_to_nothing(key, value):
+    full = expand_evaluation({key: value}, CRITERIA, REQUIREMENTS)
+
+    assert list(full.values()) in ([[]], [{}])
+
+
+def test_unknown_status_codes_are_passed_through_for_validation():
+    full = expand_evaluation({"hse": {"s": "compliant"}, "cr": [{"i": 1, "f": "?"}]}, CRITERIA, REQUIREMENTS)
+
+    assert full["hse_compliance"]["status"] == "compliant"
+    assert validate_evaluation(full)["criterion_scores"][0]["flag"] == "not_found"
+
+
+def test_expand_field_matches_expand_evaluation():
+    fields = [
+        expand_field(path, value, CRITERIA, REQUIREMENTS)
+        for path, value in JsonStreamParser().feed('{"o": 82, "cr": [{"i": 2, "s": 60}], "cat": {"comm": {"s": 75}}}')
+    ]
+
+    assert fields == [
+        (("overall_score",), 82),
+        (("criterion_scores", 0), {"criterion": "Commercial Terms", "score": 60, "evidence": None, "flag": None}),
+        (("criterion_scores",), [{"criterion": "Commercial Terms", "score": 60, "evidence": None, "flag": None}]),
+        (("category_scores", "commercial"), {"score": 75, "summary": None, "strengths": None, "gaps": None}),
+        (("category_scores",), {"commercial": {"score": 75, "summary": None, "strengths": None, "gaps": None}}),
+    ]
+
+
+@pytest.mark.parametrize(
+    "path",
+    [(), ("zz",), ("cat", "other"), ("cr", "first"), ("mr", "x"), ("hse", "s")],
+)
+def test_expand_field_ignores_unknown_paths(path):
+    assert expand_field(path, "value", CRITERIA, REQUIREMENTS) is None
+
+
+def test_expand_field_of_a_string_where_a_list_belongs():
+    assert expand_field(("cr",), "all met", CRITERIA, REQUIREMENTS) == (("criterion_scores",), [])
@@ -0,0 +1,29 @@
+"""Continuing tool calls cut off at max_tokens."""
+
+from anthropic import Anthropic
+
+from fake_stream_server import FakeStreamServer, text_events, tool_events
+from utils import ai_engine
+from utils.schemas import TENDER_TOOL
+
+
+def test_continuation_resumes_from_the_prefill_that_was_sent():
+    responses = [
+        tool_events(TENDER_TOOL["name"], ['{"tender_title": "Control '], stop_reason="max_tokens"),
+        text_events([' Valves", "issuing_organization": "Borouge"}']),
+    ]
+    with FakeStreamServer(responses) as server:
+        result = ai_engine._stream_tool_call(
+            Anthropic(api_key="test-key", base_url=server.base_url, max_retries=0),
+            use_cache=False,
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=1024,
+            tools=[TENDER_TOOL],
+            tool_choice={"type": "tool", "name": TENDER_TOOL["name"]},
+            messages=[{"role": "user", "content": "Tender"}],
+        )
+
+    prefill = server.requests[1]["messages"][-1]
+    assert prefill == {"role": "assistant", "content": '{"tender_title": "Control'}
+    assert server.requests[1]["tool_choice"] == {"type": "none"}
+    assert result == {"tender_title": "Control Valves", "issuing_organization": "Borouge"}
@@ -0,0 +1,86 @@
+"""Streaming DOCX text extraction."""
+
+import io
+import zipfile
+
+from utils.pdf_parser import _iter_docx_blocks, iter_docx_pages
+
+_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _docx(body: str) -> bytes:
+    """A minimal DOCX holding only word/document.xml with the given body XML."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", f"<w:document {_NS}><w:body>{body}</w:body></w:document>")
+    return buffer.getvalue()
+
+
+def _p(*runs: str) -> str:
+    return "<w:p>" + "".join(f"<w:r>{run}</w:r>" for run in runs) + "</w:p>"
+
+
+def _t(text: str) -> str:
+    return f"<w:t>{text}</w:t>"
+
+
+def _table(*rows) -> str:
+    return "<w:tbl>" + "".join(
+        "<w:tr>" + "".join(f"<w:tc>{cell}</w:tc>" for cell in row) + "</w:tr>" for row in rows
+    ) + "</w:tbl>"
+
+
+def test_body_paragraphs_are_emitted_in_order():
+    content = _docx(_p(_t("Technical Proposal")) + _p(_t("Lead time "), _t("8 weeks")) + _p())
+
+    assert list(_iter_docx_blocks(content)) == ["Technical Proposal", "Lead time 8 weeks", ""]
+
+
+def test_table_rows_are_joined_by_cell():
+    table = _table(
+        [_p(_t("Item")), _p(_t("Price"))],
+        [_p(_t("Gate valve")) + _p(_t("DN50")), _p(_t("120"))],
+    )
+    content = _docx(_p(_t("Pricing")) + table + _p(_t("Payment 30 days")))
+
+    assert list(_iter_docx_blocks(content)) == [
+        "Pricing",
+        "Item | Price",
+        "Gate valve DN50 | 120",
+        "Payment 30 days",
+    ]
+
+
+def test_nested_table_is_folded_into_its_cell():
+    inner = _table([_p(_t("A")), _p(_t("1"))], [_p(_t("B")), _p(_t("2"))])
+    content = _docx(_table([_p(_t("Lots")), inner]))
+
+    assert list(_iter_docx_blocks(content)) == ["Lots | A | 1 B | 2"]
+
+
+def test_run_tabs_are_kept_and_tab_stops_ignored():
+    paragraph = (
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        "<w:r><w:t>Item</w:t><w:tab/><w:t>Qty</w:t></w:r></w:p>"
+    )
+
+    assert list(_iter_docx_blocks(_docx(paragraph))) == ["Item\tQty"]
+
+
+def test_page_breaks_split_pages():
+    body = (
+        _p(_t("Cover"))
+        + _p(_t("Scope"), '<w:br w:type="page"/>', _t("Pricing"))
+        + _p(_t("Line one"), "<w:br/>", _t("line two"))
+    )
+
+    assert list(iter_docx_pages(_docx(body))) == [
+        (1, "Cover\nScope\n"),
+        (2, "Pricing\nLine one\nline two\n"),
+    ]
+
+
+def test_page_breaks_inside_tables_do_not_split_rows():
+    table = _table([_p(_t("Item"), '<w:br w:type="page"/>') + _p(_t("Spec")), _p(_t("1"))])
+
+    assert list(iter_docx_pages(_docx(table))) == [(1, "Item Spec | 1\n")]
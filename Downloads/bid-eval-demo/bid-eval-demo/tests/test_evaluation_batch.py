@@ -0,0 +1,96 @@
+"""Submit, wait for and collect an evaluation batch against a local stand-in server."""
+
+import copy
+
+import pytest
+
+from fake_batch_server import FakeBatchServer, tool_message
+from utils import ai_engine
+from utils.cache import DiskCache
+from utils.schemas import EVALUATION_TOOL
+
+TENDER = {
+    "tender_title": "Control Valves Supply",
+    "issuing_organization": "Borouge",
+    "mandatory_requirements": ["ISO 9001 certification", "24/7 support"],
+}
+CRITERIA = [
+    {"criterion": "Technical Capability", "weight_percentage": 60, "category": "technical"},
+    {"criterion": "Commercial Terms", "weight_percentage": 40, "category": "commercial"},
+]
+
+
+def _compact_evaluation(custom_id: str) -> dict:
+    category = {"s": 80, "sum": "Good", "pro": ["Experienced"], "con": []}
+    return {
+        "n": f"Supplier {custom_id}",
+        "co": "UAE",
+        "ref": custom_id,
+        "o": 82,
+        "cat": {"tech": category, "comm": category, "comp": category},
+        "hse": {"s": "C", "d": "Certified"},
+        "esg": {"s": "P", "d": "Policy only"},
+        "iso": ["ISO 9001"],
+        "pr": "USD 450",
+        "tl": "8 weeks",
+        "rec": "Shortlist",
+        "pct": 90,
+        "rk": ["Currency"],
+        "cr": [{"i": 1, "s": 85, "e": "p. 3", "f": "M"}, {"i": 2, "s": 75, "e": "p. 9", "f": "P"}],
+        "mr": [{"i": 1, "s": "C", "e": "Certificate"}, {"i": 2, "s": "U", "e": "Not stated"}],
+    }
+
+
+def _respond(custom_id, params):
+    if custom_id == "bid-1":
+        # Cut off mid-evaluation: must come back as an error, not an empty supplier
+        return tool_message({"n": "Truncated"}, EVALUATION_TOOL["name"], stop_reason="max_tokens")
+    return tool_message(_compact_evaluation(custom_id), EVALUATION_TOOL["name"])
+
+
+@pytest.fixture
+def batch_env(tmp_path, monkeypatch):
+    with FakeBatchServer(_respond, polls_until_ended=2) as server:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+        monkeypatch.setattr("utils.state.get_api_key", lambda: "test-key")
+        monkeypatch.setattr(ai_engine, "BATCH_DIR", tmp_path / "batches")
+        monkeypatch.setattr(ai_engine, "BATCH_POLL_INITIAL", 0.01)
+        cache = DiskCache("llm_responses", max_bytes=10 * 1024 * 1024)
+        cache.path = tmp_path / "llm_responses.sqlite"
+        monkeypatch.setattr(ai_engine, "llm_cache", cache)
+        yield server
+
+
+def test_submit_wait_collect(batch_env):
+    record = ai_engine.submit_evaluation_batch(
+        ["Bid one text", "Bid two text"], ["one.pdf", "two.pdf"], ["fp-1", "fp-2"], TENDER, CRITERIA
+    )
+    assert [r["custom_id"] for r in batch_env.created[0]["requests"]] == ["bid-0", "bid-1"]
+    assert [r["batch_id"] for r in ai_engine.list_evaluation_batches(TENDER)] == [record["batch_id"]]
+    assert ai_engine.list_evaluation_batches({**TENDER, "tender_title": "Other tender"}) == []
+
+    status = ai_engine.wait_for_evaluation_batch(record["batch_id"], timeout=5)
+    assert status["status"] == "ended"
+
+    (name_1, fp_1, first), (name_2, fp_2, second) = ai_engine.collect_evaluation_batch(record["batch_id"])
+    assert (name_1, fp_1, name_2, fp_2) == ("one.pdf", "fp-1", "two.pdf", "fp-2")
+    assert first["supplier_name"] == "Supplier bid-0"
+    assert [c["criterion"] for c in first["criterion_scores"]] == ["Technical Capability", "Commercial Terms"]
+    assert first["mandatory_requirements_status"][1]["status"] == "unclear"
+    assert isinstance(second, ValueError)
+
+    # Collected batches are forgotten; the good result is cached under the interactive request key
+    assert ai_engine.list_evaluation_batches(TENDER) == []
+    assert ai_engine.llm_cache.get(record["request_keys"][0]) is not None
+    assert ai_engine.llm_cache.get(record["request_keys"][1]) is None
+
+
+def test_weight_change_keeps_batch_listed(batch_env):
+    tender = {**TENDER, "evaluation_criteria": copy.deepcopy(CRITERIA)}
+    record = ai_engine.submit_evaluation_batch(["Bid one text"], ["one.pdf"], ["fp-1"], tender, CRITERIA)
+
+    # The weight sliders edit the criteria in place
+    tender["evaluation_criteria"][0]["weight_percentage"] = 75
+    tender["evaluation_criteria"][1]["weight_percentage"] = 25
+
+    assert [r["batch_id"] for r in ai_engine.list_evaluation_batches(tender)] == [record["batch_id"]]
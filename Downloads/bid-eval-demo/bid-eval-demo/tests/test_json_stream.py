@@ -0,0 +1,25 @@
+"""Repair of truncated tool-call JSON."""
+
+import pytest
+
+from utils.json_stream import JsonStreamParser
+
+
+def _finish(text: str):
+    parser = JsonStreamParser()
+    parser.feed(text)
+    return parser.finish()
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"d": "C:\\\\', "C:\\"),  # completed \\ escape: the backslash is content
+        ('{"d": "C:\\', "C:"),  # dangling escape
+        ('{"d": "x\\u00', "x"),  # partial unicode escape
+        ('{"d": "x\\\\u00', "x\\u00"),  # escaped backslash followed by literal text
+        ('{"d": "x\\\\\\u00', "x\\"),
+    ],
+)
+def test_truncated_string(text, expected):
+    assert _finish(text) == {"d": expected}
@@ -0,0 +1,70 @@
+"""Recognising and answering the chat quick actions locally."""
+
+import pytest
+
+from utils.local_answers import answer_locally, detect_intent
+
+EVALUATIONS = [
+    {
+        "supplier_name": "Alpha Valves",
+        "overall_score": 82,
+        "key_risks": ["Long lead time"],
+        "esg_compliance": {"status": "compliant", "details": "Policy and report"},
+        "mandatory_requirements_status": [{"requirement": "24/7 support", "status": "non_compliant", "evidence": "na"}],
+    },
+    {
+        "supplier_name": "Beta Flow",
+        "overall_score": 76,
+        "key_risks": ["Currency exposure", "New to region"],
+        "esg_compliance": {"status": "unclear", "details": "Not stated"},
+        "mandatory_requirements_status": [],
+    },
+]
+
+
+@pytest.mark.parametrize(
+    "question, intent",
+    [
+        ("Compare top 2 suppliers", "compare_top"),
+        ("Please compare the top two bidders", "compare_top"),
+        ("Can you compare the best 2 bids?", "compare_top"),
+        ("Show compliance gaps", "compliance_gaps"),
+        ("List all compliance gaps for every supplier", "compliance_gaps"),
+        ("Show me the non-compliant bidders", "compliance_gaps"),
+        ("ESG status all bidders", "esg_status"),
+        ("What is the ESG status of each supplier?", "esg_status"),
+        ("Show me ESG compliance for all bids", "esg_status"),
+        ("Risk summary", "risk_summary"),
+        ("Show me the risk summary for all bidders", "risk_summary"),
+        ("What are the key risks across all suppliers?", "risk_summary"),
+        ("Summarize the main risks", "risk_summary"),
+    ],
+)
+def test_quick_action_phrasings_are_recognised(question, intent):
+    assert detect_intent(question) == intent
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Management summary",
+        "What is the biggest risk in Alpha Valves' bid?",
+        "Compare Alpha and Beta on price",
+        "Why is the ESG status of Beta Flow unclear?",
+        "How could the compliance gaps be closed?",
+        "",
+    ],
+)
+def test_free_form_questions_go_to_claude(question):
+    assert detect_intent(question) is None
+
+
+def test_risk_summary_lists_every_supplier():
+    answer = answer_locally("Show me the risk summary for all bidders", None, EVALUATIONS, [])
+
+    assert answer.startswith("3 key risks identified across 2 suppliers.")
+    assert "Alpha Valves" in answer and "Currency exposure" in answer
+
+
+def test_questions_needing_claude_get_no_local_answer():
+    assert answer_locally("Management summary", None, EVALUATIONS, []) is None
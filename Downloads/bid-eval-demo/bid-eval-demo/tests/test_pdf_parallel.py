@@ -0,0 +1,37 @@
+"""Parallel PDF page extraction."""
+
+import fitz
+
+from utils import pdf_parser
+
+
+def _pdf(page_count: int) -> bytes:
+    document = fitz.open()
+    for number in range(1, page_count + 1):
+        document.new_page().insert_text((72, 72), f"Page body {number}")
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+def test_pages_come_back_in_order_from_one_shared_pool():
+    content = _pdf(12)
+
+    first = list(pdf_parser._iter_pages_parallel(content, 12))
+    pool = pdf_parser._get_parse_pool()
+    second = list(pdf_parser._iter_pages_parallel(content, 12))
+
+    assert [page.strip() for page in first] == [f"Page body {n}" for n in range(1, 13)]
+    assert second == first
+    assert pdf_parser._get_parse_pool() is pool
+    assert pool._mp_context.get_start_method() == "spawn"
+
+
+def test_stopping_early_leaves_the_pool_usable():
+    content = _pdf(12)
+
+    pages = pdf_parser._iter_pages_parallel(content, 12)
+    next(pages)
+    pages.close()
+
+    assert len(list(pdf_parser._iter_pages_parallel(content, 12))) == 12
@@ -0,0 +1,85 @@
+"""Fair admission of Claude requests across sessions."""
+
+import threading
+import time
+
+import pytest
+
+from utils import ai_engine
+from utils.ai_engine import RateGovernor
+
+
+class _Clock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = time.monotonic()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(ai_engine.time, "monotonic", clock)
+    return clock
+
+
+def _queue(governor, session_id, admitted):
+    """Queue one request from a session and wait until the governor holds it."""
+    queued = sum(len(q) for q in governor._queues.values())
+    thread = threading.Thread(
+        target=lambda: admitted.append((session_id, governor.acquire(session_id, 100, 100))), daemon=True
+    )
+    thread.start()
+    while sum(len(q) for q in governor._queues.values()) == queued:
+        time.sleep(0.01)
+    return thread
+
+
+@pytest.fixture
+def drained(clock):
+    governor = RateGovernor(requests_per_minute=60, input_tokens_per_minute=100000, output_tokens_per_minute=100000)
+    governor.level["requests"] = 0.0
+    admitted = []
+    threads = [_queue(governor, "A", admitted) for _ in range(5)] + [_queue(governor, "B", admitted)]
+    return governor, admitted, threads
+
+
+def test_a_single_request_is_not_stuck_behind_another_sessions_batch(clock, drained):
+    governor, admitted, threads = drained
+
+    clock.now += 60
+    with governor._cond:
+        governor._cond.notify_all()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert [session_id for session_id, _ in admitted] == ["A", "B", "A", "A", "A", "A"]
+
+
+def test_status_reports_queue_position_and_wait(clock, drained):
+    governor, admitted, threads = drained
+
+    # One request per second refills; B is second in the round-robin order
+    assert governor.status("A") == (1, pytest.approx(1.0))
+    assert governor.status("B") == (2, pytest.approx(2.0))
+    assert governor.status("C") is None
+
+    clock.now += 60
+    with governor._cond:
+        governor._cond.notify_all()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert governor.status("B") is None
+
+
+def test_settle_refunds_unused_output_tokens(clock):
+    governor = RateGovernor(requests_per_minute=60, input_tokens_per_minute=1000, output_tokens_per_minute=1000)
+
+    ticket = governor.acquire("A", 200, 800)
+    governor.settle(ticket, 200, 50)
+
+    assert governor.level["input_tokens"] == 800
+    assert governor.level["output_tokens"] == 950
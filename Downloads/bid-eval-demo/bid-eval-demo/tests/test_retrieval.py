@@ -0,0 +1,34 @@
+"""Passage splitting and BM25 search over bid text."""
+
+from utils.retrieval import PASSAGE_TOKENS, build_index
+from utils.text_prep import PAGE_BREAK, estimate_tokens
+
+# An extracted PDF page: one line per text line, no blank lines between paragraphs
+_FILLER = [
+    "The contractor shall supply control valves in accordance with the project specification",
+    "and the applicable international standards listed in the technical schedule of this proposal.",
+    "All materials are sourced from approved vendors and inspected before dispatch to site.",
+    "Documentation is issued in English and submitted through the document control system.",
+]
+_WARRANTY = [
+    "Warranty: all valves carry a warranty of 24 months from commissioning or 30 months from delivery,",
+    "whichever is earlier, covering defects in materials and workmanship.",
+]
+
+
+def _page(extra=()):
+    return "\n".join(_FILLER * 2 + list(extra) + _FILLER * 3)
+
+
+def test_pages_without_blank_lines_are_split_into_passages():
+    text = PAGE_BREAK.join([_page(), _page(_WARRANTY), _page()])
+    assert "\n\n" not in text and estimate_tokens(_page()) > PASSAGE_TOKENS
+
+    index = build_index(text)
+
+    assert len(index.passages) >= 2 * 3
+    assert all(estimate_tokens(str(p["text"])) <= PASSAGE_TOKENS for p in index.passages)
+
+    best, _ = index.search("warranty months", top_k=1)[0]
+    assert index.passages[best]["page"] == 2
+    assert "24 months" in index.passages[best]["text"]
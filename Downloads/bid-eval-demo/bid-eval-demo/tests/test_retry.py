@@ -0,0 +1,203 @@
+"""Retrying transient Claude API errors."""
+
+import sys
+import time
+from email.utils import formatdate
+
+import pytest
+from anthropic import DEFAULT_CONNECTION_LIMITS, Anthropic, APIConnectionError, APIStatusError
+
+from fake_stream_server import FakeStreamServer, error_events, text_events, tool_events
+from utils import ai_engine
+from utils import retry
+from utils.retry import RetryPolicy, classify_error, retry_after_seconds
+from utils.schemas import TENDER_TOOL
+
+# The HTTP library of the installed SDK (httpx or httpx2, depending on the release)
+_http = sys.modules[type(DEFAULT_CONNECTION_LIMITS).__module__.split(".")[0]]
+_REQUEST = _http.Request("POST", "https://api.anthropic.com/v1/messages")
+
+
+def _status_error(status, headers=None, body=None):
+    response = _http.Response(status, headers=headers or {}, request=_REQUEST)
+    return APIStatusError(f"Error code: {status}", response=response, body=body)
+
+
+def _event_error(error_type):
+    return _status_error(200, body={"type": "error", "error": {"type": error_type, "message": "Stream error"}})
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (_status_error(429), "rate_limited"),
+        (_status_error(529), "overloaded"),
+        (_status_error(500), "server_error"),
+        (_status_error(503), "server_error"),
+        (_status_error(408), "connection"),
+        (_status_error(400), None),
+        (_status_error(401), None),
+        (APIConnectionError(request=_REQUEST), "connection"),
+        (_event_error("overloaded_error"), "overloaded"),
+        (_event_error("rate_limit_error"), "rate_limited"),
+        (_event_error("api_error"), "server_error"),
+        (_event_error("invalid_request_error"), None),
+        (_status_error(200, body="not json"), None),
+        (ValueError("bad output"), None),
+    ],
+)
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after-ms": "soon", "retry-after": "7"}, 7.0),
+        ({"retry-after": "2.5"}, 2.5),
+        ({"retry-after": "soon"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(_status_error(429, headers)) == expected
+
+
+def test_retry_after_http_date():
+    header = formatdate(time.time() + 30, usegmt=True)
+
+    assert 25 <= retry_after_seconds(_status_error(429, {"retry-after": header})) <= 30
+    assert retry_after_seconds(APIConnectionError(request=_REQUEST)) is None
+
+
+def test_backoff_honours_retry_after_up_to_max_delay_and_jitters_otherwise(monkeypatch):
+    policy = RetryPolicy(base_delay=2, max_delay=10)
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+
+    assert policy.backoff(1, _status_error(429, {"retry-after": "4"})) == 4
+    assert policy.backoff(1, _status_error(429, {"retry-after": "120"})) == 10
+    assert [policy.backoff(attempt, _status_error(529)) for attempt in (1, 2, 3, 4)] == [2, 4, 8, 10]
+
+
+class _Failing:
+    """Raise the given errors in turn, then return "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(retry.time, "sleep", slept.append)
+    return slept
+
+
+def test_each_error_class_has_its_own_budget(sleeps):
+    policy = RetryPolicy(budgets={"overloaded": 2, "rate_limited": 1}, base_delay=0)
+    fn = _Failing(_status_error(529), _status_error(429), _status_error(529))
+
+    assert policy.call(fn) == "ok"
+    assert fn.calls == 4
+    assert len(sleeps) == 3
+
+
+def test_gives_up_once_a_budget_is_spent(sleeps):
+    policy = RetryPolicy(budgets={"overloaded": 2}, base_delay=0)
+    fn = _Failing(*[_status_error(529) for _ in range(5)])
+
+    with pytest.raises(APIStatusError):
+        policy.call(fn)
+    assert fn.calls == 3
+
+
+def test_errors_that_are_not_transient_are_not_retried(sleeps):
+    fn = _Failing(_status_error(400))
+
+    with pytest.raises(APIStatusError):
+        RetryPolicy(base_delay=0).call(fn)
+    assert fn.calls == 1
+    assert sleeps == []
+
+
+def test_gives_up_when_the_wait_would_pass_the_deadline(sleeps):
+    policy = RetryPolicy(deadline=5)
+    fn = _Failing(_status_error(429, {"retry-after": "30"}))
+
+    with pytest.raises(APIStatusError):
+        policy.call(fn)
+    assert fn.calls == 1
+    assert sleeps == []
+
+
+@pytest.fixture
+def no_wait(monkeypatch):
+    monkeypatch.setattr(ai_engine, "retry_policy", RetryPolicy(base_delay=0))
+
+
+def _client(server: FakeStreamServer) -> Anthropic:
+    return Anthropic(api_key="test-key", base_url=server.base_url, max_retries=0)
+
+
+def test_overloaded_error_event_in_a_tool_stream_is_retried(no_wait):
+    responses = [
+        tool_events(TENDER_TOOL["name"], ['{"tender_title": "Con'], fail_with="overloaded_error"),
+        tool_events(TENDER_TOOL["name"], ['{"tender_title": "Control Valves"}']),
+    ]
+    with FakeStreamServer(responses) as server:
+        result = ai_engine._stream_tool_call(
+            _client(server),
+            use_cache=False,
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=1024,
+            tools=[TENDER_TOOL],
+            tool_choice={"type": "tool", "name": TENDER_TOOL["name"]},
+            messages=[{"role": "user", "content": "Tender"}],
+        )
+
+    assert result == {"tender_title": "Control Valves"}
+    assert len(server.requests) == 2
+
+
+def test_error_event_before_any_text_is_retried(no_wait):
+    responses = [error_events("rate_limit_error"), text_events(["Alpha ", "leads"])]
+    with FakeStreamServer(responses) as server:
+        stream = ai_engine._stream_text(
+            _client(server),
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=1024,
+            messages=[{"role": "user", "content": "Who leads?"}],
+        )
+        text = "".join(stream)
+
+    assert text == "Alpha leads"
+    assert len(server.requests) == 2
+
+
+def test_fields_of_a_retried_stream_are_reported_once(no_wait):
+    responses = [
+        tool_events(TENDER_TOOL["name"], ['{"tender_title": "Control Valves", "issuing'], fail_with="api_error"),
+        tool_events(TENDER_TOOL["name"], ['{"tender_title": "Control Valves", "issuing_organization": "Borouge"}']),
+    ]
+    fields = []
+    with FakeStreamServer(responses) as server:
+        ai_engine._stream_tool_call(
+            _client(server),
+            on_field=lambda path, value: fields.append(path),
+            use_cache=False,
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=1024,
+            tools=[TENDER_TOOL],
+            tool_choice={"type": "tool", "name": TENDER_TOOL["name"]},
+            messages=[{"role": "user", "content": "Tender"}],
+        )
+
+    assert fields == [("tender_title",), ("issuing_organization",)]
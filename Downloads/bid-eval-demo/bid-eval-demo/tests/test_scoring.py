@@ -0,0 +1,89 @@
+"""Local re-scoring of evaluations when criterion weights change."""
+
+import pytest
+
+from utils.scoring import as_score, criterion_matrix, overall_scores, rescore_evaluations
+
+CRITERIA = [
+    {"criterion": "Technical Capability", "weight_percentage": 60, "category": "technical"},
+    {"criterion": "Price", "weight_percentage": 40, "category": "commercial"},
+]
+
+
+def _evaluation(name, technical, price, overall=50):
+    return {
+        "supplier_name": name,
+        "overall_score": overall,
+        "category_scores": {"technical": {"score": 0, "summary": "Kept"}},
+        "criterion_scores": [
+            {"criterion": "Technical Capability", "score": technical},
+            {"criterion": "Price", "score": price},
+        ],
+    }
+
+
+@pytest.mark.parametrize("value, expected", [(72, 72.0), ("65.5", 65.5), (None, 0.0), ("n/a", 0.0), ([], 0.0)])
+def test_as_score(value, expected):
+    assert as_score(value) == expected
+
+
+def test_overall_and_category_scores_follow_the_weights():
+    (rescored,) = rescore_evaluations([_evaluation("Alpha", 90, 40)], CRITERIA)
+
+    assert rescored["overall_score"] == 70.0
+    assert rescored["category_scores"]["technical"] == {"score": 90.0, "summary": "Kept"}
+    assert rescored["category_scores"]["commercial"] == {"score": 40.0}
+
+
+def test_weights_are_renormalised_over_the_criteria_a_supplier_was_scored_on():
+    evaluation = _evaluation("Alpha", 90, 40)
+    evaluation["criterion_scores"] = evaluation["criterion_scores"][:1]
+    criteria = [dict(c, weight_percentage=w) for c, w in zip(CRITERIA, (30, 30))]
+
+    assert overall_scores([evaluation], criteria).tolist() == [90.0]
+
+
+def test_non_numeric_scores_count_as_zero_and_missing_criteria_are_skipped():
+    evaluations = [_evaluation("Alpha", "not scored", 80), {"supplier_name": "Beta", "overall_score": 64}]
+
+    scores, present = criterion_matrix(evaluations, CRITERIA)
+
+    assert scores.tolist() == [[0.0, 80.0], [0.0, 0.0]]
+    assert present.tolist() == [[True, True], [False, False]]
+    # Beta has no criterion scores at all and keeps its reported overall score
+    assert overall_scores(evaluations, CRITERIA).tolist() == [32.0, 64.0]
+
+
+def test_criteria_in_an_unknown_category_count_only_towards_the_overall_score():
+    criteria = CRITERIA + [{"criterion": "Local content", "weight_percentage": 50, "category": "social"}]
+    evaluation = _evaluation("Alpha", 90, 40)
+    evaluation["criterion_scores"].append({"criterion": "Local content", "score": 100})
+
+    (rescored,) = rescore_evaluations([evaluation], criteria)
+
+    assert rescored["overall_score"] == 80.0
+    assert rescored["category_scores"]["technical"]["score"] == 90.0
+    assert rescored["category_scores"]["commercial"]["score"] == 40.0
+    assert "social" not in rescored["category_scores"]
+
+
+def test_changing_weights_changes_the_ranking():
+    evaluations = [_evaluation("Alpha", 90, 40), _evaluation("Beta", 60, 95)]
+
+    def ranking(weights):
+        criteria = [dict(c, weight_percentage=w) for c, w in zip(CRITERIA, weights)]
+        rescored = rescore_evaluations(evaluations, criteria)
+        return [e["supplier_name"] for e in sorted(rescored, key=lambda e: e["overall_score"], reverse=True)]
+
+    assert ranking((60, 40)) == ["Beta", "Alpha"]
+    assert ranking((90, 10)) == ["Alpha", "Beta"]
+    # The stored evaluations are left as they were
+    assert evaluations[0]["overall_score"] == 50
+
+
+def test_negative_and_missing_weights_are_ignored():
+    criteria = [dict(CRITERIA[0], weight_percentage=-20), dict(CRITERIA[1], weight_percentage=None)]
+
+    (rescored,) = rescore_evaluations([_evaluation("Alpha", 90, 40, overall=77)], criteria)
+
+    assert rescored["overall_score"] == 77
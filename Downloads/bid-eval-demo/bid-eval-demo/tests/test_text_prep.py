@@ -0,0 +1,49 @@
+"""Header, footer and boilerplate removal before prompting."""
+
+from utils.text_prep import PAGE_BREAK, strip_boilerplate
+
+
+def _page(number: int, body: list) -> str:
+    header = ["ACME Valves - Technical Proposal"]
+    footer = ["Copyright 2024 ACME Ltd. All rights reserved.", f"Page {number} of 5"]
+    return "\n".join(header + body + footer)
+
+
+def test_table_values_in_the_middle_of_a_page_are_kept():
+    table = ["Item | Size | Support", "Gate valve", "1/2", "24/7", "Ball valve", "3", "24/7"]
+    pages = [
+        _page(n, [f"Scope of lot {lot}", f"Lot {lot} items"] + table + [f"Delivery to site {lot}", f"Payment {lot}"])
+        for n, lot in enumerate("ABCDE", 1)
+    ]
+
+    text, report = strip_boilerplate(pages)
+    first = text.split(PAGE_BREAK)[0].splitlines()
+
+    assert first == [
+        "Scope of lot A",
+        "Lot A items",
+        "Item | Size | Support",
+        "Gate valve",
+        "1/2",
+        "24/7",
+        "Ball valve",
+        "3",
+        "24/7",
+        "Delivery to site A",
+        "Payment A",
+    ]
+    assert report["lines_removed"] == 15
+
+
+def test_copyright_is_kept_outside_the_header_and_footer():
+    body = ["Scope", "Copyright of drawings passes to the client on payment.", "Warranty 24 months", "Lead time 8 weeks"]
+    text, _ = strip_boilerplate(["\n".join(["Cover"] + body + ["1 of 1"])])
+
+    assert text.splitlines() == ["Cover"] + body
+
+
+def test_page_numbers_out_of_step_with_the_page_are_kept():
+    pages = ["Heading\nBody text\n3/4", "Heading two\nMore text\n7 of 9", "Heading three\nLast text\n3"]
+    text, _ = strip_boilerplate(pages)
+
+    assert [page.splitlines()[-1] for page in text.split(PAGE_BREAK)] == ["3/4", "7 of 9", "Last text"]
@@ -4,13 +4,34 @@ Airo Bid Evaluation Platform - Utility Modules
 This package contains core utilities for:
 - Session state management
 - PDF document parsing
-- Claude API integration
+- Prompt-size reduction of extracted text
+- On-disk caching
+- Structured-output schemas for Claude responses
+- Incremental parsing of streamed JSON
+- BM25 passage retrieval over bid text
+- Local re-scoring under changed criterion weights
+- Local query tools for the chat assistant
+- Bounded chat history with a running summary
+- Local answers to the chat quick actions
+- Shared cache of chat answers
+- Claude API integration and retry policy
 - PDF report generation
 """
 
 from . import state
+from . import cache
 from . import pdf_parser
+from . import text_prep
+from . import retry
+from . import schemas
+from . import json_stream
+from . import retrieval
+from . import scoring
+from . import chat_tools
+from . import local_answers
+from . import answer_cache
 from . import ai_engine
+from . import chat_history
 from . import report_gen
 
-__all__ = ["state", "pdf_parser", "ai_engine", "report_gen"]
+__all__ = ["state", "cache", "pdf_parser", "text_prep", "retry", "schemas", "json_stream", "retrieval", "scoring", "chat_tools", "local_answers", "answer_cache", "ai_engine", "chat_history", "report_gen"]
@@ -1,170 +1,1374 @@
+import contextvars
 import json
+import queue
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Optional, List, Callable, Generator, Iterator, Tuple, Union
 import streamlit as st
-from anthropic import Anthropic, APIError
+from anthropic import (
+    DEFAULT_CONNECTION_LIMITS,
+    Anthropic,
+    AsyncAnthropic,
+    APIError,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    Timeout,
+)
+from anthropic.types import Message
 import os
+from utils.cache import CACHE_DIR, DiskCache, make_key
+from utils.chat_tools import CHAT_TOOLS, build_chat_index, run_chat_tool
+from utils.json_stream import JsonStreamParser
+from utils.retrieval import build_index
+from utils.retry import default_policy as retry_policy, get_retry_stats
+from utils.schemas import (
+    EVALUATION_TOOL,
+    EVIDENCE_TOOL,
+    EVIDENCE_TOPICS,
+    TENDER_TOOL,
+    expand_evaluation,
+    expand_field,
+    validate_evaluation,
+    validate_tender_data,
+)
+from utils.text_prep import PAGE_BREAK, estimate_tokens, split_into_chunks
 
+# Upper bound on bids evaluated at the same time by evaluate_supplier_bids
+MAX_CONCURRENT_EVALUATIONS = int(os.getenv("BID_EVAL_MAX_CONCURRENCY", "5"))
 
-def get_client() -> Anthropic:
-    """Get Anthropic client with API key."""
+# Follow-up requests allowed when a structured response is cut off at max_tokens
+MAX_CONTINUATIONS = int(os.getenv("BID_EVAL_MAX_CONTINUATIONS", "2"))
+
+# Bids estimated above this many tokens are evaluated chunk by chunk (map-reduce)
+CHUNKED_EVAL_MIN_TOKENS = int(os.getenv("BID_EVAL_CHUNKED_MIN_TOKENS", "150000"))
+CHUNK_TOKENS = int(os.getenv("BID_EVAL_CHUNK_TOKENS", "40000"))
+MAX_CHUNK_CONCURRENCY = int(os.getenv("BID_EVAL_CHUNK_CONCURRENCY", "4"))
+# Evidence lines kept per criterion, requirement or topic in a condensed bid
+MAX_EVIDENCE_PER_KEY = 12
+# Bids estimated above this many tokens (up to CHUNKED_EVAL_MIN_TOKENS) are sent as retrieved passages
+RETRIEVAL_MIN_TOKENS = int(os.getenv("BID_EVAL_RETRIEVAL_MIN_TOKENS", "30000"))
+RETRIEVAL_TOP_K = int(os.getenv("BID_EVAL_RETRIEVAL_TOP_K", "4"))
+
+# Retrieval queries for facts every evaluation needs, besides the tender's criteria and requirements
+TOPIC_QUERIES = {
+    "INFO": "company name supplier registered address contact bid reference",
+    "PRICE": "price total cost amount fee currency payment",
+    "TIME": "timeline schedule programme delivery duration weeks months milestones",
+    "HSE": "health safety environment HSE incident policy",
+    "ESG": "ESG sustainability environmental social governance carbon",
+    "ISO": "ISO certification certified accreditation 9001 14001 45001",
+    "RISK": "risk assumption exclusion deviation limitation",
+}
+
+# Tool-use rounds allowed per chat turn before the assistant must answer
+MAX_CHAT_TOOL_ROUNDS = int(os.getenv("BID_EVAL_CHAT_TOOL_ROUNDS", "6"))
+
+# Output limit for the running summary of older chat turns
+CHAT_SUMMARY_MAX_TOKENS = 600
+
+# Message Batches: submitted batches are recorded here so a restarted app can collect them
+BATCH_DIR = CACHE_DIR / "batches"
+# Seconds before the first batch status check, and the most to wait between checks
+BATCH_POLL_INITIAL = float(os.getenv("BID_EVAL_BATCH_POLL_INITIAL", "10"))
+BATCH_POLL_MAX = float(os.getenv("BID_EVAL_BATCH_POLL_MAX", "300"))
+
+# Responses for identical requests are served from disk; BID_EVAL_LLM_CACHE=0 bypasses it
+llm_cache = DiskCache(
+    "llm_responses",
+    max_bytes=int(os.getenv("BID_EVAL_LLM_CACHE_MB", "256")) * 1024 * 1024,
+    max_age_seconds=float(os.getenv("BID_EVAL_LLM_CACHE_DAYS", "30")) * 86400,
+    enabled=os.getenv("BID_EVAL_LLM_CACHE", "1") != "0",
+)
+
+
+# Connection pool and timeout settings shared by every Claude client
+HTTP_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("ANTHROPIC_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.getenv("ANTHROPIC_TIMEOUT", "600"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("ANTHROPIC_CONNECT_TIMEOUT", "10"))
+# The SDK's own pool limits type; its HTTP library differs between anthropic releases
+_Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+# Process-wide clients keyed by (api_key, base_url, is_async) so connections are reused
+_clients: Dict[Tuple[str, Optional[str], bool], Union[Anthropic, AsyncAnthropic]] = {}
+_clients_lock = threading.Lock()
+
+
+def _resolve_api_key(api_key: Optional[str] = None) -> str:
+    """Return the given API key, or the session/environment key."""
     from utils.state import get_api_key
 
-    api_key = get_api_key()
+    if not api_key:
+        api_key = get_api_key()
     if not api_key:
         api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY not found in environment or session")
-    return Anthropic(api_key=api_key)
+    return api_key
+
+
+def _get_pooled_client(api_key: str, base_url: Optional[str], is_async: bool):
+    """Return the shared client for this key and endpoint, creating it once."""
+    base_url = base_url or os.getenv("ANTHROPIC_BASE_URL") or None
+    key = (api_key, base_url, is_async)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            limits = _Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            )
+            timeout = Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+            # Retries are handled by utils.retry, not the SDK
+            if is_async:
+                client = AsyncAnthropic(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=timeout,
+                    max_retries=0,
+                    http_client=DefaultAsyncHttpxClient(limits=limits, timeout=timeout),
+                )
+            else:
+                client = Anthropic(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=timeout,
+                    max_retries=0,
+                    http_client=DefaultHttpxClient(limits=limits, timeout=timeout),
+                )
+            _clients[key] = client
+        return client
+
+
+def get_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> Anthropic:
+    """
+    Get the shared Anthropic client for an API key.
+
+    Clients are created once per (API key, base URL) and keep their HTTP
+    connection pool alive, so repeated calls skip connection and TLS setup.
+
+    Args:
+        api_key: API key to use (defaults to the session or environment key)
+        base_url: API endpoint (defaults to ANTHROPIC_BASE_URL or Anthropic's API)
+
+    Returns:
+        Pooled synchronous client
+    """
+    return _get_pooled_client(_resolve_api_key(api_key), base_url, is_async=False)
+
+
+def get_async_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncAnthropic:
+    """
+    Get the shared AsyncAnthropic client for an API key.
+
+    Args:
+        api_key: API key to use (defaults to the session or environment key)
+        base_url: API endpoint (defaults to ANTHROPIC_BASE_URL or Anthropic's API)
+
+    Returns:
+        Pooled asynchronous client
+    """
+    return _get_pooled_client(_resolve_api_key(api_key), base_url, is_async=True)
+
+
+class RateGovernor:
+    """
+    Process-wide token-bucket admission control for Claude requests.
+
+    Every Streamlit session shares the organisation's requests-, input-token-
+    and output-token-per-minute limits. Requests wait in per-session queues
+    that are served round-robin, so one officer's batch cannot starve
+    another session's single call. Output tokens are charged at max_tokens up
+    front and reconciled with actual usage when the response arrives.
+    """
+
+    def __init__(self, requests_per_minute: int, input_tokens_per_minute: int, output_tokens_per_minute: int):
+        self.capacity = {
+            "requests": float(requests_per_minute),
+            "input_tokens": float(input_tokens_per_minute),
+            "output_tokens": float(output_tokens_per_minute),
+        }
+        self.level = dict(self.capacity)
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+        # session id -> queue of waiting tickets; order of keys is the round-robin order
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        for name, capacity in self.capacity.items():
+            self.level[name] = min(capacity, self.level[name] + capacity * elapsed / 60)
+
+    def _schedule(self) -> List[Dict[str, Any]]:
+        """Waiting tickets in the order they will be admitted (round-robin across sessions)."""
+        order = []
+        queues = [list(queue) for queue in self._queues.values()]
+        depth = 0
+        while True:
+            layer = [queue[depth] for queue in queues if depth < len(queue)]
+            if not layer:
+                return order
+            order.extend(layer)
+            depth += 1
+
+    def _seconds_until(self, cost: Dict[str, float]) -> float:
+        """Time until the buckets hold at least cost."""
+        return max(
+            max(0.0, cost[name] - self.level[name]) * 60 / self.capacity[name]
+            for name in self.capacity
+        )
+
+    def acquire(self, session_id: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+        """
+        Block until the request may be sent.
+
+        Args:
+            session_id: Identifies the caller's session for fair queuing
+            input_tokens: Estimated input tokens of the request
+            output_tokens: Output tokens to reserve (max_tokens)
+
+        Returns:
+            Ticket to pass to settle() once the response is known
+        """
+        cost = {"requests": 1.0, "input_tokens": float(input_tokens), "output_tokens": float(output_tokens)}
+        # A request larger than a whole minute's budget still goes through once the bucket is full
+        cost = {name: min(value, self.capacity[name]) for name, value in cost.items()}
+        ticket = {"session_id": session_id, "cost": cost}
+
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            while True:
+                self._refill()
+                if self._schedule()[0] is ticket and self._seconds_until(cost) == 0:
+                    for name, value in cost.items():
+                        self.level[name] -= value
+                    queue = self._queues[session_id]
+                    queue.popleft()
+                    # The served session goes to the back of the round-robin order
+                    del self._queues[session_id]
+                    if queue:
+                        self._queues[session_id] = queue
+                    self._cond.notify_all()
+                    return ticket
+                self._cond.wait(timeout=min(1.0, max(0.05, self._seconds_until(self._schedule()[0]["cost"]))))
+
+    def settle(self, ticket: Dict[str, Any], input_tokens: int, output_tokens: int):
+        """Correct the buckets for the tokens a request actually used."""
+        with self._cond:
+            self._refill()
+            for name, actual in (("input_tokens", input_tokens), ("output_tokens", output_tokens)):
+                refund = ticket["cost"][name] - actual
+                self.level[name] = min(self.capacity[name], self.level[name] + refund)
+            self._cond.notify_all()
+
+    def status(self, session_id: str) -> Optional[Tuple[int, float]]:
+        """
+        Queue position and estimated wait for a session's next request.
+
+        Args:
+            session_id: Session to report on
+
+        Returns:
+            (1-based position among all waiting requests, estimated seconds),
+            or None if the session has nothing queued
+        """
+        with self._cond:
+            self._refill()
+            ahead = {name: 0.0 for name in self.capacity}
+            for position, ticket in enumerate(self._schedule(), 1):
+                for name in ahead:
+                    ahead[name] += ticket["cost"][name]
+                if ticket["session_id"] == session_id:
+                    return position, self._seconds_until(ahead)
+        return None
+
+
+# Shared by every session in this process; set limits to the organisation's API tier
+rate_governor = RateGovernor(
+    requests_per_minute=int(os.getenv("ANTHROPIC_RPM_LIMIT", "1000")),
+    input_tokens_per_minute=int(os.getenv("ANTHROPIC_ITPM_LIMIT", "450000")),
+    output_tokens_per_minute=int(os.getenv("ANTHROPIC_OTPM_LIMIT", "90000")),
+)
+
+# Session the current request is made on behalf of (carried into worker threads)
+_session_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("session_id", default=None)
+
+
+def _current_session_id() -> str:
+    """Identify the Streamlit session making a request, for fair queuing."""
+    session_id = _session_id.get()
+    if session_id:
+        return session_id
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return "default"
+
+
+def get_queue_status(session_id: Optional[str] = None) -> Optional[Tuple[int, float]]:
+    """Return (queue position, estimated wait seconds) for a session, or None if not queued."""
+    return rate_governor.status(session_id or _current_session_id())
+
+
+def _estimate_input_tokens(request: Dict[str, Any]) -> int:
+    """Rough input token count of a messages request, for rate limiting."""
+    return estimate_tokens(
+        json.dumps([request.get("system"), request.get("messages"), request.get("tools")], default=str)
+    )
+
+
+# Token usage of every completed Claude call in this process, for monitoring
+_usage: Dict[str, int] = {
+    "requests": 0,
+    "input_tokens": 0,
+    "output_tokens": 0,
+    "cache_creation_input_tokens": 0,
+    "cache_read_input_tokens": 0,
+}
+_usage_lock = threading.Lock()
+
+
+def _record_usage(usage: Any):
+    """Add a finished call's token usage to the usage counters."""
+    cache_write = usage.cache_creation_input_tokens or 0
+    cache_read = usage.cache_read_input_tokens or 0
+    with _usage_lock:
+        _usage["requests"] += 1
+        _usage["input_tokens"] += usage.input_tokens
+        _usage["output_tokens"] += usage.output_tokens
+        _usage["cache_creation_input_tokens"] += cache_write
+        _usage["cache_read_input_tokens"] += cache_read
+
+
+def _settle_usage(ticket: Dict[str, Any], usage: Any):
+    """Charge a finished call's actual usage to the rate governor and the usage counters."""
+    # Cache reads do not count towards the input-tokens-per-minute limit
+    rate_governor.settle(ticket, usage.input_tokens + (usage.cache_creation_input_tokens or 0), usage.output_tokens)
+    _record_usage(usage)
+
 
+def get_usage_stats() -> Dict[str, int]:
+    """Return token usage counters for this process, including prompt cache reads and writes."""
+    with _usage_lock:
+        return dict(_usage)
 
-def extract_tender_data(tender_text: str) -> Dict[str, Any]:
+
+def _admitted_create(client: Anthropic, session_id: str, request: Dict[str, Any]) -> Message:
+    """Send one messages.create request once the rate governor admits it."""
+    ticket = rate_governor.acquire(session_id, _estimate_input_tokens(request), request.get("max_tokens", 0))
+    try:
+        message = client.messages.create(**request)
+    except Exception:
+        # Failed requests are charged for the request slot only
+        rate_governor.settle(ticket, 0, 0)
+        raise
+    _settle_usage(ticket, message.usage)
+    return message
+
+
+def _create_message(client: Anthropic, use_cache: bool = True, **request) -> Message:
+    """
+    Call messages.create, serving repeat requests from the response cache.
+
+    The cache key covers the whole request (model, system prompt, messages and
+    max_tokens), so any change to the input or prompt is a miss. Each attempt
+    is admitted by the shared rate governor, and transient API errors (429,
+    529, 5xx, connection failures) are retried with backoff.
+
+    Args:
+        client: Anthropic client
+        use_cache: Set False to always call the API and skip storing the result
+        request: Keyword arguments for messages.create
+
+    Returns:
+        The API message
+    """
+    key = make_key("messages.create", request)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return Message.model_validate_json(cached)
+
+    message = retry_policy.call(_admitted_create, client, _current_session_id(), request)
+
+    # Truncated responses are not worth replaying
+    if use_cache and message.stop_reason != "max_tokens":
+        llm_cache.set(key, message.model_dump_json().encode("utf-8"))
+    return message
+
+
+def _open_stream(client: Anthropic, session_id: str, request: Dict[str, Any]):
+    """Open a messages stream once the rate governor admits it; returns (manager, stream, ticket)."""
+    ticket = rate_governor.acquire(session_id, _estimate_input_tokens(request), request.get("max_tokens", 0))
+    manager = client.messages.stream(**request)
+    try:
+        stream = manager.__enter__()
+    except Exception:
+        rate_governor.settle(ticket, 0, 0)
+        raise
+    return manager, stream, ticket
+
+
+def _open_text_stream(client: Anthropic, session_id: str, request: Dict[str, Any]):
+    """
+    Open a messages stream and wait for its first text delta.
+
+    Errors the API sends as stream events before any text (e.g. an overload)
+    are raised from here, inside the retry policy, rather than mid-answer.
+    Returns (manager, stream, ticket, remaining text deltas, first delta or None).
+    """
+    manager, stream, ticket = _open_stream(client, session_id, request)
+    texts = stream.text_stream
+    try:
+        first = next(texts, None)
+    except Exception:
+        rate_governor.settle(ticket, 0, 0)
+        manager.__exit__(None, None, None)
+        raise
+    return manager, stream, ticket, texts, first
+
+
+def _stream_text(client: Anthropic, **request) -> Generator[str, None, Message]:
+    """
+    Stream the text of a Claude response as it is generated.
+
+    Opening the stream goes through the rate governor and retry policy,
+    up to the first text delta; errors after the first token are not
+    retried. Closing the generator early closes the HTTP response, which
+    stops generation.
+
+    Args:
+        client: Anthropic client
+        request: Keyword arguments for messages.stream
+
+    Yields:
+        Text deltas
+
+    Returns:
+        The final message (e.g. to inspect stop_reason), as the generator's return value
+    """
+    manager, stream, ticket, texts, first = retry_policy.call(
+        _open_text_stream, client, _current_session_id(), request
+    )
+    settled = False
+    try:
+        if first is not None:
+            yield first
+        for text in texts:
+            yield text
+        message = stream.get_final_message()
+        _settle_usage(ticket, message.usage)
+        settled = True
+    finally:
+        if not settled:
+            # Cancelled or failed mid-stream: keep the reservation as charged
+            rate_governor.settle(ticket, ticket["cost"]["input_tokens"], ticket["cost"]["output_tokens"])
+        manager.__exit__(None, None, None)
+    return message
+
+
+def _tool_input(message: Message, tool_name: str) -> Dict[str, Any]:
+    """
+    Return the arguments Claude passed to a forced tool call.
+
+    Args:
+        message: API response to a request made with tool_choice set to tool_name
+        tool_name: Name of the tool Claude was required to call
+
+    Returns:
+        The tool input as a dictionary
+    """
+    for block in message.content:
+        if block.type == "tool_use" and block.name == tool_name:
+            return block.input
+    if message.stop_reason == "max_tokens":
+        raise ValueError("Claude response was cut off before the structured output was complete")
+    raise ValueError(f"Claude did not return structured output ({tool_name})")
+
+
+def _admitted_tool_stream(
+    client: Anthropic,
+    session_id: str,
+    request: Dict[str, Any],
+    on_field: Optional[Callable[[Tuple, Any], None]],
+    prefix: str = "",
+) -> Tuple[Message, JsonStreamParser]:
+    """
+    Stream one tool call (or its continuation) through a fresh parser.
+
+    prefix is JSON already received from earlier, truncated responses; it is
+    fed to the parser first so the continuation's text is stitched onto it.
+    """
+    manager, stream, ticket = _open_stream(client, session_id, request)
+    parser = JsonStreamParser()
+    parser.feed(prefix)
+    settled = False
+    try:
+        for event in stream:
+            if event.type != "content_block_delta":
+                continue
+            if event.delta.type == "input_json_delta":
+                chunk = event.delta.partial_json
+            elif event.delta.type == "text_delta" and prefix:
+                chunk = event.delta.text
+            else:
+                continue
+            for path, value in parser.feed(chunk):
+                if on_field:
+                    on_field(path, value)
+        message = stream.get_final_message()
+        _settle_usage(ticket, message.usage)
+        settled = True
+    finally:
+        if not settled:
+            rate_governor.settle(ticket, ticket["cost"]["input_tokens"], ticket["cost"]["output_tokens"])
+        manager.__exit__(None, None, None)
+    return message, parser
+
+
+def _continuation_request(request: Dict[str, Any], partial_json: str) -> Dict[str, Any]:
+    """
+    Build a request that resumes a tool call cut off by max_tokens.
+
+    The JSON generated so far (without trailing whitespace, which a prefill
+    may not end in) is prefilled as the assistant turn and tool use is
+    switched off, so Claude carries on writing the same JSON as text.
+    The tools stay in the request so the cached prompt prefix still matches.
+    """
+    instruction = (
+        "Your previous reply was cut off. Continue the JSON exactly where it stops. "
+        "Output only the remaining JSON, with no repetition and no other text."
+    )
+    system = request.get("system")
+    if isinstance(system, list):
+        system = system + [{"type": "text", "text": instruction}]
+    else:
+        system = f"{system}\n\n{instruction}" if system else instruction
+    return {
+        "model": request["model"],
+        "max_tokens": request["max_tokens"],
+        "system": system,
+        "tools": request["tools"],
+        "tool_choice": {"type": "none"},
+        "messages": request["messages"] + [{"role": "assistant", "content": partial_json}],
+    }
+
+
+def _stream_tool_call(
+    client: Anthropic,
+    on_field: Optional[Callable[[Tuple, Any], None]] = None,
+    use_cache: bool = True,
+    **request,
+) -> Dict[str, Any]:
+    """
+    Make a forced tool call, reporting fields of its input as they are generated.
+
+    If the response stops at max_tokens, up to MAX_CONTINUATIONS follow-up
+    requests resume the JSON from where it was cut off and the pieces are
+    stitched together. Output still incomplete after that is repaired locally
+    rather than discarded. Complete results are cached, and a cached result
+    is replayed through the parser so on_field still sees every field.
+    Fields already reported by an attempt that failed and was retried are
+    not reported again.
+
+    Args:
+        client: Anthropic client
+        on_field: Called with (path, value) as each field completes
+        use_cache: Set False to always call the API and skip storing the result
+        request: Keyword arguments for messages.stream, including tool_choice
+
+    Returns:
+        The tool input as a dictionary
+    """
+    tool_name = request["tool_choice"]["name"]
+    key = make_key("tool_call", request)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            for path, value in JsonStreamParser().feed(cached.decode("utf-8")):
+                if on_field:
+                    on_field(path, value)
+            return json.loads(cached)
+
+    report_field = None
+    if on_field:
+        reported = set()
+
+        def report_field(path: Tuple, value: Any):
+            # A retried attempt streams the same fields again from the start
+            if path not in reported:
+                reported.add(path)
+                on_field(path, value)
+
+    session_id = _current_session_id()
+    message, parser = retry_policy.call(_admitted_tool_stream, client, session_id, request, report_field)
+
+    continuations = 0
+    while message.stop_reason == "max_tokens" and continuations < MAX_CONTINUATIONS and parser.text.strip():
+        continuations += 1
+        # The prefill may not end in whitespace; the parser resumes from exactly what was sent
+        partial_json = parser.text.rstrip()
+        message, parser = retry_policy.call(
+            _admitted_tool_stream,
+            client,
+            session_id,
+            _continuation_request(request, partial_json),
+            report_field,
+            partial_json,
+        )
+
+    if message.stop_reason == "max_tokens":
+        # Still incomplete: close what was generated instead of failing the call
+        return parser.finish()
+
+    tool_input = parser.finish() if continuations else _tool_input(message, tool_name)
+    if use_cache:
+        llm_cache.set(key, json.dumps(tool_input).encode("utf-8"))
+    return tool_input
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters and disk usage of the LLM response cache."""
+    return llm_cache.stats()
+
+
+def extract_tender_data(tender_text: str, use_cache: bool = True) -> Dict[str, Any]:
     """
     Extract structured tender/RFP data using Claude API.
 
+    Claude is required to answer through the record_tender tool, so the
+    response arrives as schema-shaped arguments rather than free text. A
+    response cut off at max_tokens is continued rather than failed.
+
     Args:
         tender_text: Full text extracted from tender document
+        use_cache: Reuse a cached response for an identical request
 
     Returns:
         Structured tender data as dictionary
     """
     client = get_client()
 
-    system_prompt = """Extract tender information from the document and return ONLY valid JSON (no other text).
-
-Return this exact JSON structure:
-{
-  "tender_title": "title or 'Not specified'",
-  "issuing_organization": "organization name or 'Not specified'",
-  "tender_reference": "reference number or 'Not specified'",
-  "submission_deadline": "deadline date or 'Not specified'",
-  "scope_of_work": "brief summary or 'Not specified'",
-  "evaluation_criteria": [
-    {"criterion": "name", "weight_percentage": 0, "category": "technical"}
-  ],
-  "mandatory_requirements": ["requirement 1", "requirement 2"],
-  "technical_specifications": ["spec 1", "spec 2"],
-  "commercial_requirements": ["term 1", "term 2"],
-  "compliance_requirements": ["requirement 1", "requirement 2"],
-  "deliverables": ["deliverable 1", "deliverable 2"],
-  "contract_duration": "duration or 'Not specified'"
-}
+    system_prompt = """Extract the tender information from the document and record it with the record_tender tool.
 
-IMPORTANT: Return ONLY the JSON, nothing else. No explanation, no markdown, just the JSON."""
+- Use "Not specified" for any text field the document does not state
+- Use empty lists where the document lists nothing
+- Give each evaluation criterion its weight as a percentage and its category"""
 
     try:
-        message = client.messages.create(
+        tender_data = _stream_tool_call(
+            client,
+            use_cache=use_cache,
             model="claude-sonnet-4-5-20250929",
             max_tokens=4096,
             system=system_prompt,
+            tools=[TENDER_TOOL],
+            tool_choice={"type": "tool", "name": TENDER_TOOL["name"]},
             messages=[{"role": "user", "content": tender_text}],
         )
+    except APIError as e:
+        raise ValueError(f"Claude API error: {str(e)}")
 
-        response_text = message.content[0].text
+    return validate_tender_data(tender_data)
 
-        # Strip markdown code fences if present
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-            response_text = response_text.strip()
 
-        print(f"DEBUG: Claude response: {response_text[:500]}")  # Print first 500 chars
-        tender_data = json.loads(response_text)
-        return tender_data
-    except APIError as e:
-        raise ValueError(f"Claude API error: {str(e)}")
-    except json.JSONDecodeError as e:
-        print(f"DEBUG: Failed to parse response: {response_text[:1000]}")  # Print for debugging
-        raise ValueError(f"Error parsing JSON response: {str(e)}")
+EVALUATION_INSTRUCTIONS = """Evaluate the supplier bid against the tender below and record the result with the record_evaluation tool.
+
+Rules:
+- Score every evaluation criterion and check every mandatory requirement, referring to each by its number (i)
+- Scores are 0-100
+- Status codes: C compliant, P partially, N non-compliant, U unclear
+- Flag codes: M met, P partially met, N not met, X not found
+- Keep text values short and factual, quoting the bid where it helps
+- Use empty lists if there are no items
+- Use "na" for values the bid does not state"""
+
+
+EVIDENCE_INSTRUCTIONS = """You are given one part of a long supplier bid. Record the evidence it contains with the record_evidence tool.
+
+- For each evaluation criterion (C<number>) and mandatory requirement (R<number>) this part addresses, record short quotes or precise paraphrases with their page number
+- Also record supplier identity (INFO), price (PRICE), timeline (TIME), HSE, ESG, ISO certifications (ISO) and risks or gaps (RISK) where stated
+- Record nothing for topics this part does not cover"""
+
+
+def _numbered(items: List[str]) -> str:
+    """Format items as a 1-based numbered list for the prompt."""
+    if not items:
+        return "(none given)"
+    return "\n".join(f"{number}. {item}" for number, item in enumerate(items, 1))
+
+
+def _tender_context(tender_data: Optional[Dict[str, Any]], criterion_names: List[str], requirements: List[str]) -> str:
+    """
+    Render the tender facts a bid is evaluated against as a compact prompt block.
+
+    Weights are deliberately left out: they are applied locally, and keeping
+    them out means adjusting them does not change the prompt.
+    """
+    tender_data = tender_data or {}
+    categories = {
+        str(c.get("criterion")): c.get("category", "") for c in tender_data.get("evaluation_criteria", []) or []
+    }
+    lines = [
+        f"Tender: {tender_data.get('tender_title', 'Not specified')} "
+        f"({tender_data.get('issuing_organization', 'Not specified')}, "
+        f"ref {tender_data.get('tender_reference', 'Not specified')})",
+        f"Scope: {tender_data.get('scope_of_work', 'Not specified')}",
+        "",
+        "Evaluation criteria:",
+        _numbered([f"{name} [{categories[name]}]" if categories.get(name) else name for name in criterion_names]),
+        "",
+        "Mandatory requirements:",
+        _numbered(requirements),
+    ]
+    for title, key in [
+        ("Technical specifications", "technical_specifications"),
+        ("Commercial requirements", "commercial_requirements"),
+        ("Compliance requirements", "compliance_requirements"),
+    ]:
+        items = tender_data.get(key) or []
+        if items:
+            lines += ["", f"{title}:"] + [f"- {item}" for item in items]
+    return "\n".join(lines)
+
+
+def _criteria_and_requirements(
+    tender_data: Optional[Dict[str, Any]], criteria: List[Dict[str, Any]]
+) -> Tuple[List[str], List[str]]:
+    """Return the criterion names and mandatory requirements, in the order they are numbered in prompts."""
+    criterion_names = [str(c.get("criterion", "")) for c in criteria or [] if c.get("criterion")]
+    requirements = [str(r) for r in (tender_data or {}).get("mandatory_requirements", []) or []]
+    return criterion_names, requirements
+
+
+def _extract_chunk_evidence(
+    client: Anthropic,
+    chunk: Dict[str, Any],
+    tender_data: Optional[Dict[str, Any]],
+    criterion_names: List[str],
+    requirements: List[str],
+    use_cache: bool,
+) -> List[Dict[str, Any]]:
+    """Ask Claude for the evidence in one chunk of a long bid (the map step)."""
+    request = {
+        "model": "claude-sonnet-4-5-20250929",
+        "max_tokens": 4096,
+        "system": [
+            {"type": "text", "text": EVIDENCE_INSTRUCTIONS},
+            {
+                "type": "text",
+                "text": _tender_context(tender_data, criterion_names, requirements),
+                "cache_control": {"type": "ephemeral"},
+            },
+        ],
+        "tools": [EVIDENCE_TOOL],
+        "tool_choice": {"type": "tool", "name": EVIDENCE_TOOL["name"]},
+        "messages": [{"role": "user", "content": chunk["text"]}],
+    }
+    result = _stream_tool_call(client, use_cache=use_cache, **request)
+    return [item for item in result.get("ev") or [] if isinstance(item, dict) and item.get("q")]
+
+
+def _condense_evidence(
+    evidence: List[Dict[str, Any]], criterion_names: List[str], requirements: List[str], page_count: int
+) -> str:
+    """Group extracted evidence by criterion, requirement and topic into a compact bid summary."""
+    grouped: Dict[str, List[str]] = {}
+    for item in evidence:
+        key = str(item.get("k", "")).strip().upper()
+        line = f"- [p. {item.get('p', '?')}] {str(item['q']).strip()}"
+        lines = grouped.setdefault(key, [])
+        if line not in lines and len(lines) < MAX_EVIDENCE_PER_KEY:
+            lines.append(line)
+
+    numbered = [(f"C{n}", f"Criterion {n}: {name}") for n, name in enumerate(criterion_names, 1)]
+    numbered += [(f"R{n}", f"Requirement {n}: {text}") for n, text in enumerate(requirements, 1)]
+    sections = [("INFO", EVIDENCE_TOPICS["INFO"])] + numbered
+    sections += [(key, title) for key, title in EVIDENCE_TOPICS.items() if key != "INFO"]
+    known = {key for key, _ in sections}
+    sections += [(key, f"Other ({key})") for key in grouped if key not in known]
+    expected = {key for key, _ in numbered}
+
+    parts = [
+        f"This bid is {page_count} pages long, too long to send whole. Below is the evidence "
+        "extracted from it, grouped by criterion, requirement and topic, with page references. "
+        "A criterion or requirement with no evidence was not found in the bid."
+    ]
+    for key, title in sections:
+        if key in grouped:
+            parts.append(f"{title}\n" + "\n".join(grouped[key]))
+        elif key in expected:
+            parts.append(f"{title}\n- (no evidence found)")
+    return "\n\n".join(parts)
+
+
+def _condense_bid(
+    client: Anthropic,
+    bid_text: str,
+    tender_data: Optional[Dict[str, Any]],
+    criteria: List[Dict[str, Any]],
+    use_cache: bool,
+) -> str:
+    """
+    Reduce a bid too large for one request to the evidence it contains.
+
+    The bid is split into section-aware chunks of whole pages, evidence is
+    extracted from the chunks in parallel, and the evidence is condensed
+    into one text that the normal evaluation request can score.
+    """
+    criterion_names, requirements = _criteria_and_requirements(tender_data, criteria)
+    chunks = split_into_chunks(bid_text, CHUNK_TOKENS)
+
+    evidence_by_chunk: List[List[Dict[str, Any]]] = [[] for _ in chunks]
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_CHUNK_CONCURRENCY, len(chunks)))) as executor:
+        futures = {
+            executor.submit(
+                contextvars.copy_context().run,
+                _extract_chunk_evidence,
+                client,
+                chunk,
+                tender_data,
+                criterion_names,
+                requirements,
+                use_cache,
+            ): idx
+            for idx, chunk in enumerate(chunks)
+        }
+        for future, idx in futures.items():
+            evidence_by_chunk[idx] = future.result()
+
+    evidence = [item for items in evidence_by_chunk for item in items]
+    page_count = bid_text.count(PAGE_BREAK) + 1
+    return _condense_evidence(evidence, criterion_names, requirements, page_count)
+
+
+def _retrieve_bid_evidence(
+    bid_text: str, tender_data: Optional[Dict[str, Any]], criteria: List[Dict[str, Any]]
+) -> str:
+    """
+    Reduce a bid to the passages most relevant to each criterion, requirement and topic.
+
+    Passages come from a BM25 index over the bid's paragraphs. Each is
+    printed once with a page reference; later hits refer back to it by label.
+    The first passage (usually the cover page) is always included.
+    """
+    index = build_index(bid_text)
+    criterion_names, requirements = _criteria_and_requirements(tender_data, criteria)
+    categories = {
+        str(c.get("criterion")): c.get("category", "") for c in (tender_data or {}).get("evaluation_criteria", []) or []
+    }
+
+    queries = [("INFO", EVIDENCE_TOPICS["INFO"], TOPIC_QUERIES["INFO"])]
+    queries += [
+        (f"C{n}", f"Criterion {n}: {name}", f"{name} {categories.get(name, '')}")
+        for n, name in enumerate(criterion_names, 1)
+    ]
+    queries += [(f"R{n}", f"Requirement {n}: {text}", text) for n, text in enumerate(requirements, 1)]
+    queries += [(key, EVIDENCE_TOPICS[key], query) for key, query in TOPIC_QUERIES.items() if key != "INFO"]
+
+    page_count = bid_text.count(PAGE_BREAK) + 1
+    parts = [
+        f"This bid is {page_count} pages long. Below are the passages most relevant to each "
+        "criterion, requirement and topic, labelled [P<n>, p. <page>]. A criterion or requirement "
+        "with no relevant passage was not found in the bid."
+    ]
+    labels: Dict[int, int] = {}
+    for key, title, query in queries:
+        hits = [idx for idx, _ in index.search(query, RETRIEVAL_TOP_K)]
+        if key == "INFO" and index.passages and 0 not in hits:
+            hits.insert(0, 0)
+        lines = []
+        for idx in hits:
+            if idx in labels:
+                lines.append(f"- see [P{labels[idx]}]")
+                continue
+            labels[idx] = len(labels) + 1
+            passage = index.passages[idx]
+            lines.append(f"[P{labels[idx]}, p. {passage['page']}]\n{passage['text']}")
+        parts.append(f"{title}\n" + ("\n".join(lines) if lines else "- (no relevant passage found)"))
+    return "\n\n".join(parts)
+
+
+def _focus_bid_text(
+    client: Anthropic,
+    bid_text: str,
+    tender_data: Optional[Dict[str, Any]],
+    criteria: List[Dict[str, Any]],
+    use_cache: bool,
+    allow_chunked: bool = True,
+) -> str:
+    """
+    Choose how much of a bid to send, by its estimated size.
+
+    Small bids are sent whole, mid-sized ones as retrieved passages, and
+    bids above CHUNKED_EVAL_MIN_TOKENS as evidence from a map-reduce pass
+    (unless allow_chunked is False, when retrieval is used instead).
+    """
+    tokens = estimate_tokens(bid_text)
+    if tokens > CHUNKED_EVAL_MIN_TOKENS and allow_chunked:
+        return _condense_bid(client, bid_text, tender_data, criteria, use_cache)
+    if tokens > RETRIEVAL_MIN_TOKENS:
+        return _retrieve_bid_evidence(bid_text, tender_data, criteria)
+    return bid_text
+
+
+def _build_evaluation_request(
+    bid_text: str, tender_data: Optional[Dict[str, Any]], criteria: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """
+    Build the messages request that evaluates one bid.
+
+    Returns:
+        Tuple of (request keyword arguments, numbered criterion names,
+        numbered mandatory requirements) - the lists are needed to expand
+        the compact response
+    """
+    criterion_names, requirements = _criteria_and_requirements(tender_data, criteria)
+
+    # Tools, instructions and tender context are identical for every bid of a
+    # tender, so they form a prompt-cache prefix; only the bid text varies
+    system_prompt = [
+        {"type": "text", "text": EVALUATION_INSTRUCTIONS},
+        {
+            "type": "text",
+            "text": _tender_context(tender_data, criterion_names, requirements),
+            "cache_control": {"type": "ephemeral"},
+        },
+    ]
+
+    request = {
+        "model": "claude-sonnet-4-5-20250929",
+        "max_tokens": 4096,
+        "system": system_prompt,
+        "tools": [EVALUATION_TOOL],
+        "tool_choice": {"type": "tool", "name": EVALUATION_TOOL["name"]},
+        "messages": [{"role": "user", "content": bid_text}],
+    }
+    return request, criterion_names, requirements
 
 
 def evaluate_supplier_bid(
-    bid_text: str, tender_data: Dict[str, Any], criteria: List[Dict[str, Any]]
+    bid_text: str,
+    tender_data: Dict[str, Any],
+    criteria: List[Dict[str, Any]],
+    client: Optional[Anthropic] = None,
+    use_cache: bool = True,
+    on_field: Optional[Callable[[Tuple, Any], None]] = None,
 ) -> Dict[str, Any]:
     """
     Evaluate a supplier bid against tender requirements.
 
+    Claude is required to answer through the record_evaluation tool in a
+    compact format (short keys, numbered criteria and requirements, status
+    codes), which is expanded locally and validated into a SupplierEvaluation
+    record. The response is streamed; on_field, if given, receives each field
+    as soon as it is complete (expanded to full keys, before validation).
+    Evaluations longer than max_tokens are continued rather than failed.
+
+    Bids estimated above RETRIEVAL_MIN_TOKENS are sent as the passages most
+    relevant to each criterion and requirement. Above CHUNKED_EVAL_MIN_TOKENS
+    they are evaluated map-reduce style: evidence is extracted from chunks of
+    the bid in parallel and the final scoring call sees only that evidence.
+
     Args:
         bid_text: Full text of supplier bid
         tender_data: Tender information
         criteria: Evaluation criteria with weights
+        client: Anthropic client to use (resolved from session if omitted)
+        use_cache: Reuse a cached response for an identical request
+        on_field: Optional callback with (path, value) of each completed field
 
     Returns:
         Supplier evaluation as dictionary
     """
-    client = get_client()
+    if client is None:
+        client = get_client()
 
-    system_prompt = f"""You MUST return ONLY a single valid JSON object. No other text.
-
-Evaluate the bid. Return this exact structure:
-{{
-  "supplier_name": "company name",
-  "supplier_country": "country",
-  "bid_reference": "reference or na",
-  "overall_score": 75,
-  "category_scores": {{
-    "technical": {{"score": 75, "summary": "score summary", "strengths": [], "gaps": []}},
-    "commercial": {{"score": 75, "summary": "score summary", "strengths": [], "gaps": []}},
-    "compliance": {{"score": 75, "summary": "score summary", "strengths": [], "gaps": []}}
-  }},
-  "criterion_scores": [{{"criterion": "name", "score": 75, "evidence": "evidence text", "flag": "met"}}],
-  "mandatory_requirements_status": [{{"requirement": "requirement", "status": "compliant", "evidence": "evidence text"}}],
-  "hse_compliance": {{"status": "compliant", "details": "details"}},
-  "esg_compliance": {{"status": "compliant", "details": "details"}},
-  "iso_certifications": [],
-  "proposed_price": "price or na",
-  "proposed_timeline": "timeline or na",
-  "key_risks": [],
-  "recommendation": "brief recommendation",
-  "completeness_percentage": 75
-}}
+    try:
+        bid_text = _focus_bid_text(client, bid_text, tender_data, criteria, use_cache)
+    except APIError as api_err:
+        raise ValueError(f"Claude API error: {str(api_err)}")
 
-Rules:
-- Return ONLY the JSON object, nothing else
-- Keep all text values SHORT and SIMPLE
-- Use empty arrays [] if no items
-- Use "na" for missing values
-- Do NOT use quotes, apostrophes, or special characters inside text values"""
+    request, criterion_names, requirements = _build_evaluation_request(bid_text, tender_data, criteria)
+
+    def report_field(path: Tuple, value: Any):
+        expanded = expand_field(path, value, criterion_names, requirements)
+        if expanded is not None:
+            on_field(*expanded)
 
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=4096,
-            system=system_prompt,
-            messages=[{"role": "user", "content": bid_text}],
+        compact = _stream_tool_call(
+            client, on_field=report_field if on_field else None, use_cache=use_cache, **request
         )
-
-        response_text = message.content[0].text
-
-        # Strip markdown code fences if present
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-            response_text = response_text.strip()
-
-        # Clean up common JSON issues
-        import re
-        # Extract just the JSON part (between first { and last })
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            response_text = json_match.group(0)
-
-        # Try to parse JSON
-        try:
-            evaluation = json.loads(response_text)
-            return evaluation
-        except json.JSONDecodeError as json_err:
-            print(f"DEBUG: Failed to parse JSON. First 1000 chars: {response_text[:1000]}")
-            print(f"DEBUG: Error details: {str(json_err)}")
-            raise ValueError(f"Error parsing JSON response: {str(json_err)}")
     except APIError as api_err:
         raise ValueError(f"Claude API error: {str(api_err)}")
 
+    return validate_evaluation(expand_evaluation(compact, criterion_names, requirements))
+
+
+def evaluate_supplier_bids(
+    bid_texts: List[str],
+    tender_data: Dict[str, Any],
+    criteria: List[Dict[str, Any]],
+    max_concurrency: int = MAX_CONCURRENT_EVALUATIONS,
+    on_progress: Optional[Callable[[int, int, int, Union[Dict[str, Any], Exception]], None]] = None,
+    on_queue: Optional[Callable[[int, float], None]] = None,
+    on_field: Optional[Callable[[int, Tuple, Any], None]] = None,
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Evaluate several supplier bids concurrently.
+
+    Calls to evaluate_supplier_bid are fanned out over a thread pool so a batch
+    takes roughly as long as its slowest bid. The first bid small enough for a
+    single call is started alone and the others follow as soon as it starts
+    producing output, so they all reuse the tender context it wrote to the
+    prompt cache; if every bid needs the map-reduce pass, all start at once.
+    on_progress is invoked from the calling thread (safe for Streamlit
+    widgets) as each bid finishes, with (completed_count, total, bid_index,
+    result). While requests are held back by the shared rate governor,
+    on_queue is invoked periodically with (queue_position,
+    estimated_wait_seconds). on_field, if given, is also invoked from the
+    calling thread, with (bid_index, path, value) as each field of a
+    streamed evaluation completes.
+
+    Args:
+        bid_texts: Extracted text of each bid, in upload order
+        tender_data: Tender information
+        criteria: Evaluation criteria with weights
+        max_concurrency: Maximum number of API calls in flight
+        on_progress: Optional callback for per-bid progress
+        on_queue: Optional callback for rate-limit queue position
+        on_field: Optional callback for partial evaluation fields
+
+    Returns:
+        One entry per bid in upload order: the evaluation dictionary, or the
+        exception raised while evaluating that bid
+    """
+    total = len(bid_texts)
+    results: List[Union[Dict[str, Any], Exception]] = [None] * total
+    if total == 0:
+        return results
+
+    # Resolve the client and session here: session state is not available in worker threads
+    client = get_client()
+    session_id = _current_session_id()
+    _session_id.set(session_id)
+
+    # Workers post streamed fields here; they are delivered from this thread
+    fields: "queue.SimpleQueue[Tuple[int, Tuple, Any]]" = queue.SimpleQueue()
+    # The lead bid writes the prompt prefix; map-reduce bids spend minutes on
+    # their chunks before the evaluation call, so they cannot lead
+    lead = next((i for i, text in enumerate(bid_texts) if estimate_tokens(text) <= CHUNKED_EVAL_MIN_TOKENS), None)
+    # Set once the lead bid's response is being generated, i.e. its prompt prefix is cached
+    first_output = threading.Event()
+
+    def field_reporter(idx: int) -> Optional[Callable[[Tuple, Any], None]]:
+        if on_field is None and idx != lead:
+            return None
+
+        def report(path: Tuple, value: Any):
+            if idx == lead:
+                first_output.set()
+            if on_field is not None:
+                fields.put((idx, path, value))
+
+        return report
+
+    def deliver_fields():
+        while not fields.empty():
+            on_field(*fields.get())
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, total))) as executor:
+
+        def submit(idx: int):
+            future = executor.submit(
+                contextvars.copy_context().run,
+                evaluate_supplier_bid,
+                bid_texts[idx],
+                tender_data,
+                criteria,
+                client,
+                True,
+                field_reporter(idx),
+            )
+            pending[future] = idx
+
+        # The lead bid goes alone so it writes the shared prompt prefix to
+        # Claude's prompt cache; the rest start once its output begins and
+        # read the prefix from the cache instead of each paying for it in full
+        pending: Dict[Any, int] = {}
+        if lead is None:
+            first_output.set()
+        else:
+            submit(lead)
+        held_back = [idx for idx in range(total) if idx != lead]
+        completed = 0
+        while pending or held_back:
+            if held_back and (first_output.is_set() or completed):
+                for idx in held_back:
+                    submit(idx)
+                held_back = []
+            done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            if on_queue:
+                queued = rate_governor.status(session_id)
+                if queued:
+                    on_queue(*queued)
+            if on_field:
+                deliver_fields()
+            for future in done:
+                idx = pending.pop(future)
+                try:
+                    results[idx] = future.result()
+                except Exception as e:
+                    results[idx] = e
+                completed += 1
+                if on_progress:
+                    on_progress(completed, total, idx, results[idx])
+
+    return results
+
+
+def _batch_record_path(batch_id: str):
+    return BATCH_DIR / f"{batch_id}.json"
+
+
+def _save_batch_record(record: Dict[str, Any]):
+    """Write a batch record atomically so a crash never leaves a half-written file."""
+    BATCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = _batch_record_path(record["batch_id"])
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _tender_fingerprint(tender_data: Optional[Dict[str, Any]]) -> str:
+    """
+    Identify the tender a batch was evaluated against.
+
+    Only the tender's identity is used - reference, title and criterion
+    names - so adjusting criterion weights keeps its batches listed.
+    """
+    tender_data = tender_data or {}
+    return make_key(
+        "batch_tender",
+        tender_data.get("tender_reference"),
+        tender_data.get("tender_title"),
+        [c.get("criterion") for c in tender_data.get("evaluation_criteria", []) or []],
+    )
+
+
+def _load_batch_record(batch_id: str) -> Dict[str, Any]:
+    path = _batch_record_path(batch_id)
+    if not path.exists():
+        raise ValueError(f"Unknown evaluation batch: {batch_id}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def submit_evaluation_batch(
+    bid_texts: List[str],
+    file_names: List[str],
+    fingerprints: List[str],
+    tender_data: Dict[str, Any],
+    criteria: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Submit bid evaluations as one Message Batch.
+
+    Batches cost less than interactive calls and suit large tenders, but
+    results can take up to 24 hours. The batch ID and everything needed to
+    turn its results into evaluations is saved under BATCH_DIR, so results
+    can be collected after the app restarts.
+
+    Args:
+        bid_texts: Extracted text of each bid
+        file_names: File name of each bid, for display
+        fingerprints: Upload fingerprint of each bid, for the evaluation store
+        tender_data: Tender information
+        criteria: Evaluation criteria with weights
+
+    Returns:
+        The saved batch record
+    """
+    client = get_client()
+
+    batch_requests = []
+    request_keys = []
+    criterion_names: List[str] = []
+    requirements: List[str] = []
+    for idx, bid_text in enumerate(bid_texts):
+        # Large bids are reduced locally; map-reduce would need interactive calls
+        bid_text = _focus_bid_text(client, bid_text, tender_data, criteria, True, allow_chunked=False)
+        request, criterion_names, requirements = _build_evaluation_request(bid_text, tender_data, criteria)
+        batch_requests.append({"custom_id": f"bid-{idx}", "params": request})
+        request_keys.append(make_key("tool_call", request))
+
+    try:
+        batch = retry_policy.call(client.messages.batches.create, requests=batch_requests)
+    except APIError as e:
+        raise ValueError(f"Claude API error: {str(e)}")
+
+    record = {
+        "batch_id": batch.id,
+        "submitted_at": time.time(),
+        "status": batch.processing_status,
+        "request_counts": {},
+        "tender_title": (tender_data or {}).get("tender_title", "Not specified"),
+        "tender_fingerprint": _tender_fingerprint(tender_data),
+        "owner": _current_session_id(),
+        "file_names": list(file_names),
+        "fingerprints": list(fingerprints),
+        "criterion_names": criterion_names,
+        "requirements": requirements,
+        "request_keys": request_keys,
+    }
+    _save_batch_record(record)
+    return record
+
+
+def list_evaluation_batches(
+    tender_data: Optional[Dict[str, Any]], include_other_sessions: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Return the saved records of batches not yet collected for a tender, oldest first.
+
+    Args:
+        tender_data: Current tender; batches for other tenders are left out
+        include_other_sessions: Also list batches submitted by other sessions,
+            e.g. before the app restarted or the page was reloaded
+
+    Returns:
+        Batch records
+    """
+    if not BATCH_DIR.exists():
+        return []
+    tender = _tender_fingerprint(tender_data)
+    owner = _current_session_id()
+    records = [json.loads(path.read_text(encoding="utf-8")) for path in BATCH_DIR.glob("*.json")]
+    records = [
+        record
+        for record in records
+        if record.get("tender_fingerprint") == tender and (include_other_sessions or record.get("owner") == owner)
+    ]
+    return sorted(records, key=lambda record: record["submitted_at"])
+
+
+def check_evaluation_batch(batch_id: str) -> Dict[str, Any]:
+    """
+    Refresh the processing status of a submitted batch.
+
+    Args:
+        batch_id: Message Batch ID
+
+    Returns:
+        The updated batch record; status is "ended" once results are ready
+    """
+    record = _load_batch_record(batch_id)
+    try:
+        batch = retry_policy.call(get_client().messages.batches.retrieve, batch_id)
+    except APIError as e:
+        raise ValueError(f"Claude API error: {str(e)}")
+    record["status"] = batch.processing_status
+    record["request_counts"] = batch.request_counts.model_dump()
+    _save_batch_record(record)
+    return record
+
+
+def wait_for_evaluation_batch(
+    batch_id: str,
+    timeout: float,
+    on_status: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Poll a batch with exponential backoff until it ends or timeout passes.
+
+    Args:
+        batch_id: Message Batch ID
+        timeout: Give up waiting after this many seconds
+        on_status: Optional callback with the batch record after each check
+
+    Returns:
+        The latest batch record
+    """
+    deadline = time.monotonic() + timeout
+    delay = BATCH_POLL_INITIAL
+    while True:
+        record = check_evaluation_batch(batch_id)
+        if on_status:
+            on_status(record)
+        remaining = deadline - time.monotonic()
+        if record["status"] == "ended" or remaining <= 0:
+            return record
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, BATCH_POLL_MAX)
+
+
+def collect_evaluation_batch(batch_id: str) -> List[Tuple[str, str, Union[Dict[str, Any], Exception]]]:
+    """
+    Turn the results of an ended batch into supplier evaluations.
+
+    Successful evaluations are also stored in the LLM response cache under
+    the same key as the interactive request, so re-evaluating the same bid
+    is free. The batch record is removed once its results are collected.
+
+    Args:
+        batch_id: Message Batch ID
+
+    Returns:
+        One (file_name, fingerprint, result) tuple per bid in submission
+        order, where result is the evaluation or the exception for that bid
+    """
+    record = check_evaluation_batch(batch_id)
+    if record["status"] != "ended":
+        raise ValueError(f"Batch {batch_id} has not finished processing yet")
+
+    criterion_names = record["criterion_names"]
+    requirements = record["requirements"]
+    results: List[Union[Dict[str, Any], Exception]] = [
+        ValueError("No result returned for this bid") for _ in record["file_names"]
+    ]
+
+    try:
+        entries = retry_policy.call(get_client().messages.batches.results, batch_id)
+        for entry in entries:
+            idx = int(entry.custom_id.rsplit("-", 1)[1])
+            result = entry.result
+            if result.type != "succeeded":
+                error = getattr(result, "error", None)
+                results[idx] = ValueError(f"Batch request {result.type}" + (f": {error}" if error else ""))
+                continue
+            message = result.message
+            _record_usage(message.usage)
+            try:
+                compact = _tool_input(message, EVALUATION_TOOL["name"])
+            except ValueError as e:
+                results[idx] = e
+                continue
+            if message.stop_reason == "max_tokens":
+                # A truncated evaluation would load as a supplier with missing scores
+                results[idx] = ValueError("Evaluation was cut off at the output limit; evaluate this bid again")
+                continue
+            llm_cache.set(record["request_keys"][idx], json.dumps(compact).encode("utf-8"))
+            results[idx] = validate_evaluation(expand_evaluation(compact, criterion_names, requirements))
+    except APIError as e:
+        raise ValueError(f"Claude API error: {str(e)}")
+
+    _batch_record_path(batch_id).unlink(missing_ok=True)
+    return list(zip(record["file_names"], record["fingerprints"], results))
+
 
 def generate_trade_off_analysis(
-    tender_title: str, evaluation_data: Dict[str, Any]
+    tender_title: str, evaluation_data: Dict[str, Any], use_cache: bool = True
 ) -> str:
     """
     Generate trade-off analysis between top suppliers.
@@ -172,6 +1376,7 @@ def generate_trade_off_analysis(
     Args:
         tender_title: Title of the tender
         evaluation_data: All evaluation data
+        use_cache: Reuse a cached response for an identical request
 
     Returns:
         Trade-off analysis text
@@ -185,7 +1390,9 @@ def generate_trade_off_analysis(
 Provide a professional narrative analysis suitable for a procurement committee."""
 
     try:
-        message = client.messages.create(
+        message = _create_message(
+            client,
+            use_cache=use_cache,
             model="claude-sonnet-4-5-20250929",
             max_tokens=2048,
             messages=[{"role": "user", "content": prompt}],
@@ -196,15 +1403,102 @@ Provide a professional narrative analysis suitable for a procurement committee."
         raise ValueError(f"Claude API error: {str(e)}")
 
 
+CHAT_INSTRUCTIONS = """You are Airo's Bid Intelligence Assistant for Borouge PLC's procurement team. The index below lists the tender, its criteria and weights, its mandatory requirements and the evaluated suppliers. Use the tools to look up scores, evidence, compliance and comparisons; do not guess values that a tool can return.
+
+You can answer any question about the bids, suppliers, evaluation scores, compliance status, risks, comparisons, and recommendations. Always cite specific evidence from the bid documents when answering.
+
+Guidelines:
+- Be precise and data-driven in your answers
+- When comparing suppliers, use actual scores and evidence
+- Flag if information was not found in a supplier's bid
+- For compliance questions (HSE, ESG, ISO), clearly state compliant/non-compliant with evidence
+- You can suggest adjustments to evaluation criteria weights and show how rankings would change
+- Always maintain a professional, procurement-advisor tone
+- When uncertain, say so clearly rather than guessing
+- Refer to suppliers by name, not by their index ID"""
+
+
+def _build_chat_request(
+    user_message: str,
+    tender_data: Dict[str, Any],
+    supplier_evaluations: List[Dict[str, Any]],
+    criteria: List[Dict[str, Any]],
+    chat_history: List[Dict[str, str]],
+    conversation_summary: str = "",
+) -> Dict[str, Any]:
+    """Build the messages request for a chat turn: instructions, a compact data index and the chat tools."""
+    system_prompt = [
+        {"type": "text", "text": CHAT_INSTRUCTIONS},
+        {
+            "type": "text",
+            "text": "EVALUATION INDEX:\n" + build_chat_index(tender_data, supplier_evaluations, criteria),
+            "cache_control": {"type": "ephemeral"},
+        },
+    ]
+    if conversation_summary:
+        # After the cache breakpoint, so a changing summary does not invalidate the cached prefix
+        system_prompt.append(
+            {"type": "text", "text": "EARLIER IN THIS CONVERSATION (summary):\n" + conversation_summary}
+        )
+
+    # Prepare message history
+    messages = []
+    for msg in chat_history:
+        messages.append({"role": msg["role"], "content": msg["content"]})
+    messages.append({"role": "user", "content": user_message})
+
+    return {
+        "model": "claude-sonnet-4-5-20250929",
+        "max_tokens": 2048,
+        "system": system_prompt,
+        "tools": CHAT_TOOLS,
+        "messages": messages,
+    }
+
+
+def _continue_after_tools(
+    request: Dict[str, Any],
+    message: Message,
+    tender_data: Dict[str, Any],
+    supplier_evaluations: List[Dict[str, Any]],
+    criteria: List[Dict[str, Any]],
+    rounds: int,
+) -> Dict[str, Any]:
+    """Run the tools Claude asked for and return the request for the next round."""
+    results = [
+        {
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": run_chat_tool(block.name, block.input, tender_data, supplier_evaluations, criteria),
+        }
+        for block in message.content
+        if block.type == "tool_use"
+    ]
+    follow_up = {
+        **request,
+        "messages": request["messages"]
+        + [{"role": "assistant", "content": message.content}, {"role": "user", "content": results}],
+    }
+    if rounds >= MAX_CHAT_TOOL_ROUNDS:
+        # Out of tool rounds: the assistant must answer with what it has
+        follow_up["tool_choice"] = {"type": "none"}
+    return follow_up
+
+
 def chat_with_evaluation_data(
     user_message: str,
     tender_data: Dict[str, Any],
     supplier_evaluations: List[Dict[str, Any]],
     criteria: List[Dict[str, Any]],
     chat_history: List[Dict[str, str]],
+    conversation_summary: str = "",
 ) -> str:
     """
-    Chat with Claude using full evaluation context.
+    Chat with Claude about the evaluation data.
+
+    Claude sees a compact index of the data and queries details through
+    local tools (see utils.chat_tools), so the prompt does not grow with
+    the number of suppliers.
 
     Args:
         user_message: User's question
@@ -212,51 +1506,144 @@ def chat_with_evaluation_data(
         supplier_evaluations: All supplier evaluations
         criteria: Evaluation criteria
         chat_history: Previous messages for context
+        conversation_summary: Summary of earlier messages no longer sent verbatim
 
     Returns:
         Assistant response
     """
     client = get_client()
+    request = _build_chat_request(
+        user_message, tender_data, supplier_evaluations, criteria, chat_history, conversation_summary
+    )
 
-    system_prompt = f"""You are Airo's Bid Intelligence Assistant for Borouge PLC's procurement team. You have access to the following tender and bid evaluation data:
+    try:
+        rounds = 0
+        while True:
+            message = _create_message(client, use_cache=False, **request)
+            if message.stop_reason != "tool_use":
+                break
+            rounds += 1
+            request = _continue_after_tools(request, message, tender_data, supplier_evaluations, criteria, rounds)
 
-TENDER DETAILS:
-{json.dumps(tender_data, indent=2)}
+        return "".join(block.text for block in message.content if block.type == "text")
+    except APIError as e:
+        raise ValueError(f"Claude API error: {str(e)}")
 
-SUPPLIER EVALUATIONS:
-{json.dumps(supplier_evaluations, indent=2)}
 
-EVALUATION CRITERIA AND WEIGHTS:
-{json.dumps(criteria, indent=2)}
+def stream_chat_with_evaluation_data(
+    user_message: str,
+    tender_data: Dict[str, Any],
+    supplier_evaluations: List[Dict[str, Any]],
+    criteria: List[Dict[str, Any]],
+    chat_history: List[Dict[str, str]],
+    conversation_summary: str = "",
+) -> Iterator[str]:
+    """
+    Chat with Claude about the evaluation data, streaming the reply.
 
-You can answer any question about the bids, suppliers, evaluation scores, compliance status, risks, comparisons, and recommendations. Always cite specific evidence from the bid documents when answering.
+    Same arguments as chat_with_evaluation_data. Tool calls are run between
+    streamed rounds. Suitable for st.write_stream; closing the generator
+    cancels the request.
 
-Guidelines:
-- Be precise and data-driven in your answers
-- When comparing suppliers, use actual scores and evidence
-- Flag if information was not found in a supplier's bid
-- For compliance questions (HSE, ESG, ISO), clearly state compliant/non-compliant with evidence
-- You can suggest adjustments to evaluation criteria weights and show how rankings would change
-- Always maintain a professional, procurement-advisor tone
-- When uncertain, say so clearly rather than guessing"""
+    Yields:
+        Text deltas of the assistant response
+    """
+    client = get_client()
+    request = _build_chat_request(
+        user_message, tender_data, supplier_evaluations, criteria, chat_history, conversation_summary
+    )
 
-    # Prepare message history
-    messages = []
-    for msg in chat_history:
-        messages.append({"role": msg["role"], "content": msg["content"]})
-    messages.append({"role": "user", "content": user_message})
+    try:
+        rounds = 0
+        wrote_text = False
+        while True:
+            if wrote_text:
+                # Keep text from separate rounds in separate paragraphs
+                yield "\n\n"
+            message = yield from _stream_text(client, **request)
+            wrote_text = any(block.type == "text" and block.text.strip() for block in message.content)
+            if message.stop_reason != "tool_use":
+                break
+            rounds += 1
+            request = _continue_after_tools(request, message, tender_data, supplier_evaluations, criteria, rounds)
+    except APIError as e:
+        raise ValueError(f"Claude API error: {str(e)}")
+
+
+POLISH_INSTRUCTIONS = """You are Airo's Bid Intelligence Assistant for Borouge PLC's procurement team. The facts below were computed directly from the evaluation data. Turn them into a concise narrative answer to the user's question, suitable for a procurement committee. Use only these facts: keep every score, status and supplier name exactly as given, and keep a table where it helps."""
+
+
+def stream_polished_answer(question: str, facts: str) -> Iterator[str]:
+    """
+    Stream a narrative rewrite of a locally computed answer.
+
+    Only the question and the computed facts are sent, so the request is
+    small and cannot contradict the evaluation data.
+
+    Args:
+        question: User's question
+        facts: Markdown answer from utils.local_answers
 
+    Yields:
+        Text deltas of the polished answer
+    """
+    client = get_client()
     try:
-        message = client.messages.create(
+        yield from _stream_text(
+            client,
             model="claude-sonnet-4-5-20250929",
-            max_tokens=2048,
-            system=system_prompt,
-            messages=messages,
+            max_tokens=1024,
+            system=POLISH_INSTRUCTIONS,
+            messages=[{"role": "user", "content": f"QUESTION: {question}\n\nFACTS:\n{facts}"}],
         )
+    except APIError as e:
+        raise ValueError(f"Claude API error: {str(e)}")
 
-        return message.content[0].text
+
+CHAT_SUMMARY_INSTRUCTIONS = """You keep a running summary of a procurement team's conversation with a bid evaluation assistant. Update the current summary with the new messages. Keep the questions asked, the answers' conclusions and figures, supplier names, decisions, and any preferences or weight changes the user stated; drop pleasantries and anything the new messages supersede. Reply with the updated summary only, in at most 300 words."""
+
+# Runs chat summaries off the page thread, so a chat turn never waits for one
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+
+
+def _summarize_chat(
+    client: Anthropic, session_id: str, summary: str, messages: List[Dict[str, str]]
+) -> str:
+    _session_id.set(session_id)
+    transcript = "\n\n".join(f"{msg['role'].upper()}: {msg['content']}" for msg in messages)
+    try:
+        message = _create_message(
+            client,
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=CHAT_SUMMARY_MAX_TOKENS,
+            system=CHAT_SUMMARY_INSTRUCTIONS,
+            messages=[
+                {
+                    "role": "user",
+                    "content": f"CURRENT SUMMARY:\n{summary or '(none yet)'}\n\nNEW MESSAGES:\n{transcript}",
+                }
+            ],
+        )
     except APIError as e:
         raise ValueError(f"Claude API error: {str(e)}")
+    return "".join(block.text for block in message.content if block.type == "text").strip()
+
+
+def start_chat_summary(summary: str, messages: List[Dict[str, str]]) -> Future:
+    """
+    Fold chat messages into the running conversation summary in the background.
+
+    Args:
+        summary: Current summary (empty for none)
+        messages: Messages to add to it, oldest first
+
+    Returns:
+        Future resolving to the updated summary text
+    """
+    # Resolve the client and session here: session state is not available in worker threads
+    client = get_client()
+    session_id = _current_session_id()
+    return _summary_executor.submit(_summarize_chat, client, session_id, summary, list(messages))
 
 
 def generate_sample_tender_data() -> Dict[str, Any]:
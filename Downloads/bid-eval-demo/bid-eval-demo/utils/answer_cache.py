@@ -0,0 +1,209 @@
+"""Process-wide cache of chat answers, matched on near-identical questions about the same data."""
+
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from utils.cache import make_key
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Question and filler words that do not change what is being asked
+_STOPWORDS = frozenset(
+    """a an and are as at be been by can could do does did for from give has have i in is it me of on or our
+    please show tell the to was we were what which who whom whose would list us you your bid bids bidder
+    bidders supplier suppliers vendor vendors""".split()
+)
+
+# Negations flip a question's meaning, so they must match exactly ("non-compliant" is read as one word)
+_NEGATIONS = frozenset("not no none never without lack lacks lacking missing fail fails failed".split())
+
+# Topics whose swap changes the answer while barely changing the text ("HSE compliant" vs "ESG compliant")
+_TOPICS = frozenset(
+    """hse esg iso price prices pricing cost costs cheapest cheaper lowest highest expensive warranty delivery
+    timeline schedule lead risk risks technical commercial compliance compliant safety environmental
+    sustainability certification certifications certified payment support spares references experience
+    score scores ranking rank""".split()
+)
+
+# Words that point back into the conversation; such questions depend on history and are never cached
+_REFERRING = frozenset(
+    "it its they them their that those this these he she him her above previous earlier same else other "
+    "one ones again more".split()
+)
+
+
+def dataset_fingerprint(
+    tender_data: Optional[Dict[str, Any]], evaluations: List[Dict[str, Any]], criteria: List[Dict[str, Any]]
+) -> str:
+    """
+    Identify the data a chat answer was based on.
+
+    Any change to the tender, an evaluation or a criterion weight gives a
+    new fingerprint, so answers about the old data are never served.
+
+    Args:
+        tender_data: Tender information
+        evaluations: All supplier evaluations
+        criteria: Evaluation criteria with weights
+
+    Returns:
+        Fingerprint string
+    """
+    tender_data = tender_data or {}
+    return make_key(
+        "chat-answer-data",
+        tender_data.get("tender_reference"),
+        tender_data.get("tender_title"),
+        criteria,
+        evaluations,
+    )
+
+
+def _trigrams(tokens: List[str]) -> Counter:
+    """Character trigrams of each token, padded so word boundaries count."""
+    grams: Counter = Counter()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+    if not dot:
+        return 0.0
+    return dot / math.sqrt(sum(v * v for v in a.values()) * sum(v * v for v in b.values()))
+
+
+class AnswerCache:
+    """
+    Bounded LRU of chat answers shared by every session in the process.
+
+    Questions are normalised (lower-cased, question and filler words
+    removed) and compared by cosine similarity of their character trigrams.
+    Numbers, supplier names, negations and topic words (HSE, ESG, price, ...)
+    in a question must match exactly, so "Is Supplier A compliant?" never
+    returns the answer about Supplier B, nor "not compliant" the answer to
+    "compliant".
+    """
+
+    def __init__(self, max_entries: int, threshold: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(question: str, evaluations: List[Dict[str, Any]]) -> Optional[Tuple[str, FrozenSet[str]]]:
+        """Return (normalised question, anchor tokens), or None if the question cannot be cached."""
+        question = re.sub(r"n't\b", " not", question.lower())
+        words = _TOKEN.findall(re.sub(r"\bnon[\s-]+(?=[a-z])", "non", question))
+        if not words or _REFERRING.intersection(words):
+            return None
+        names = {token for e in evaluations for token in _TOKEN.findall(str(e.get("supplier_name", "")).lower())}
+        tokens = [word for word in words if word not in _STOPWORDS]
+        if not tokens:
+            return None
+        anchors = frozenset(
+            t
+            for t in tokens
+            if t in names or t in _NEGATIONS or t in _TOPICS or t.startswith("non") or any(ch.isdigit() for ch in t)
+        )
+        return " ".join(tokens), anchors
+
+    def get(
+        self,
+        question: str,
+        tender_data: Optional[Dict[str, Any]],
+        evaluations: List[Dict[str, Any]],
+        criteria: List[Dict[str, Any]],
+    ) -> Optional[str]:
+        """
+        Find a stored answer to the same or a near-identical question about the same data.
+
+        Args:
+            question: User's chat message
+            tender_data: Tender information
+            evaluations: All supplier evaluations
+            criteria: Evaluation criteria with weights
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        normalized = self._normalize(question, evaluations)
+        if normalized is None:
+            return None
+        text, anchors = normalized
+        fingerprint = dataset_fingerprint(tender_data, evaluations, criteria)
+        grams = _trigrams(text.split())
+
+        with self._lock:
+            key = (fingerprint, text)
+            best = key if key in self._entries else None
+            if best is None:
+                best_score = self.threshold
+                for entry_key, entry in self._entries.items():
+                    if entry_key[0] != fingerprint or entry["anchors"] != anchors:
+                        continue
+                    score = _cosine(grams, entry["grams"])
+                    if score >= best_score:
+                        best, best_score = entry_key, score
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.hits += 1
+            return self._entries[best]["answer"]
+
+    def put(
+        self,
+        question: str,
+        tender_data: Optional[Dict[str, Any]],
+        evaluations: List[Dict[str, Any]],
+        criteria: List[Dict[str, Any]],
+        answer: str,
+    ):
+        """
+        Store a complete answer for later sessions asking the same question.
+
+        Args:
+            question: User's chat message
+            tender_data: Tender information
+            evaluations: All supplier evaluations
+            criteria: Evaluation criteria with weights
+            answer: Assistant response
+        """
+        if not self.enabled or not answer:
+            return
+        normalized = self._normalize(question, evaluations)
+        if normalized is None:
+            return
+        text, anchors = normalized
+        key = (dataset_fingerprint(tender_data, evaluations, criteria), text)
+        with self._lock:
+            self._entries[key] = {"grams": _trigrams(text.split()), "anchors": anchors, "answer": answer}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of stored answers."""
+        with self._lock:
+            return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Shared by all sessions; BID_EVAL_ANSWER_CACHE=0 disables it
+answer_cache = AnswerCache(
+    max_entries=int(os.getenv("BID_EVAL_ANSWER_CACHE_ENTRIES", "500")),
+    threshold=float(os.getenv("BID_EVAL_ANSWER_CACHE_SIMILARITY", "0.85")),
+    enabled=os.getenv("BID_EVAL_ANSWER_CACHE", "1") != "0",
+)
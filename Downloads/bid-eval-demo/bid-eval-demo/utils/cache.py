@@ -0,0 +1,167 @@
+"""Persistent content-addressed cache backed by SQLite."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# All cache databases live here unless BID_EVAL_CACHE_DIR overrides it
+CACHE_DIR = Path(
+    os.getenv("BID_EVAL_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache"))
+)
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from JSON-serialisable parts.
+
+    Args:
+        parts: Values that together identify the cached item
+
+    Returns:
+        SHA-256 hex digest of the canonical JSON encoding of the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Size- and age-bounded key/value store with LRU eviction."""
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        max_age_seconds: Optional[float] = None,
+        enabled: bool = True,
+    ):
+        self.path = CACHE_DIR / f"{name}.sqlite"
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the database on first use."""
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON entries (accessed_at)")
+            self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self.max_age_seconds and now - row[1] > self.max_age_seconds:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    conn.commit()
+                    self.evictions += 1
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+            finally:
+                conn.close()
+        self.hits += 1
+        return zlib.decompress(row[0])
+
+    def set(self, key: str, value: bytes):
+        """Store value under key and evict old entries if over budget."""
+        if not self.enabled:
+            return
+        blob = zlib.compress(value)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(blob), len(blob), now, now),
+                )
+                self._evict(conn, now)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        if self.max_age_seconds:
+            cursor = conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (now - self.max_age_seconds,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM entries")
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process plus current on-disk usage."""
+        entries, size = 0, 0
+        if self.enabled:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    entries, size = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                    ).fetchone()
+                finally:
+                    conn.close()
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
@@ -0,0 +1,114 @@
+"""Bounded chat context: recent turns sent verbatim, older turns folded into a running summary."""
+
+import os
+from typing import Any, Dict, List, Tuple
+
+import streamlit as st
+
+from utils.ai_engine import start_chat_summary
+from utils.text_prep import estimate_tokens
+
+# The most recent user/assistant turns are kept verbatim; older ones are summarized
+CHAT_KEEP_TURNS = int(os.getenv("BID_EVAL_CHAT_KEEP_TURNS", "6"))
+
+# Token budget for the summary plus verbatim history sent with each question
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("BID_EVAL_CHAT_HISTORY_TOKENS", "6000"))
+
+# Older turns are folded into the summary once at least this many are waiting
+SUMMARY_BATCH_TURNS = 2
+
+# Messages kept in session state for display; older ones survive only in the summary
+MAX_STORED_MESSAGES = int(os.getenv("BID_EVAL_CHAT_MAX_STORED", "200"))
+
+
+def _collect_summary():
+    """Adopt the result of a finished background summary, if any."""
+    job = st.session_state.chat_summary_job
+    if job is None or not job["future"].done():
+        return
+    st.session_state.chat_summary_job = None
+    try:
+        summary = job["future"].result()
+    except Exception:
+        # Those messages stay unsummarized and are retried on a later turn
+        return
+    if summary:
+        st.session_state.chat_summary = summary
+        st.session_state.chat_summarized = job["upto"]
+
+
+def _schedule_summary(history: List[Dict[str, str]]):
+    """Start folding messages that have left the verbatim window into the summary."""
+    if st.session_state.chat_summary_job is not None:
+        return
+    start = st.session_state.chat_summarized
+    upto = len(history) - 2 * CHAT_KEEP_TURNS
+    if upto - start < 2 * SUMMARY_BATCH_TURNS:
+        return
+    try:
+        future = start_chat_summary(st.session_state.chat_summary, history[start:upto])
+    except ValueError:
+        # No API key yet; the chat request itself will report it
+        return
+    st.session_state.chat_summary_job = {"future": future, "upto": upto}
+
+
+def _trim_stored(history: List[Dict[str, str]]):
+    """Drop the oldest already-summarized messages once the stored history is too long."""
+    excess = len(history) - MAX_STORED_MESSAGES
+    if excess <= 0 or st.session_state.chat_summary_job is not None:
+        return
+    drop = min(excess, st.session_state.chat_summarized)
+    if drop:
+        del history[:drop]
+        st.session_state.chat_summarized -= drop
+        st.session_state.chat_trimmed += drop
+
+
+def prepare_chat_context(history: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], str, Dict[str, Any]]:
+    """
+    Choose the conversation context to send with the next question.
+
+    Messages not yet covered by the summary are sent verbatim, newest first,
+    until the token budget is spent, so request size (and latency) stays
+    bounded however long the session runs. Messages older than the last
+    CHAT_KEEP_TURNS turns are summarized in the background; until that
+    finishes they are sent verbatim if the budget allows.
+
+    Args:
+        history: Stored chat history, excluding the question being asked
+
+    Returns:
+        (messages to send verbatim, conversation summary, report) where the
+        report counts verbatim, summarized and omitted messages and the
+        history tokens sent
+    """
+    _collect_summary()
+    _trim_stored(history)
+    _schedule_summary(history)
+
+    summary = st.session_state.chat_summary
+    summarized = st.session_state.chat_summarized
+    budget = CHAT_HISTORY_TOKEN_BUDGET - estimate_tokens(summary)
+
+    kept: List[Dict[str, str]] = []
+    used = 0
+    for message in reversed(history[summarized:]):
+        tokens = estimate_tokens(message["content"])
+        if used + tokens > budget:
+            break
+        kept.append(message)
+        used += tokens
+    kept.reverse()
+    # The conversation sent must open with a user message
+    while kept and kept[0]["role"] != "user":
+        used -= estimate_tokens(kept.pop(0)["content"])
+
+    report = {
+        "verbatim": len(kept),
+        "summarized": summarized + st.session_state.chat_trimmed,
+        "omitted": len(history) - summarized - len(kept),
+        "tokens": used + estimate_tokens(summary),
+        "summarizing": st.session_state.chat_summary_job is not None,
+    }
+    return kept, summary, report
@@ -0,0 +1,310 @@
+"""Local query tools the chat assistant calls instead of receiving every evaluation in its prompt."""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from utils.schemas import CATEGORIES
+from utils.scoring import as_score, overall_scores
+
+CHAT_TOOLS = [
+    {
+        "name": "get_ranking",
+        "description": "Rank suppliers by overall score or by one category score.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "by": {"type": "string", "enum": ["overall"] + CATEGORIES},
+                "limit": {"type": "integer", "description": "Number of suppliers to return (default all)"},
+            },
+        },
+    },
+    {
+        "name": "get_supplier",
+        "description": "Get one supplier's full evaluation, or only the listed sections of it.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "supplier": {"type": "string", "description": "Supplier ID (e.g. S2) or name"},
+                "sections": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Evaluation keys to return, e.g. criterion_scores, key_risks",
+                },
+            },
+            "required": ["supplier"],
+        },
+    },
+    {
+        "name": "compliance_for_requirement",
+        "description": "Every supplier's status and evidence for one mandatory requirement, or for HSE or ESG.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "requirement": {"type": "string", "description": "Requirement number (e.g. R3), its text, HSE or ESG"},
+            },
+            "required": ["requirement"],
+        },
+    },
+    {
+        "name": "compare",
+        "description": "Side-by-side comparison of suppliers: scores, price, timeline, criteria, compliance and risks.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "suppliers": {"type": "array", "items": {"type": "string"}, "description": "Supplier IDs or names"},
+            },
+            "required": ["suppliers"],
+        },
+    },
+    {
+        "name": "recompute_with_weights",
+        "description": "Re-rank suppliers with different criterion weights, from their per-criterion scores.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "weights": {
+                    "type": "object",
+                    "additionalProperties": {"type": "number"},
+                    "description": "Weight percentage per criterion number (e.g. C1) or name; others keep their weight",
+                },
+            },
+            "required": ["weights"],
+        },
+    },
+]
+
+
+def _supplier_id(idx: int) -> str:
+    return f"S{idx + 1}"
+
+
+def _find_supplier(evaluations: List[Dict[str, Any]], ref: str) -> Optional[int]:
+    """Resolve a supplier ID (S<n>) or name (exact, then partial match) to its index."""
+    ref = str(ref).strip()
+    if not ref:
+        return None
+    if ref[:1].upper() == "S" and ref[1:].isdigit() and 1 <= int(ref[1:]) <= len(evaluations):
+        return int(ref[1:]) - 1
+    names = [str(e.get("supplier_name", "")).lower() for e in evaluations]
+    if ref.lower() in names:
+        return names.index(ref.lower())
+    for idx, name in enumerate(names):
+        if ref.lower() in name or (name and name in ref.lower()):
+            return idx
+    return None
+
+
+def _find_item(items: List[str], ref: str, prefix: str) -> Optional[int]:
+    """Resolve a numbered reference (e.g. R3, C2 or 3) or text to an index into items."""
+    ref = str(ref).strip()
+    number = ref[1:] if ref[:1].upper() == prefix else ref
+    if number.isdigit() and 1 <= int(number) <= len(items):
+        return int(number) - 1
+    lowered = [item.lower() for item in items]
+    for idx, item in enumerate(lowered):
+        if ref.lower() == item or ref.lower() in item:
+            return idx
+    return None
+
+
+def build_chat_index(
+    tender_data: Optional[Dict[str, Any]], evaluations: List[Dict[str, Any]], criteria: List[Dict[str, Any]]
+) -> str:
+    """
+    Summarise the evaluation data as a compact index for the chat system prompt.
+
+    Lists the tender, numbered criteria with weights, numbered mandatory
+    requirements and one line per supplier; details are fetched with tools.
+
+    Args:
+        tender_data: Tender information
+        evaluations: All supplier evaluations
+        criteria: Evaluation criteria with weights
+
+    Returns:
+        Index text
+    """
+    tender_data = tender_data or {}
+    lines = [
+        f"Tender: {tender_data.get('tender_title', 'Not specified')} "
+        f"({tender_data.get('issuing_organization', 'Not specified')})",
+        "",
+        "Criteria (weight %):",
+    ]
+    lines += [
+        f"C{n}. {c.get('criterion')} [{c.get('category', '')}] {c.get('weight_percentage', 0)}%"
+        for n, c in enumerate(criteria or [], 1)
+    ]
+    lines += ["", "Mandatory requirements:"]
+    lines += [f"R{n}. {r}" for n, r in enumerate(tender_data.get("mandatory_requirements", []) or [], 1)]
+    lines += ["", "Suppliers (overall score):"]
+    lines += [
+        f"{_supplier_id(idx)}. {e.get('supplier_name', 'Unknown')} ({as_score(e.get('overall_score')):.0f})"
+        for idx, e in enumerate(evaluations)
+    ]
+    return "\n".join(lines)
+
+
+def _get_ranking(evaluations, criteria, tender_data, by: str = "overall", limit: Optional[int] = None):
+    def score(evaluation):
+        if by == "overall":
+            return as_score(evaluation.get("overall_score"))
+        return as_score(evaluation.get("category_scores", {}).get(by, {}).get("score"))
+
+    ranked = sorted(range(len(evaluations)), key=lambda idx: score(evaluations[idx]), reverse=True)
+    if limit:
+        ranked = ranked[: int(limit)]
+    return [
+        {
+            "rank": rank,
+            "id": _supplier_id(idx),
+            "supplier": evaluations[idx].get("supplier_name"),
+            by: score(evaluations[idx]),
+        }
+        for rank, idx in enumerate(ranked, 1)
+    ]
+
+
+def _get_supplier(evaluations, criteria, tender_data, supplier: str, sections: Optional[List[str]] = None):
+    idx = _find_supplier(evaluations, supplier)
+    if idx is None:
+        return {"error": f"No supplier matches {supplier!r}"}
+    evaluation = evaluations[idx]
+    if sections:
+        evaluation = {key: evaluation[key] for key in sections if key in evaluation}
+    return {"id": _supplier_id(idx), "supplier": evaluations[idx].get("supplier_name"), **evaluation}
+
+
+def _compliance_for_requirement(evaluations, criteria, tender_data, requirement: str):
+    if requirement.strip().upper() in ("HSE", "ESG"):
+        key = f"{requirement.strip().lower()}_compliance"
+        return [
+            {"id": _supplier_id(idx), "supplier": e.get("supplier_name"), **(e.get(key) or {})}
+            for idx, e in enumerate(evaluations)
+        ]
+
+    requirements = [str(r) for r in (tender_data or {}).get("mandatory_requirements", []) or []]
+    found = _find_item(requirements, requirement, "R")
+    text = requirements[found] if found is not None else requirement
+    results = []
+    for idx, evaluation in enumerate(evaluations):
+        statuses = evaluation.get("mandatory_requirements_status", []) or []
+        match = next((s for s in statuses if s.get("requirement") == text), None)
+        if match is None:
+            match = next((s for s in statuses if text.lower() in str(s.get("requirement", "")).lower()), None)
+        results.append(
+            {
+                "id": _supplier_id(idx),
+                "supplier": evaluation.get("supplier_name"),
+                "status": match.get("status") if match else "not_assessed",
+                "evidence": match.get("evidence") if match else None,
+            }
+        )
+    return {"requirement": text, "suppliers": results}
+
+
+def _compare(evaluations, criteria, tender_data, suppliers: List[str]):
+    compared = []
+    for ref in suppliers:
+        idx = _find_supplier(evaluations, ref)
+        if idx is None:
+            compared.append({"error": f"No supplier matches {ref!r}"})
+            continue
+        e = evaluations[idx]
+        compared.append(
+            {
+                "id": _supplier_id(idx),
+                "supplier": e.get("supplier_name"),
+                "overall_score": as_score(e.get("overall_score")),
+                "category_scores": {
+                    category: as_score(e.get("category_scores", {}).get(category, {}).get("score"))
+                    for category in CATEGORIES
+                },
+                "criterion_scores": {c.get("criterion"): as_score(c.get("score")) for c in e.get("criterion_scores", [])},
+                "proposed_price": e.get("proposed_price"),
+                "proposed_timeline": e.get("proposed_timeline"),
+                "hse": (e.get("hse_compliance") or {}).get("status"),
+                "esg": (e.get("esg_compliance") or {}).get("status"),
+                "non_compliant_requirements": [
+                    s.get("requirement")
+                    for s in e.get("mandatory_requirements_status", [])
+                    if s.get("status") != "compliant"
+                ],
+                "key_risks": e.get("key_risks", []),
+            }
+        )
+    return compared
+
+
+def _recompute_with_weights(evaluations, criteria, tender_data, weights: Dict[str, float]):
+    names = [str(c.get("criterion")) for c in criteria or []]
+    new_weights = {name: as_score(c.get("weight_percentage")) for name, c in zip(names, criteria or [])}
+    unknown = []
+    for ref, weight in weights.items():
+        found = _find_item(names, ref, "C")
+        if found is None:
+            unknown.append(ref)
+        else:
+            new_weights[names[found]] = as_score(weight)
+
+    totals = overall_scores(
+        evaluations, [{"criterion": name, "weight_percentage": weight} for name, weight in new_weights.items()]
+    )
+    ranked = sorted(range(len(evaluations)), key=lambda idx: totals[idx], reverse=True)
+    result = {
+        "weights": new_weights,
+        "ranking": [
+            {
+                "rank": rank,
+                "id": _supplier_id(idx),
+                "supplier": evaluations[idx].get("supplier_name"),
+                "score": round(float(totals[idx]), 1),
+                "previous_overall": as_score(evaluations[idx].get("overall_score")),
+            }
+            for rank, idx in enumerate(ranked, 1)
+        ],
+    }
+    if unknown:
+        result["unknown_criteria"] = unknown
+    return result
+
+
+_HANDLERS = {
+    "get_ranking": _get_ranking,
+    "get_supplier": _get_supplier,
+    "compliance_for_requirement": _compliance_for_requirement,
+    "compare": _compare,
+    "recompute_with_weights": _recompute_with_weights,
+}
+
+
+def run_chat_tool(
+    name: str,
+    arguments: Dict[str, Any],
+    tender_data: Optional[Dict[str, Any]],
+    evaluations: List[Dict[str, Any]],
+    criteria: List[Dict[str, Any]],
+) -> str:
+    """
+    Execute a chat tool call against the local evaluation data.
+
+    Args:
+        name: Tool name from CHAT_TOOLS
+        arguments: Tool input from Claude
+        tender_data: Tender information
+        evaluations: All supplier evaluations
+        criteria: Evaluation criteria with weights
+
+    Returns:
+        Tool result as compact JSON; invalid arguments give {"error": ...}
+        so the model can correct its call
+    """
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return json.dumps({"error": f"Unknown tool {name}"})
+    try:
+        result = handler(evaluations, criteria, tender_data, **(arguments or {}))
+    except Exception as e:
+        # Arguments come from the model: report bad names or values back to it rather than failing the chat turn
+        result = {"error": f"Invalid arguments for {name}: {type(e).__name__}: {str(e)}"}
+    return json.dumps(result, separators=(",", ":"), default=str)
@@ -0,0 +1,243 @@
+"""Incremental JSON parsing for streamed Claude output, with local repair of truncated text."""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+PathItem = Union[str, int]
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# A backslash escape: valid ones are kept, anything else is treated as a literal backslash
+_ESCAPE = re.compile(r'\\(u[0-9a-fA-F]{4}|["\\/bfnrt]|.|$)', re.DOTALL)
+
+
+def _fix_escapes(text: str) -> str:
+    """Double any backslash that does not start a valid JSON escape."""
+
+    def fix(match: "re.Match") -> str:
+        escape = match.group(1)
+        if escape and (len(escape) == 5 or escape in '"\\/bfnrt'):
+            return match.group(0)
+        return "\\\\" + escape
+
+    return _ESCAPE.sub(fix, text)
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    Parse a complete JSON value, tolerating raw control characters and invalid escapes.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        The decoded value
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON even after repair
+    """
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        return json.loads(_fix_escapes(text), strict=False)
+
+
+class _Frame:
+    """An open object or array while parsing."""
+
+    __slots__ = ("kind", "start", "key", "index", "expect_key")
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind
+        self.start = start
+        self.key: Optional[str] = None
+        self.index = 0
+        self.expect_key = kind == "{"
+
+
+class JsonStreamParser:
+    """
+    Parse a JSON object fed in arbitrary chunks, reporting values as they complete.
+
+    feed() returns (path, value) for every value nested no deeper than
+    max_depth that finished within the chunk, e.g. ("supplier_name",) or
+    ("category_scores", "technical") or ("criterion_scores", 0). finish()
+    returns the whole object, closing any strings and containers left open by
+    a truncated stream.
+    """
+
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self.text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._scalar_start: Optional[int] = None
+        self._started = False
+        self._done = False
+        # End of the last complete value or opened container, with the closers needed there
+        self._safe_end = 0
+        self._safe_closers = ""
+
+    def _path(self) -> Tuple[PathItem, ...]:
+        return tuple(frame.key if frame.kind == "{" else frame.index for frame in self._stack)
+
+    def _complete(self, start: int, end: int, events: List[Tuple[Tuple[PathItem, ...], Any]]):
+        """Record a value spanning text[start:end] that has just finished."""
+        self._safe_end = end
+        self._safe_closers = "".join(_CLOSERS[frame.kind] for frame in reversed(self._stack))
+        if not self._stack:
+            self._done = True
+            return
+        parent = self._stack[-1]
+        if parent.kind == "{":
+            parent.expect_key = True
+        if len(self._stack) <= self.max_depth:
+            try:
+                events.append((self._path(), loads_lenient(self.text[start:end])))
+            except json.JSONDecodeError:
+                pass
+
+    def _end_scalar(self, end: int, events: List[Tuple[Tuple[PathItem, ...], Any]]):
+        if self._scalar_start is not None:
+            start = self._scalar_start
+            self._scalar_start = None
+            self._complete(start, end, events)
+
+    def feed(self, chunk: str) -> List[Tuple[Tuple[PathItem, ...], Any]]:
+        """
+        Add the next piece of the JSON text.
+
+        Args:
+            chunk: Next fragment of the stream
+
+        Returns:
+            (path, value) for each value completed by this chunk
+        """
+        events: List[Tuple[Tuple[PathItem, ...], Any]] = []
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if self._done:
+                break
+            char = text[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    frame = self._stack[-1] if self._stack else None
+                    if frame is not None and frame.kind == "{" and frame.expect_key:
+                        try:
+                            frame.key = loads_lenient(text[self._string_start : i + 1])
+                        except json.JSONDecodeError:
+                            frame.key = text[self._string_start + 1 : i]
+                        frame.expect_key = False
+                    else:
+                        self._complete(self._string_start, i + 1, events)
+                continue
+
+            if not self._started:
+                # Skip any preamble (e.g. a code fence) before the opening brace
+                if char != "{":
+                    continue
+                self._started = True
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                self._stack.append(_Frame(char, i))
+                self._safe_end = i + 1
+                self._safe_closers = "".join(_CLOSERS[frame.kind] for frame in reversed(self._stack))
+            elif char in "}]":
+                self._end_scalar(i, events)
+                if not self._stack:
+                    continue
+                frame = self._stack.pop()
+                self._complete(frame.start, i + 1, events)
+            elif char == ",":
+                self._end_scalar(i, events)
+                if self._stack and self._stack[-1].kind == "[":
+                    self._stack[-1].index += 1
+            elif char == ":" or char.isspace():
+                self._end_scalar(i, events)
+            elif self._scalar_start is None:
+                self._scalar_start = i
+
+        self._pos = len(text)
+        return events
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Return the parsed object, repairing a truncated stream.
+
+        An unterminated string value is kept and closed; a partial key or
+        number is dropped back to the last complete value; open objects and
+        arrays are closed.
+
+        Returns:
+            The decoded object
+
+        Raises:
+            ValueError: If no JSON object was found or it cannot be repaired
+        """
+        if not self._started:
+            raise ValueError("No JSON object found in response")
+
+        start = self.text.index("{")
+        if self._done:
+            repaired = self.text[start : self._safe_end]
+        elif self._in_string and not (self._stack[-1].kind == "{" and self._stack[-1].expect_key):
+            partial = self.text[start:]
+            # Drop a dangling escape so the closing quote is not swallowed; a
+            # final backslash that completes a "\\" escape is kept
+            if self._escaped:
+                partial = partial[:-1]
+            else:
+                unicode_escape = re.search(r"(\\+)u[0-9a-fA-F]{0,3}$", partial)
+                if unicode_escape and len(unicode_escape.group(1)) % 2:
+                    partial = partial[: unicode_escape.end(1) - 1]
+            repaired = partial + '"' + "".join(_CLOSERS[frame.kind] for frame in reversed(self._stack))
+        else:
+            repaired = self.text[start : self._safe_end] + self._safe_closers
+
+        try:
+            value = loads_lenient(repaired)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Could not repair JSON response: {str(e)}")
+        if not isinstance(value, dict):
+            raise ValueError("JSON response is not an object")
+        return value
+
+
+def set_path(target: Dict[str, Any], path: Tuple[PathItem, ...], value: Any):
+    """
+    Store a streamed value into a partially built object.
+
+    Args:
+        target: Object being assembled from parser events
+        path: Path reported by JsonStreamParser.feed
+        value: Value at that path
+    """
+    node: Any = target
+    for key, next_key in zip(path, path[1:]):
+        if isinstance(node, list):
+            while len(node) <= key:
+                node.append(None)
+            if node[key] is None:
+                node[key] = [] if isinstance(next_key, int) else {}
+            node = node[key]
+        else:
+            node = node.setdefault(key, [] if isinstance(next_key, int) else {})
+    last = path[-1]
+    if isinstance(node, list):
+        while len(node) <= last:
+            node.append(None)
+    node[last] = value
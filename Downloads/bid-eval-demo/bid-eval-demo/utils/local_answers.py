@@ -0,0 +1,208 @@
+"""Deterministic answers to the chat quick actions, rendered directly from the evaluation data."""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.schemas import CATEGORIES
+from utils.scoring import as_score
+
+STATUS_ICONS = {"compliant": "✓", "non_compliant": "✗", "partially": "◐", "unclear": "?"}
+
+
+def _cell(value: Any) -> str:
+    """Make a value safe for a markdown table cell."""
+    return " ".join(str(value if value is not None else "").split()).replace("|", "\\|") or "–"
+
+
+def _table(headers: List[str], rows: List[List[Any]]) -> str:
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    lines += ["| " + " | ".join(_cell(value) for value in row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+def _status(value: Any) -> str:
+    status = str(value or "unclear")
+    return f"{STATUS_ICONS.get(status, '?')} {status.replace('_', ' ')}"
+
+
+def _ranked(evaluations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return sorted(evaluations, key=lambda e: as_score(e.get("overall_score")), reverse=True)
+
+
+def _gaps(evaluation: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        s for s in evaluation.get("mandatory_requirements_status", []) or [] if s.get("status") != "compliant"
+    ]
+
+
+def _compare_top(evaluations, tender_data, criteria) -> str:
+    if len(evaluations) < 2:
+        return "At least two evaluated suppliers are needed for a comparison."
+    first, second = _ranked(evaluations)[:2]
+    names = [first.get("supplier_name", "Unknown"), second.get("supplier_name", "Unknown")]
+
+    def category(evaluation, name):
+        return f"{as_score(evaluation.get('category_scores', {}).get(name, {}).get('score')):.0f}"
+
+    def criterion(evaluation, name):
+        match = next((c for c in evaluation.get("criterion_scores", []) if c.get("criterion") == name), None)
+        return f"{as_score(match.get('score')):.0f}" if match else "–"
+
+    rows = [["Overall score"] + [f"{as_score(e.get('overall_score')):.0f}" for e in (first, second)]]
+    rows += [[f"{name.title()} score"] + [category(e, name) for e in (first, second)] for name in CATEGORIES]
+    for c in criteria or []:
+        label = f"{c.get('criterion')} ({c.get('weight_percentage', 0)}%)"
+        rows.append([label] + [criterion(e, c.get("criterion")) for e in (first, second)])
+    rows += [
+        ["Proposed price"] + [e.get("proposed_price") for e in (first, second)],
+        ["Proposed timeline"] + [e.get("proposed_timeline") for e in (first, second)],
+        ["HSE"] + [_status((e.get("hse_compliance") or {}).get("status")) for e in (first, second)],
+        ["ESG"] + [_status((e.get("esg_compliance") or {}).get("status")) for e in (first, second)],
+        ["ISO certifications"] + [", ".join(e.get("iso_certifications", []) or []) for e in (first, second)],
+        ["Mandatory requirement gaps"] + [len(_gaps(e)) for e in (first, second)],
+        ["Key risks"] + ["; ".join(e.get("key_risks", []) or []) for e in (first, second)],
+    ]
+
+    lead = round(as_score(first.get("overall_score")) - as_score(second.get("overall_score")))
+    return (
+        f"**{names[0]}** ranks first, {lead} point{'' if lead == 1 else 's'} ahead of **{names[1]}**.\n\n"
+        + _table(["", names[0], names[1]], rows)
+    )
+
+
+def _compliance_gaps(evaluations, tender_data, criteria) -> str:
+    rows = []
+    for evaluation in _ranked(evaluations):
+        name = evaluation.get("supplier_name", "Unknown")
+        for status in _gaps(evaluation):
+            rows.append([name, status.get("requirement"), _status(status.get("status")), status.get("evidence")])
+        for label, key in (("HSE", "hse_compliance"), ("ESG", "esg_compliance")):
+            compliance = evaluation.get(key) or {}
+            if compliance.get("status") not in (None, "compliant"):
+                rows.append([name, label, _status(compliance.get("status")), compliance.get("details")])
+    if not rows:
+        return "No compliance gaps: every supplier is compliant with all mandatory, HSE and ESG requirements."
+
+    suppliers = len({row[0] for row in rows})
+    return f"{len(rows)} compliance gaps across {suppliers} of {len(evaluations)} suppliers.\n\n" + _table(
+        ["Supplier", "Requirement", "Status", "Evidence"], rows
+    )
+
+
+def _esg_status(evaluations, tender_data, criteria) -> str:
+    if not evaluations:
+        return "No suppliers have been evaluated yet."
+    rows = []
+    counts: Dict[str, int] = {}
+    for evaluation in _ranked(evaluations):
+        esg = evaluation.get("esg_compliance") or {}
+        status = str(esg.get("status") or "unclear")
+        counts[status] = counts.get(status, 0) + 1
+        rows.append([evaluation.get("supplier_name", "Unknown"), _status(status), esg.get("details")])
+
+    tally = ", ".join(f"{count} {status.replace('_', ' ')}" for status, count in sorted(counts.items()))
+    return f"ESG status of {len(evaluations)} suppliers: {tally}.\n\n" + _table(["Supplier", "ESG", "Details"], rows)
+
+
+def _risk_summary(evaluations, tender_data, criteria) -> str:
+    if not evaluations:
+        return "No suppliers have been evaluated yet."
+    sections = []
+    for evaluation in _ranked(evaluations):
+        risks = evaluation.get("key_risks", []) or []
+        header = (
+            f"**{evaluation.get('supplier_name', 'Unknown')}** "
+            f"(score {as_score(evaluation.get('overall_score')):.0f}, "
+            f"{len(_gaps(evaluation))} requirement gaps, "
+            f"{as_score(evaluation.get('completeness_percentage')):.0f}% complete)"
+        )
+        lines = [f"- {risk}" for risk in risks] or ["- No significant risks identified"]
+        sections.append("\n".join([header] + lines))
+
+    total = sum(len(e.get("key_risks", []) or []) for e in evaluations)
+    return f"{total} key risks identified across {len(evaluations)} suppliers.\n\n" + "\n\n".join(sections)
+
+
+# Words that can appear in any quick-action phrasing without changing its meaning
+_FILLER = {
+    "a", "about", "across", "all", "an", "and", "any", "are", "bid", "bidder", "bidders", "bids", "can", "display",
+    "each", "every", "for", "get", "give", "i", "in", "is", "list", "me", "of", "on", "our", "overview", "please",
+    "see", "show", "summarise", "summarize", "summary", "supplier", "suppliers", "table", "tell", "the", "to",
+    "vendors", "want", "what", "whats", "you",
+}
+
+# Intent -> (keyword groups that must each appear, extra words allowed, renderer)
+INTENTS: Dict[str, tuple] = {
+    "compare_top": (
+        [{"compare", "comparison", "versus", "vs"}, {"top", "best", "leading"}],
+        {"2", "two", "ranked", "scoring"},
+        _compare_top,
+    ),
+    "compliance_gaps": (
+        [{"compliance", "noncompliance", "compliant", "mandatory"}, {"gap", "gaps", "issues", "missing", "non"}],
+        {"requirement", "requirements", "status"},
+        _compliance_gaps,
+    ),
+    "esg_status": (
+        [{"esg"}],
+        {"status", "compliance", "rating", "ratings", "environmental", "social", "governance"},
+        _esg_status,
+    ),
+    "risk_summary": (
+        [{"risk", "risks"}],
+        {"key", "main", "top"},
+        _risk_summary,
+    ),
+}
+
+
+def _normalize(question: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", question.lower()).split())
+
+
+def detect_intent(question: str) -> Optional[str]:
+    """
+    Recognise a question that can be answered from the evaluation data alone.
+
+    A question matches an intent when it contains one word from each of the
+    intent's keyword groups and every other word is filler ("show me",
+    "for all bidders", ...). Anything more specific, such as a supplier
+    name or a follow-up question, still goes to Claude.
+
+    Args:
+        question: User's chat message
+
+    Returns:
+        Intent name from INTENTS, or None
+    """
+    words = set(_normalize(question).split())
+    for intent, (required, allowed, _) in INTENTS.items():
+        vocabulary = _FILLER.union(allowed, *required)
+        if all(group & words for group in required) and words <= vocabulary:
+            return intent
+    return None
+
+
+def answer_locally(
+    question: str,
+    tender_data: Optional[Dict[str, Any]],
+    evaluations: List[Dict[str, Any]],
+    criteria: List[Dict[str, Any]],
+) -> Optional[str]:
+    """
+    Answer a recognised quick-action question without calling Claude.
+
+    Args:
+        question: User's chat message
+        tender_data: Tender information
+        evaluations: All supplier evaluations
+        criteria: Evaluation criteria with weights
+
+    Returns:
+        Markdown answer, or None if the question needs Claude
+    """
+    intent = detect_intent(question)
+    if intent is None:
+        return None
+    render: Callable[..., str] = INTENTS[intent][2]
+    return render(evaluations, tender_data, criteria)
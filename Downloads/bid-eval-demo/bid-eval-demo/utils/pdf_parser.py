@@ -1,55 +1,376 @@
 import fitz
+import hashlib
 import io
-from typing import Optional
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.cache import DiskCache, make_key
 
+# Below this page count PDFs are parsed in-process; a process pool isn't worth its startup
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+MAX_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", str(min(8, os.cpu_count() or 1))))
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+# Bump whenever extraction output changes so stale cache entries are ignored
+PARSER_VERSION = "3"
+
+# WordprocessingML namespace used by every element in word/document.xml
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Extracted text of previously seen documents, keyed by content hash
+extraction_cache = DiskCache(
+    "extracted_text",
+    max_bytes=int(os.getenv("BID_EVAL_EXTRACTION_CACHE_MB", "512")) * 1024 * 1024,
+    enabled=os.getenv("BID_EVAL_EXTRACTION_CACHE", "1") != "0",
+)
+
+
+# Worker pool shared by every upload in this process, started on first use
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool(reset: bool = False) -> ProcessPoolExecutor:
     """
-    Extract text from a PDF file.
+    Get the shared page extraction pool, starting it if needed.
+
+    Workers are spawned rather than forked: forking the multithreaded
+    Streamlit server can copy locks held by other threads into the child.
+
+    Args:
+        reset: Replace the current pool (e.g. after a worker died)
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if reset and _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=MAX_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _parse_pool
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of a PDF on disk (process pool worker)."""
+    with fitz.open(pdf_path) as pdf_document:
+        return [pdf_document[page_num].get_text() for page_num in range(start, stop)]
+
+
+def _iter_pages_parallel(file_content: bytes, page_count: int) -> Iterator[str]:
+    """
+    Extract page texts by sharding page ranges across the shared process pool.
+
+    Workers open the document from a shared temporary file rather than
+    receiving the PDF bytes through a pipe. Shards are yielded in page order
+    as soon as each one (and every shard before it) has finished.
 
     Args:
         file_content: Raw bytes of the PDF file
+        page_count: Number of pages in the document
+
+    Yields:
+        Text of each page, in page order
+    """
+    workers = min(MAX_PARSE_WORKERS, page_count)
+    # A few shards per worker keeps the pool busy when some pages are heavier
+    shard_size = max(1, -(-page_count // (workers * 4)))
+    ranges = [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    futures = []
+    try:
+        tmp.write(file_content)
+        tmp.close()
+        try:
+            executor = _get_parse_pool()
+            futures = [executor.submit(_extract_page_range, tmp.name, start, stop) for start, stop in ranges]
+        except BrokenProcessPool:
+            executor = _get_parse_pool(reset=True)
+            futures = [executor.submit(_extract_page_range, tmp.name, start, stop) for start, stop in ranges]
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Also reached when the consumer stops early: drop shards not yet started,
+        # and let running ones finish before their file goes away
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        os.unlink(tmp.name)
+
+
+def get_page_count(file_content: bytes, file_type: str) -> Optional[int]:
+    """
+    Count the pages of an uploaded file without extracting any text.
+
+    Args:
+        file_content: Raw bytes of the file
+        file_type: File extension (pdf, docx, txt)
 
     Returns:
-        Extracted text as string
+        Number of pages, or None for formats without fixed pages
+    """
+    if file_type.lower() != "pdf":
+        return None
+    cached = _get_cached_extraction(file_content, file_type)
+    if cached is not None:
+        return len(cached["offsets"])
+    try:
+        with fitz.open(stream=file_content, filetype="pdf") as pdf_document:
+            return len(pdf_document)
+    except Exception as e:
+        raise ValueError(f"Error extracting text from PDF: {str(e)}")
+
+
+def iter_pdf_pages(file_content: bytes) -> Iterator[Tuple[int, str]]:
+    """
+    Yield the text of a PDF one page at a time.
+
+    Large documents (PARALLEL_MIN_PAGES pages or more) are split into page
+    ranges and parsed in a process pool; pages are still yielded in order.
+    Closing the generator early stops any remaining work.
+
+    Args:
+        file_content: Raw bytes of the PDF file
+
+    Yields:
+        (page_number, text) tuples, page numbers starting at 1
     """
     try:
         pdf_document = fitz.open(stream=file_content, filetype="pdf")
-        text = ""
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            text += page.get_text()
-        pdf_document.close()
-        return text
     except Exception as e:
         raise ValueError(f"Error extracting text from PDF: {str(e)}")
 
+    try:
+        page_count = len(pdf_document)
 
-def extract_text_from_file(file_content: bytes, file_type: str) -> str:
+        if page_count < PARALLEL_MIN_PAGES or MAX_PARSE_WORKERS < 2:
+            for page_num in range(page_count):
+                yield page_num + 1, pdf_document[page_num].get_text()
+            return
+
+        for page_num, text in enumerate(_iter_pages_parallel(file_content, page_count), 1):
+            yield page_num, text
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error extracting text from PDF: {str(e)}")
+    finally:
+        pdf_document.close()
+
+
+def _iter_docx_blocks(file_content: bytes) -> Iterator[Optional[str]]:
     """
-    Extract text from uploaded file (PDF, DOCX, or TXT).
+    Stream paragraphs and table rows out of a DOCX body in document order.
+
+    word/document.xml is decompressed and parsed incrementally, and each
+    top-level element is discarded once emitted, so memory stays flat on
+    very large documents. Table rows are emitted as cells joined by " | ";
+    nested tables are folded into the text of their enclosing cell.
 
     Args:
-        file_content: Raw bytes of the file
-        file_type: File extension (pdf, docx, txt)
+        file_content: Raw bytes of the DOCX file
 
-    Returns:
-        Extracted text as string
+    Yields:
+        Paragraph or row text, or None where an explicit page break occurs
     """
-    file_type = file_type.lower()
+    body = None
+    # Elements currently open, outermost first
+    open_elems: List[ET.Element] = []
+    parts: List[str] = []
+    # One {"cells", "paras"} frame per open table, innermost last
+    tables: List[Dict[str, List[str]]] = []
 
+    with zipfile.ZipFile(io.BytesIO(file_content)) as archive:
+        with archive.open("word/document.xml") as document_xml:
+            for event, elem in ET.iterparse(document_xml, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    open_elems.append(elem)
+                    if tag == f"{_W}body":
+                        body = elem
+                    elif tag == f"{_W}tbl":
+                        tables.append({"cells": [], "paras": []})
+                    elif tag == f"{_W}tr" and tables:
+                        tables[-1]["cells"] = []
+                    elif tag == f"{_W}tc" and tables:
+                        tables[-1]["paras"] = []
+                    continue
+
+                open_elems.pop()
+                parent = open_elems[-1] if open_elems else None
+                if tag == f"{_W}t":
+                    parts.append(elem.text or "")
+                elif tag == f"{_W}tab" and parent is not None and parent.tag == f"{_W}r":
+                    # Only a tab character in a run; w:tab under w:pPr/w:tabs is a tab-stop definition
+                    parts.append("\t")
+                elif tag in (f"{_W}br", f"{_W}cr"):
+                    if elem.get(f"{_W}type") == "page":
+                        # Page breaks inside tables are ignored; rows are never split
+                        if not tables:
+                            if "".join(parts).strip():
+                                yield "".join(parts)
+                            parts = []
+                            yield None
+                    else:
+                        parts.append("\n")
+                elif tag == f"{_W}p":
+                    text = "".join(parts)
+                    parts = []
+                    if tables:
+                        tables[-1]["paras"].append(text)
+                    else:
+                        yield text
+                elif tag == f"{_W}tc" and tables:
+                    cell = " ".join(p.strip() for p in tables[-1]["paras"] if p.strip())
+                    tables[-1]["cells"].append(cell)
+                elif tag == f"{_W}tr" and tables:
+                    row = " | ".join(tables[-1]["cells"])
+                    if len(tables) == 1:
+                        yield row
+                    else:
+                        # Nested table: its rows become paragraphs of the outer cell
+                        tables[-2]["paras"].append(row)
+                elif tag == f"{_W}tbl" and tables:
+                    tables.pop()
+
+                if body is not None and parent is body:
+                    # Top-level element fully emitted: drop it from the tree
+                    elem.clear()
+                    body.remove(elem)
+
+
+def iter_docx_pages(file_content: bytes) -> Iterator[Tuple[int, str]]:
+    """
+    Yield the text of a DOCX file page by page, including table rows.
+
+    Pages are delimited by explicit page breaks in the document; Word's own
+    layout-dependent pagination is not reproduced.
+
+    Args:
+        file_content: Raw bytes of the DOCX file
+
+    Yields:
+        (page_number, text) tuples, page numbers starting at 1
+    """
+    page_num = 1
+    lines: List[str] = []
+    try:
+        for block in _iter_docx_blocks(file_content):
+            if block is None:
+                yield page_num, "\n".join(lines) + "\n"
+                page_num += 1
+                lines = []
+            else:
+                lines.append(block)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        raise ValueError(f"Error extracting text from DOCX: {str(e)}")
+    if lines or page_num == 1:
+        yield page_num, "\n".join(lines) + "\n"
+
+
+def _extraction_key(file_content: bytes, file_type: str) -> str:
+    """Cache key for the extracted text of a document."""
+    return make_key("extracted_text", PARSER_VERSION, file_type.lower(), hashlib.sha256(file_content).hexdigest())
+
+
+def _get_cached_extraction(file_content: bytes, file_type: str) -> Optional[Dict[str, Any]]:
+    """Return the cached {"text", "offsets"} entry for a document, if any."""
+    if not extraction_cache.enabled:
+        return None
+    cached = extraction_cache.get(_extraction_key(file_content, file_type))
+    return json.loads(cached) if cached is not None else None
+
+
+def _cache_extraction(file_content: bytes, file_type: str, pages: List[str]):
+    """Store extracted pages as one text plus the start offset of each page."""
+    offsets = []
+    position = 0
+    for text in pages:
+        offsets.append(position)
+        position += len(text)
+    entry = {"text": "".join(pages), "offsets": offsets}
+    extraction_cache.set(_extraction_key(file_content, file_type), json.dumps(entry).encode("utf-8"))
+
+
+def _iter_uncached_pages(file_content: bytes, file_type: str) -> Iterator[Tuple[int, str]]:
+    """Decode a document page by page (see iter_file_pages)."""
     if file_type == "pdf":
-        return extract_text_from_pdf(file_content)
+        yield from iter_pdf_pages(file_content)
     elif file_type == "txt":
-        return file_content.decode("utf-8", errors="ignore")
+        yield 1, file_content.decode("utf-8", errors="ignore")
     elif file_type == "docx":
-        # Basic DOCX support - try to extract text
-        try:
-            import docx
-            doc = docx.Document(io.BytesIO(file_content))
-            return "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        except:
-            # Fallback: return as text
-            return file_content.decode("utf-8", errors="ignore")
+        yield from iter_docx_pages(file_content)
     else:
         raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def iter_file_pages(file_content: bytes, file_type: str) -> Iterator[Tuple[int, str]]:
+    """
+    Yield the text of an uploaded file (PDF, DOCX, or TXT) page by page.
+
+    Formats without fixed pages are yielded as a single page. Documents seen
+    before (same bytes, same PARSER_VERSION) are served from the on-disk
+    extraction cache without opening the parser at all.
+
+    Args:
+        file_content: Raw bytes of the file
+        file_type: File extension (pdf, docx, txt)
+
+    Yields:
+        (page_number, text) tuples, page numbers starting at 1
+    """
+    file_type = file_type.lower()
+    if file_type == "txt":
+        yield from _iter_uncached_pages(file_content, file_type)
+        return
+
+    cached = _get_cached_extraction(file_content, file_type)
+    if cached is not None:
+        text, offsets = cached["text"], cached["offsets"]
+        bounds = offsets[1:] + [len(text)]
+        for page_num, (start, stop) in enumerate(zip(offsets, bounds), 1):
+            yield page_num, text[start:stop]
+        return
+
+    pages = []
+    for page_num, text in _iter_uncached_pages(file_content, file_type):
+        pages.append(text)
+        yield page_num, text
+
+    # Only reached when the whole document was read, so partial extractions are never cached
+    _cache_extraction(file_content, file_type, pages)
+
+
+def extract_text_from_pdf(file_content: bytes) -> str:
+    """
+    Extract text from a PDF file.
+
+    Args:
+        file_content: Raw bytes of the PDF file
+
+    Returns:
+        Extracted text as string
+    """
+    return "".join(text for _, text in iter_file_pages(file_content, "pdf"))
+
+
+def extract_text_from_file(file_content: bytes, file_type: str) -> str:
+    """
+    Extract text from uploaded file (PDF, DOCX, or TXT).
+
+    Args:
+        file_content: Raw bytes of the file
+        file_type: File extension (pdf, docx, txt)
+
+    Returns:
+        Extracted text as string
+    """
+    return "".join(text for _, text in iter_file_pages(file_content, file_type))
@@ -0,0 +1,145 @@
+"""In-process BM25 retrieval over the pages of a bid, for evidence-focused prompts."""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.text_prep import PAGE_BREAK, split_oversized_page, estimate_tokens
+
+# Paragraphs are merged into passages of up to about this many tokens; longer ones are split at line breaks
+PASSAGE_TOKENS = 300
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    """a an and are as at be been but by can for from has have if in into is it its may must no not of on or
+    our shall should such that the their them then there these they this to was we were which will with
+    within without would you your all any each per""".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens with stopwords and single characters removed."""
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1 and token not in _STOPWORDS]
+
+
+def _split_passages(text: str) -> List[Dict[str, object]]:
+    """
+    Split page-separated text into passages of whole paragraphs, each within one page.
+
+    Extracted PDF and DOCX pages rarely contain blank lines, so a paragraph
+    over PASSAGE_TOKENS is cut further at line breaks.
+    """
+    passages: List[Dict[str, object]] = []
+    for page_number, page in enumerate(text.split(PAGE_BREAK), 1):
+        current = ""
+        for block in re.split(r"\n\s*\n", page):
+            for paragraph in split_oversized_page(block.strip(), PASSAGE_TOKENS):
+                paragraph = paragraph.strip()
+                if not paragraph:
+                    continue
+                if current and estimate_tokens(current) + estimate_tokens(paragraph) > PASSAGE_TOKENS:
+                    passages.append({"page": page_number, "text": current})
+                    current = ""
+                current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current:
+            passages.append({"page": page_number, "text": current})
+    return passages
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of passages.
+
+    Term frequencies are held as a sparse matrix in coordinate form (one
+    array each of passage ids, term ids and counts, sorted by term), so a
+    query only touches the postings of its own terms.
+    """
+
+    def __init__(self, passages: List[Dict[str, object]]):
+        self.passages = passages
+        vocabulary: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        counts: List[int] = []
+        lengths = np.zeros(len(passages), dtype=np.float64)
+
+        for row, passage in enumerate(passages):
+            tokens = tokenize(str(passage["text"]))
+            lengths[row] = len(tokens)
+            term_counts: Dict[int, int] = {}
+            for token in tokens:
+                term = vocabulary.setdefault(token, len(vocabulary))
+                term_counts[term] = term_counts.get(term, 0) + 1
+            rows.extend([row] * len(term_counts))
+            cols.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+
+        self.vocabulary = vocabulary
+        order = np.argsort(np.asarray(cols, dtype=np.int64), kind="stable")
+        self._rows = np.asarray(rows, dtype=np.int64)[order]
+        self._counts = np.asarray(counts, dtype=np.float64)[order]
+        # Postings of term t are _rows[_offsets[t]:_offsets[t + 1]]
+        term_ids = np.asarray(cols, dtype=np.int64)[order]
+        self._offsets = np.searchsorted(term_ids, np.arange(len(vocabulary) + 1))
+
+        n = max(len(passages), 1)
+        document_frequency = np.diff(self._offsets).astype(np.float64)
+        self._idf = np.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = lengths.mean() if len(passages) else 0.0
+        if average_length:
+            self._length_norm = K1 * (1 - B + B * lengths / average_length)
+        else:
+            self._length_norm = np.full(len(passages), K1)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every passage for a query."""
+        scores = np.zeros(len(self.passages), dtype=np.float64)
+        for token in set(tokenize(query)):
+            term = self.vocabulary.get(token)
+            if term is None:
+                continue
+            start, stop = self._offsets[term], self._offsets[term + 1]
+            rows = self._rows[start:stop]
+            tf = self._counts[start:stop]
+            scores[rows] += self._idf[term] * tf * (K1 + 1) / (tf + self._length_norm[rows])
+        return scores
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Find the passages most relevant to a query.
+
+        Args:
+            query: Free-text query, e.g. a criterion or requirement
+            top_k: Maximum number of passages to return
+
+        Returns:
+            (passage_index, score) pairs, best first, excluding passages with no matching terms
+        """
+        scores = self.scores(query)
+        if top_k <= 0 or not scores.size:
+            return []
+        top_k = min(top_k, scores.size)
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(idx), float(scores[idx])) for idx in best if scores[idx] > 0]
+
+
+@lru_cache(maxsize=16)
+def build_index(text: str) -> BM25Index:
+    """
+    Build (or reuse) the BM25 index for a bid's prepared text.
+
+    Args:
+        text: Bid text with pages joined by PAGE_BREAK
+
+    Returns:
+        Index over the bid's paragraph passages
+    """
+    return BM25Index(_split_passages(text))
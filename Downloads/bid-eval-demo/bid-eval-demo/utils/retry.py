@@ -0,0 +1,176 @@
+"""Retry policy for transient Claude API failures."""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from anthropic import APIConnectionError, APIStatusError
+
+# Retries allowed per call for each class of transient error
+DEFAULT_BUDGETS = {
+    "rate_limited": 6,
+    "overloaded": 5,
+    "server_error": 3,
+    "connection": 3,
+}
+
+# Error types the API reports in an error body, e.g. an SSE error event sent mid-stream
+_ERROR_TYPES = {
+    "rate_limit_error": "rate_limited",
+    "overloaded_error": "overloaded",
+    "api_error": "server_error",
+}
+
+# Counters across all calls in this process, for monitoring
+_stats: Dict[str, float] = {"calls": 0, "retries": 0, "gave_up": 0, "sleep_seconds": 0.0}
+_stats_by_class: Dict[str, int] = {name: 0 for name in DEFAULT_BUDGETS}
+_stats_lock = threading.Lock()
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """
+    Map an API exception to a retryable error class.
+
+    Args:
+        error: Exception raised by the Anthropic client
+
+    Returns:
+        Error class name from DEFAULT_BUDGETS, or None if the error is not transient
+    """
+    if isinstance(error, APIConnectionError):
+        # Includes APITimeoutError
+        return "connection"
+    if isinstance(error, APIStatusError):
+        status = error.status_code
+        if status == 429:
+            return "rate_limited"
+        if status == 529:
+            return "overloaded"
+        if status == 408:
+            return "connection"
+        if status >= 500:
+            return "server_error"
+        # Errors sent as stream events arrive on a 200 response; the body says what they were
+        body = error.body if isinstance(error.body, dict) else {}
+        details = body.get("error")
+        if isinstance(details, dict):
+            return _ERROR_TYPES.get(details.get("type"))
+    return None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the server's requested delay from a failed response.
+
+    Args:
+        error: Exception raised by the Anthropic client
+
+    Returns:
+        Seconds to wait, or None if the response carried no usable hint
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, per-error-class budgets and an overall deadline."""
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        deadline: float = 300.0,
+    ):
+        self.budgets = dict(budgets or DEFAULT_BUDGETS)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before the given retry attempt (1-based), honouring Retry-After."""
+        requested = retry_after_seconds(error)
+        if requested is not None:
+            return min(requested, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call fn, retrying transient API errors.
+
+        Args:
+            fn: Function to call
+            args: Positional arguments for fn
+            kwargs: Keyword arguments for fn
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            The last error once it is not retryable, its class budget is
+            spent, or waiting again would pass the deadline
+        """
+        started = time.monotonic()
+        used = {name: 0 for name in self.budgets}
+        attempt = 0
+        with _stats_lock:
+            _stats["calls"] += 1
+
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error_class = classify_error(e)
+                if error_class is None:
+                    raise
+                used[error_class] = used.get(error_class, 0) + 1
+                attempt += 1
+                delay = self.backoff(attempt, e)
+                out_of_budget = used[error_class] > self.budgets.get(error_class, 0)
+                past_deadline = time.monotonic() - started + delay > self.deadline
+                if out_of_budget or past_deadline:
+                    with _stats_lock:
+                        _stats["gave_up"] += 1
+                    raise
+                with _stats_lock:
+                    _stats["retries"] += 1
+                    _stats["sleep_seconds"] += delay
+                    _stats_by_class[error_class] = _stats_by_class.get(error_class, 0) + 1
+            time.sleep(delay)
+
+
+def get_retry_stats() -> Dict[str, Any]:
+    """Return retry counters for this process."""
+    with _stats_lock:
+        return {**_stats, "by_class": dict(_stats_by_class)}
+
+
+# Policy applied to every Claude call; limits can be tuned via environment
+default_policy = RetryPolicy(
+    base_delay=float(os.getenv("BID_EVAL_RETRY_BASE_DELAY", "1")),
+    max_delay=float(os.getenv("BID_EVAL_RETRY_MAX_DELAY", "60")),
+    deadline=float(os.getenv("BID_EVAL_RETRY_DEADLINE", "300")),
+)
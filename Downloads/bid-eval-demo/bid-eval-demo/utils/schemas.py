@@ -0,0 +1,511 @@
+"""Tool schemas for structured Claude output and validation into typed records."""
+
+from typing import Any, Dict, List, Optional, Tuple, TypedDict, Union
+
+# Allowed values for status-like fields
+COMPLIANCE_STATUSES = ["compliant", "partially", "non_compliant", "unclear"]
+CRITERION_FLAGS = ["met", "partially_met", "not_met", "not_found"]
+CATEGORIES = ["technical", "commercial", "compliance"]
+
+
+class CriterionWeight(TypedDict):
+    criterion: str
+    weight_percentage: float
+    category: str
+
+
+class TenderData(TypedDict):
+    tender_title: str
+    issuing_organization: str
+    tender_reference: str
+    submission_deadline: str
+    scope_of_work: str
+    evaluation_criteria: List[CriterionWeight]
+    mandatory_requirements: List[str]
+    technical_specifications: List[str]
+    commercial_requirements: List[str]
+    compliance_requirements: List[str]
+    deliverables: List[str]
+    contract_duration: str
+
+
+class CategoryScore(TypedDict):
+    score: float
+    summary: str
+    strengths: List[str]
+    gaps: List[str]
+
+
+class CriterionScore(TypedDict):
+    criterion: str
+    score: float
+    evidence: str
+    flag: str
+
+
+class RequirementStatus(TypedDict):
+    requirement: str
+    status: str
+    evidence: str
+
+
+class ComplianceStatus(TypedDict):
+    status: str
+    details: str
+
+
+class SupplierEvaluation(TypedDict):
+    supplier_name: str
+    supplier_country: str
+    bid_reference: str
+    overall_score: float
+    category_scores: Dict[str, CategoryScore]
+    criterion_scores: List[CriterionScore]
+    mandatory_requirements_status: List[RequirementStatus]
+    hse_compliance: ComplianceStatus
+    esg_compliance: ComplianceStatus
+    iso_certifications: List[str]
+    proposed_price: str
+    proposed_timeline: str
+    key_risks: List[str]
+    recommendation: str
+    completeness_percentage: float
+
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_SCORE = {"type": "number", "minimum": 0, "maximum": 100}
+
+TENDER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tender_title": {"type": "string"},
+        "issuing_organization": {"type": "string"},
+        "tender_reference": {"type": "string"},
+        "submission_deadline": {"type": "string"},
+        "scope_of_work": {"type": "string", "description": "Brief summary"},
+        "evaluation_criteria": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "criterion": {"type": "string"},
+                    "weight_percentage": {"type": "number"},
+                    "category": {"type": "string", "enum": CATEGORIES},
+                },
+                "required": ["criterion", "weight_percentage", "category"],
+            },
+        },
+        "mandatory_requirements": _STRING_LIST,
+        "technical_specifications": _STRING_LIST,
+        "commercial_requirements": _STRING_LIST,
+        "compliance_requirements": _STRING_LIST,
+        "deliverables": _STRING_LIST,
+        "contract_duration": {"type": "string"},
+    },
+    "required": [
+        "tender_title",
+        "issuing_organization",
+        "tender_reference",
+        "submission_deadline",
+        "scope_of_work",
+        "evaluation_criteria",
+        "mandatory_requirements",
+        "technical_specifications",
+        "commercial_requirements",
+        "compliance_requirements",
+        "deliverables",
+        "contract_duration",
+    ],
+}
+
+# The evaluation tool uses a compact wire format to keep generated output short:
+# abbreviated keys, criteria/requirements referred to by their number in the
+# prompt, and one-letter codes for statuses. expand_evaluation() rebuilds the
+# SupplierEvaluation layout used everywhere else.
+CATEGORY_KEYS = {"tech": "technical", "comm": "commercial", "comp": "compliance"}
+STATUS_CODES = {"C": "compliant", "P": "partially", "N": "non_compliant", "U": "unclear"}
+FLAG_CODES = {"M": "met", "P": "partially_met", "N": "not_met", "X": "not_found"}
+
+_COMPACT_CATEGORY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "s": _SCORE,
+        "sum": {"type": "string", "description": "Score summary"},
+        "pro": {**_STRING_LIST, "description": "Strengths"},
+        "con": {**_STRING_LIST, "description": "Gaps"},
+    },
+    "required": ["s", "sum", "pro", "con"],
+}
+
+_COMPACT_COMPLIANCE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "s": {"type": "string", "enum": list(STATUS_CODES), "description": "C/P/N/U status code"},
+        "d": {"type": "string", "description": "Details"},
+    },
+    "required": ["s", "d"],
+}
+
+EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "n": {"type": "string", "description": "Supplier name"},
+        "co": {"type": "string", "description": "Supplier country"},
+        "ref": {"type": "string", "description": "Bid reference"},
+        "o": {**_SCORE, "description": "Overall score"},
+        "cat": {
+            "type": "object",
+            "description": "Category scores: tech(nical), comm(ercial), comp(liance)",
+            "properties": {key: _COMPACT_CATEGORY_SCHEMA for key in CATEGORY_KEYS},
+            "required": list(CATEGORY_KEYS),
+        },
+        "hse": {**_COMPACT_COMPLIANCE_SCHEMA, "description": "HSE compliance"},
+        "esg": {**_COMPACT_COMPLIANCE_SCHEMA, "description": "ESG compliance"},
+        "iso": {**_STRING_LIST, "description": "ISO certifications"},
+        "pr": {"type": "string", "description": "Proposed price"},
+        "tl": {"type": "string", "description": "Proposed timeline"},
+        "rec": {"type": "string", "description": "Brief recommendation"},
+        "pct": {**_SCORE, "description": "Completeness percentage"},
+        "rk": {**_STRING_LIST, "description": "Key risks"},
+        "cr": {
+            "type": "array",
+            "description": "Score for each evaluation criterion",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "i": {"type": "integer", "description": "Criterion number from the list"},
+                    "nm": {"type": "string", "description": "Criterion name, only if it has no number"},
+                    "s": _SCORE,
+                    "e": {"type": "string", "description": "Evidence"},
+                    "f": {"type": "string", "enum": list(FLAG_CODES), "description": "M/P/N/X flag code"},
+                },
+                "required": ["i", "s", "e", "f"],
+            },
+        },
+        "mr": {
+            "type": "array",
+            "description": "Status of each mandatory requirement",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "i": {"type": "integer", "description": "Requirement number from the list"},
+                    "nm": {"type": "string", "description": "Requirement text, only if it has no number"},
+                    "s": {"type": "string", "enum": list(STATUS_CODES), "description": "C/P/N/U status code"},
+                    "e": {"type": "string", "description": "Evidence"},
+                },
+                "required": ["i", "s", "e"],
+            },
+        },
+    },
+    "required": ["n", "co", "ref", "o", "cat", "hse", "esg", "iso", "pr", "tl", "rec", "pct", "rk", "cr", "mr"],
+}
+
+# Evidence extracted from one part of a long bid; keys are C<n> for criteria,
+# R<n> for mandatory requirements, or one of EVIDENCE_TOPICS
+EVIDENCE_TOPICS = {
+    "INFO": "Supplier identity",
+    "PRICE": "Price",
+    "TIME": "Timeline",
+    "HSE": "HSE",
+    "ESG": "ESG",
+    "ISO": "ISO certifications",
+    "RISK": "Risks and gaps",
+}
+
+EVIDENCE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "ev": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "k": {
+                        "type": "string",
+                        "description": "C<number> criterion, R<number> requirement, or " + "/".join(EVIDENCE_TOPICS),
+                    },
+                    "p": {"type": "integer", "description": "Page number"},
+                    "q": {"type": "string", "description": "Short quote or precise paraphrase"},
+                },
+                "required": ["k", "p", "q"],
+            },
+        },
+    },
+    "required": ["ev"],
+}
+
+TENDER_TOOL = {
+    "name": "record_tender",
+    "description": "Record the structured contents of a tender/RFP document.",
+    "input_schema": TENDER_SCHEMA,
+}
+
+EVALUATION_TOOL = {
+    "name": "record_evaluation",
+    "description": "Record the evaluation of one supplier bid against the tender, in compact form.",
+    "input_schema": EVALUATION_SCHEMA,
+}
+
+EVIDENCE_TOOL = {
+    "name": "record_evidence",
+    "description": "Record evidence found in one part of a supplier bid.",
+    "input_schema": EVIDENCE_SCHEMA,
+}
+
+
+def _text(value: Any, default: str = "Not specified") -> str:
+    if value is None:
+        return default
+    text = str(value).strip()
+    return text or default
+
+
+def _number(value: Any, low: float = 0, high: float = 100) -> float:
+    try:
+        number = float(str(value).rstrip("%"))
+    except (TypeError, ValueError):
+        return 0.0
+    return max(low, min(high, number))
+
+
+def _text_list(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _choice(value: Any, allowed: List[str], default: str) -> str:
+    text = str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return text if text in allowed else default
+
+
+def _compliance(value: Any) -> ComplianceStatus:
+    value = value if isinstance(value, dict) else {}
+    return {
+        "status": _choice(value.get("status"), COMPLIANCE_STATUSES, "unclear"),
+        "details": _text(value.get("details"), "na"),
+    }
+
+
+def validate_tender_data(data: Dict[str, Any]) -> TenderData:
+    """
+    Normalise tool output into a TenderData record.
+
+    Missing fields get their documented defaults and weights are coerced to
+    numbers, so pages can rely on every key being present.
+
+    Args:
+        data: Raw tool input returned by Claude
+
+    Returns:
+        Validated tender record
+    """
+    criteria: List[CriterionWeight] = []
+    for item in data.get("evaluation_criteria") or []:
+        if not isinstance(item, dict) or not item.get("criterion"):
+            continue
+        criteria.append(
+            {
+                "criterion": _text(item.get("criterion")),
+                "weight_percentage": _number(item.get("weight_percentage")),
+                "category": _choice(item.get("category"), CATEGORIES, "technical"),
+            }
+        )
+
+    return {
+        "tender_title": _text(data.get("tender_title")),
+        "issuing_organization": _text(data.get("issuing_organization")),
+        "tender_reference": _text(data.get("tender_reference")),
+        "submission_deadline": _text(data.get("submission_deadline")),
+        "scope_of_work": _text(data.get("scope_of_work")),
+        "evaluation_criteria": criteria,
+        "mandatory_requirements": _text_list(data.get("mandatory_requirements")),
+        "technical_specifications": _text_list(data.get("technical_specifications")),
+        "commercial_requirements": _text_list(data.get("commercial_requirements")),
+        "compliance_requirements": _text_list(data.get("compliance_requirements")),
+        "deliverables": _text_list(data.get("deliverables")),
+        "contract_duration": _text(data.get("contract_duration")),
+    }
+
+
+def validate_evaluation(data: Dict[str, Any]) -> SupplierEvaluation:
+    """
+    Normalise tool output into a SupplierEvaluation record.
+
+    Scores are clamped to 0-100, enum fields fall back to their "unknown"
+    value, and missing lists become empty.
+
+    Args:
+        data: Raw tool input returned by Claude
+
+    Returns:
+        Validated evaluation record
+    """
+    raw_categories = data.get("category_scores") if isinstance(data.get("category_scores"), dict) else {}
+    category_scores: Dict[str, CategoryScore] = {}
+    for category in CATEGORIES:
+        value = raw_categories.get(category) if isinstance(raw_categories.get(category), dict) else {}
+        category_scores[category] = {
+            "score": _number(value.get("score")),
+            "summary": _text(value.get("summary"), "na"),
+            "strengths": _text_list(value.get("strengths")),
+            "gaps": _text_list(value.get("gaps")),
+        }
+
+    criterion_scores: List[CriterionScore] = [
+        {
+            "criterion": _text(item.get("criterion")),
+            "score": _number(item.get("score")),
+            "evidence": _text(item.get("evidence"), "na"),
+            "flag": _choice(item.get("flag"), CRITERION_FLAGS, "not_found"),
+        }
+        for item in data.get("criterion_scores") or []
+        if isinstance(item, dict)
+    ]
+
+    requirements: List[RequirementStatus] = [
+        {
+            "requirement": _text(item.get("requirement")),
+            "status": _choice(item.get("status"), COMPLIANCE_STATUSES, "unclear"),
+            "evidence": _text(item.get("evidence"), "na"),
+        }
+        for item in data.get("mandatory_requirements_status") or []
+        if isinstance(item, dict)
+    ]
+
+    return {
+        "supplier_name": _text(data.get("supplier_name"), "Unknown"),
+        "supplier_country": _text(data.get("supplier_country"), "na"),
+        "bid_reference": _text(data.get("bid_reference"), "na"),
+        "overall_score": _number(data.get("overall_score")),
+        "category_scores": category_scores,
+        "criterion_scores": criterion_scores,
+        "mandatory_requirements_status": requirements,
+        "hse_compliance": _compliance(data.get("hse_compliance")),
+        "esg_compliance": _compliance(data.get("esg_compliance")),
+        "iso_certifications": _text_list(data.get("iso_certifications")),
+        "proposed_price": _text(data.get("proposed_price"), "na"),
+        "proposed_timeline": _text(data.get("proposed_timeline"), "na"),
+        "key_risks": _text_list(data.get("key_risks")),
+        "recommendation": _text(data.get("recommendation"), "na"),
+        "completeness_percentage": _number(data.get("completeness_percentage")),
+    }
+
+
+def _lookup(item: Dict[str, Any], names: List[str]) -> str:
+    """Resolve a 1-based list number (or fallback name) from a compact item."""
+    try:
+        number = int(item.get("i"))
+    except (TypeError, ValueError):
+        number = 0
+    if 1 <= number <= len(names):
+        return names[number - 1]
+    return _text(item.get("nm"), f"Item {number}" if number else "Not specified")
+
+
+def _expand_category(value: Any) -> Dict[str, Any]:
+    value = value if isinstance(value, dict) else {}
+    return {"score": value.get("s"), "summary": value.get("sum"), "strengths": value.get("pro"), "gaps": value.get("con")}
+
+
+def _expand_compliance(value: Any) -> Dict[str, Any]:
+    value = value if isinstance(value, dict) else {}
+    return {"status": STATUS_CODES.get(value.get("s"), value.get("s")), "details": value.get("d")}
+
+
+def _expand_criterion(item: Any, criteria: List[str]) -> Dict[str, Any]:
+    item = item if isinstance(item, dict) else {}
+    return {
+        "criterion": _lookup(item, criteria),
+        "score": item.get("s"),
+        "evidence": item.get("e"),
+        "flag": FLAG_CODES.get(item.get("f"), item.get("f")),
+    }
+
+
+def _expand_requirement(item: Any, requirements: List[str]) -> Dict[str, Any]:
+    item = item if isinstance(item, dict) else {}
+    return {
+        "requirement": _lookup(item, requirements),
+        "status": STATUS_CODES.get(item.get("s"), item.get("s")),
+        "evidence": item.get("e"),
+    }
+
+
+# Compact top-level key -> (full key, expander taking (value, criteria, requirements))
+_EXPANDERS = {
+    "n": ("supplier_name", lambda v, c, r: v),
+    "co": ("supplier_country", lambda v, c, r: v),
+    "ref": ("bid_reference", lambda v, c, r: v),
+    "o": ("overall_score", lambda v, c, r: v),
+    "cat": (
+        "category_scores",
+        lambda v, c, r: {full: _expand_category(v.get(key)) for key, full in CATEGORY_KEYS.items() if key in v}
+        if isinstance(v, dict)
+        else {},
+    ),
+    "hse": ("hse_compliance", lambda v, c, r: _expand_compliance(v)),
+    "esg": ("esg_compliance", lambda v, c, r: _expand_compliance(v)),
+    "iso": ("iso_certifications", lambda v, c, r: v),
+    "pr": ("proposed_price", lambda v, c, r: v),
+    "tl": ("proposed_timeline", lambda v, c, r: v),
+    "rec": ("recommendation", lambda v, c, r: v),
+    "pct": ("completeness_percentage", lambda v, c, r: v),
+    "rk": ("key_risks", lambda v, c, r: v),
+    "cr": (
+        "criterion_scores",
+        lambda v, c, r: [_expand_criterion(item, c) for item in v] if isinstance(v, list) else [],
+    ),
+    "mr": (
+        "mandatory_requirements_status",
+        lambda v, c, r: [_expand_requirement(item, r) for item in v] if isinstance(v, list) else [],
+    ),
+}
+
+
+def expand_evaluation(compact: Dict[str, Any], criteria: List[str], requirements: List[str]) -> Dict[str, Any]:
+    """
+    Rebuild the full evaluation layout from the compact tool output.
+
+    Args:
+        compact: Tool input in the compact wire format
+        criteria: Criterion names, in the order they were numbered in the prompt
+        requirements: Mandatory requirements, in the order they were numbered
+
+    Returns:
+        Evaluation dictionary with full keys, ready for validate_evaluation
+    """
+    return {
+        full: expand(compact[key], criteria, requirements)
+        for key, (full, expand) in _EXPANDERS.items()
+        if key in compact
+    }
+
+
+def expand_field(
+    path: Tuple[Union[str, int], ...], value: Any, criteria: List[str], requirements: List[str]
+) -> Optional[Tuple[Tuple[Union[str, int], ...], Any]]:
+    """
+    Translate one streamed compact field into its full path and value.
+
+    Args:
+        path: Path reported by JsonStreamParser.feed
+        value: Value at that path
+        criteria: Criterion names, in the order they were numbered in the prompt
+        requirements: Mandatory requirements, in the order they were numbered
+
+    Returns:
+        (path, value) in the full layout, or None for unknown fields
+    """
+    if not path or path[0] not in _EXPANDERS:
+        return None
+    full, expand = _EXPANDERS[path[0]]
+    if len(path) == 1:
+        return (full,), expand(value, criteria, requirements)
+    if path[0] == "cat" and path[1] in CATEGORY_KEYS:
+        return (full, CATEGORY_KEYS[path[1]]), _expand_category(value)
+    if path[0] == "cr" and isinstance(path[1], int):
+        return (full, path[1]), _expand_criterion(value, criteria)
+    if path[0] == "mr" and isinstance(path[1], int):
+        return (full, path[1]), _expand_requirement(value, requirements)
+    return None
@@ -0,0 +1,122 @@
+"""Local re-scoring of supplier evaluations from their criterion scores and the current weights."""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from utils.schemas import CATEGORIES
+
+
+def as_score(value: Any) -> float:
+    """A score or weight as a float; missing or malformed values count as 0."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def criterion_matrix(
+    evaluations: List[Dict[str, Any]], criteria: List[Dict[str, Any]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Arrange every supplier's criterion scores as a matrix.
+
+    Args:
+        evaluations: Supplier evaluations with criterion_scores
+        criteria: Evaluation criteria, in column order
+
+    Returns:
+        (scores, present): suppliers x criteria arrays of scores and of
+        whether the supplier has a score for that criterion
+    """
+    columns = {str(c.get("criterion", "")).strip().lower(): j for j, c in enumerate(criteria)}
+    scores = np.zeros((len(evaluations), len(criteria)), dtype=np.float64)
+    present = np.zeros_like(scores, dtype=bool)
+    for i, evaluation in enumerate(evaluations):
+        for item in evaluation.get("criterion_scores", []) or []:
+            j = columns.get(str(item.get("criterion", "")).strip().lower())
+            if j is not None:
+                scores[i, j] = as_score(item.get("score"))
+                present[i, j] = True
+    return scores, present
+
+
+def _weighted(scores: np.ndarray, present: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted averages for one or more weight vectors, renormalised over the scores each supplier has.
+
+    Args:
+        scores: suppliers x criteria scores
+        present: suppliers x criteria mask of available scores
+        weights: criteria x k weight vectors
+
+    Returns:
+        (averages, defined): suppliers x k averages, and where any weight applied
+    """
+    totals = np.where(present, scores, 0.0) @ weights
+    weight_sums = present.astype(np.float64) @ weights
+    defined = weight_sums > 0
+    return np.divide(totals, weight_sums, out=np.zeros_like(totals), where=defined), defined
+
+
+def overall_scores(evaluations: List[Dict[str, Any]], criteria: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Weighted overall score of each supplier under the given criterion weights.
+
+    Criteria a supplier has no score for are left out and the remaining
+    weights renormalised; suppliers with no weighted criterion scores keep
+    their reported overall score.
+
+    Args:
+        evaluations: Supplier evaluations with criterion_scores
+        criteria: Criteria with weight_percentage
+
+    Returns:
+        One score per supplier
+    """
+    scores, present = criterion_matrix(evaluations, criteria)
+    weights = np.array([max(as_score(c.get("weight_percentage")), 0.0) for c in criteria], dtype=np.float64)
+    averages, defined = _weighted(scores, present, weights[:, None])
+    reported = np.array([as_score(e.get("overall_score")) for e in evaluations], dtype=np.float64)
+    return np.where(defined[:, 0], averages[:, 0], reported)
+
+
+def rescore_evaluations(evaluations: List[Dict[str, Any]], criteria: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Recompute overall and category scores from criterion scores and the current weights.
+
+    The overall score is the weight vector applied to the supplier x
+    criterion score matrix; each category score uses the weights of that
+    category's criteria only. Scores that cannot be computed (no scored,
+    weighted criteria) keep the value from the evaluation. The stored
+    evaluations are not modified.
+
+    Args:
+        evaluations: Supplier evaluations with criterion_scores
+        criteria: Current evaluation criteria with weight_percentage and category
+
+    Returns:
+        Copies of the evaluations with overall_score and category scores updated
+    """
+    if not evaluations or not criteria:
+        return list(evaluations)
+
+    scores, present = criterion_matrix(evaluations, criteria)
+    weights = np.array([max(as_score(c.get("weight_percentage")), 0.0) for c in criteria], dtype=np.float64)
+    categories = np.array([str(c.get("category", "")) for c in criteria])
+    # Column 0 is the overall weighting, then one masked copy per category
+    weight_matrix = np.column_stack([weights] + [weights * (categories == name) for name in CATEGORIES])
+    averages, defined = _weighted(scores, present, weight_matrix)
+
+    rescored = []
+    for i, evaluation in enumerate(evaluations):
+        updated = dict(evaluation)
+        if defined[i, 0]:
+            updated["overall_score"] = round(float(averages[i, 0]), 1)
+        category_scores = dict(evaluation.get("category_scores", {}) or {})
+        for k, name in enumerate(CATEGORIES, 1):
+            if defined[i, k]:
+                category_scores[name] = {**(category_scores.get(name) or {}), "score": round(float(averages[i, k]), 1)}
+        updated["category_scores"] = category_scores
+        rescored.append(updated)
+    return rescored
@@ -1,5 +1,6 @@
+import hashlib
 import streamlit as st
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 
 def init_session_state():
@@ -14,11 +15,32 @@ def init_session_state():
         st.session_state.api_key = None
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+    if "chat_summary" not in st.session_state:
+        st.session_state.chat_summary = ""
+        # Leading chat_history messages covered by the summary
+        st.session_state.chat_summarized = 0
+        # Summarized messages removed from chat_history altogether
+        st.session_state.chat_trimmed = 0
+        st.session_state.chat_summary_job = None
+    if "upload_fingerprints" not in st.session_state:
+        st.session_state.upload_fingerprints = {}
+    if "tender_uploader_round" not in st.session_state:
+        # Part of the tender uploader's key; bumped to clear it when the sample tender replaces the upload
+        st.session_state.tender_uploader_round = 0
+    if "bid_evaluation_cache" not in st.session_state:
+        st.session_state.bid_evaluation_cache = {}
+    if "batches_to_collect" not in st.session_state:
+        # Batch IDs whose results load as soon as a rerun finds the batch ended
+        st.session_state.batches_to_collect = []
 
 
 def set_tender_data(data: Dict[str, Any]):
     """Store tender data in session state."""
     st.session_state.tender_data = data
+    # Bid evaluations and weight sliders belong to the previous tender
+    st.session_state.bid_evaluation_cache = {}
+    for key in [k for k in st.session_state.keys() if str(k).startswith("weight_")]:
+        del st.session_state[key]
 
 
 def get_tender_data() -> Dict[str, Any]:
@@ -56,7 +78,46 @@ def clear_all_data():
     st.session_state.tender_data = None
     st.session_state.evaluation_criteria = []
     st.session_state.supplier_evaluations = []
-    st.session_state.chat_history = []
+    clear_chat_history()
+    st.session_state.upload_fingerprints = {}
+    st.session_state.bid_evaluation_cache = {}
+
+
+def file_fingerprint(file_name: str, file_content: bytes) -> str:
+    """Identify an uploaded file by name, size and content hash."""
+    digest = hashlib.sha256(file_content).hexdigest()
+    return f"{file_name}:{len(file_content)}:{digest}"
+
+
+def is_new_upload(slot: str, fingerprint: str) -> bool:
+    """Check whether an upload differs from the one last processed in this slot."""
+    return st.session_state.upload_fingerprints.get(slot) != fingerprint
+
+
+def remember_upload(slot: str, fingerprint: str):
+    """Record the upload that was last processed in this slot."""
+    st.session_state.upload_fingerprints[slot] = fingerprint
+
+
+def get_cached_bid_evaluation(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Retrieve the evaluation of a previously processed bid file."""
+    return st.session_state.bid_evaluation_cache.get(fingerprint)
+
+
+def cache_bid_evaluation(fingerprint: str, evaluation: Dict[str, Any]):
+    """Remember the evaluation of a bid file for the current tender."""
+    st.session_state.bid_evaluation_cache[fingerprint] = evaluation
+
+
+def get_batches_to_collect() -> List[str]:
+    """Retrieve the batches whose results should be loaded once they end."""
+    return st.session_state.batches_to_collect
+
+
+def set_batch_to_collect(batch_id: str, collect: bool = True):
+    """Mark (or unmark) a batch for loading its results once it ends."""
+    batches = [b for b in st.session_state.batches_to_collect if b != batch_id]
+    st.session_state.batches_to_collect = batches + [batch_id] if collect else batches
 
 
 def add_chat_message(role: str, content: str):
@@ -69,6 +130,15 @@ def get_chat_history() -> List[Dict[str, str]]:
     return st.session_state.chat_history
 
 
+def clear_chat_history():
+    """Clear chat history and its running summary; a summary still in progress is discarded."""
+    st.session_state.chat_history = []
+    st.session_state.chat_summary = ""
+    st.session_state.chat_summarized = 0
+    st.session_state.chat_trimmed = 0
+    st.session_state.chat_summary_job = None
+
+
 def set_api_key(api_key: str):
     """Store API key in session state."""
     st.session_state.api_key = api_key
@@ -0,0 +1,270 @@
+"""Prompt-size reduction for extracted document text before it is sent to Claude."""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+# Separator placed between pages of prepared text
+PAGE_BREAK = "\f"
+
+# A line seen at the top or bottom of this share of pages is a running header/footer
+REPEAT_PAGE_RATIO = 0.5
+# ...but only once a document has at least this many pages
+MIN_REPEAT_PAGES = 3
+# Number of non-empty lines at each end of a page treated as header/footer zone
+EDGE_LINES = 3
+# Lines up to this many words have their digits masked before counting
+MAX_MASKED_WORDS = 8
+
+# First line of a page that starts a new section, e.g. "4.2 Methodology", "SECTION 5", "Appendix B"
+_SECTION_HEADING = re.compile(
+    r"^\s*(\d+(\.\d+)*\.?\s+[A-Z]|(section|part|chapter|appendix|annex|schedule)\s+[\dA-Z]+\b)",
+    re.IGNORECASE,
+)
+
+# Notices that are boilerplate in the header/footer zone; elsewhere they may be content
+_EDGE_BOILERPLATE_PATTERNS = [
+    re.compile(r"^\s*(©|\(c\)|copyright\b).*$", re.IGNORECASE),
+    re.compile(r"^.*\ball rights reserved\b.*$", re.IGNORECASE),
+]
+
+# Whole lines that carry no evaluative content wherever they appear
+_BOILERPLATE_LINE_PATTERNS = [
+    re.compile(r"^\s*(strictly\s+)?(private\s+(and|&)\s+)?confidential\s*$", re.IGNORECASE),
+    re.compile(r"^\s*confidential(ity)?\s+(notice|statement|disclaimer)\b.*$", re.IGNORECASE),
+    re.compile(r"^\s*this (document|proposal|submission|e-?mail) (is|and any attachments are) (strictly )?(confidential|proprietary)\b.*$", re.IGNORECASE),
+    re.compile(r"^\s*(printed|uncontrolled) cop(y|ies) (is|are) (uncontrolled|for reference only)\b.*$", re.IGNORECASE),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Claude prompts (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _normalize_line(line: str) -> str:
+    """
+    Normalise a line for repetition counting.
+
+    Digits are masked in short lines so running footers such as
+    "Proposal | Page 3 of 40" match across pages; longer lines keep their
+    numbers so content that differs only in figures is never merged.
+    """
+    words = line.lower().split()
+    normalized = " ".join(words)
+    if len(words) <= MAX_MASKED_WORDS:
+        normalized = re.sub(r"\d+", "#", normalized)
+    return normalized
+
+
+# A page number line such as "12", "- 12 -", "Page 12", "12 of 40" or "12/40". It is
+# only taken for a page number in the header/footer zone and when it runs in step
+# with the page index; anywhere else such a line is usually a table cell value
+# ("24/7", "1/2").
+_PAGE_NUMBER_LINE = re.compile(
+    r"^\s*((page|pg\.?)\s*)?[-–—]?\s*(?P<number>\d{1,4})\s*[-–—]?\s*((of|/)\s*\d{1,4}\s*)?$",
+    re.IGNORECASE,
+)
+
+
+def _is_boilerplate_line(line: str, at_edge: bool) -> bool:
+    """Check a line against the known boilerplate patterns, including edge-only ones in the header/footer zone."""
+    patterns = _BOILERPLATE_LINE_PATTERNS + _EDGE_BOILERPLATE_PATTERNS if at_edge else _BOILERPLATE_LINE_PATTERNS
+    return any(pattern.match(line) for pattern in patterns)
+
+
+def _edge_indices(lines: List[str]) -> List[int]:
+    """Return the indices of the non-empty lines in the header and footer zones of a page."""
+    content = [idx for idx, line in enumerate(lines) if line.strip()]
+    # On short pages only the first and last lines can be header/footer
+    edge = EDGE_LINES if len(content) > 4 * EDGE_LINES else 1
+    return sorted(set(content[:edge] + content[-edge:]))
+
+
+def _page_number_offset(page_lines: List[List[str]]) -> int:
+    """
+    Find how printed page numbers relate to page positions (e.g. -1 after an unnumbered cover).
+
+    Returns the offset shared by edge page-number lines on enough pages, or 0.
+    """
+    offsets = Counter()
+    for page_number, lines in enumerate(page_lines, 1):
+        for idx in _edge_indices(lines):
+            match = _PAGE_NUMBER_LINE.match(lines[idx])
+            if match:
+                offsets[int(match.group("number")) - page_number] += 1
+    if len(page_lines) < MIN_REPEAT_PAGES or not offsets:
+        return 0
+    offset, count = offsets.most_common(1)[0]
+    return offset if count >= max(MIN_REPEAT_PAGES, math.ceil(REPEAT_PAGE_RATIO * len(page_lines))) else 0
+
+
+def strip_boilerplate(pages: List[str]) -> Tuple[str, Dict[str, int]]:
+    """
+    Remove running headers/footers, boilerplate notices and duplicate pages.
+
+    Running headers and footers are found by counting, per page, the set of
+    lines in the top and bottom EDGE_LINES lines; any such line present on at
+    least REPEAT_PAGE_RATIO of the pages is dropped from those zones, as are
+    page numbers that run in step with the page index and copyright notices.
+    Confidentiality notices are dropped anywhere, and pages whose remaining
+    content repeats an earlier page (e.g. re-attached standard T&Cs) are
+    dropped whole.
+
+    Args:
+        pages: Text of each page, in order
+
+    Returns:
+        Tuple of (prepared text with pages joined by PAGE_BREAK, report dict
+        with original_tokens, prepared_tokens, saved_tokens, lines_removed
+        and pages_removed)
+    """
+    page_lines = [page.splitlines() for page in pages]
+
+    repeated = set()
+    if len(pages) >= MIN_REPEAT_PAGES:
+        counts = Counter()
+        for lines in page_lines:
+            counts.update({_normalize_line(lines[idx]) for idx in _edge_indices(lines)})
+        threshold = max(MIN_REPEAT_PAGES, math.ceil(REPEAT_PAGE_RATIO * len(pages)))
+        repeated = {line for line, count in counts.items() if count >= threshold and len(line) > 2}
+
+    page_offset = _page_number_offset(page_lines)
+
+    lines_removed = 0
+    pages_removed = 0
+    seen_pages = set()
+    prepared_pages = []
+    for page_number, lines in enumerate(page_lines, 1):
+        edges = set(_edge_indices(lines))
+        kept = []
+        for idx, line in enumerate(lines):
+            at_edge = idx in edges
+            number = _PAGE_NUMBER_LINE.match(line)
+            is_page_number = number is not None and int(number.group("number")) == page_number + page_offset
+            running = at_edge and (_normalize_line(line) in repeated or is_page_number)
+            if running or _is_boilerplate_line(line, at_edge):
+                lines_removed += 1
+                continue
+            kept.append(line)
+
+        page_text = re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+        if not page_text:
+            prepared_pages.append("")
+            continue
+
+        digest = hashlib.sha1(" ".join(page_text.lower().split()).encode("utf-8")).hexdigest()
+        if digest in seen_pages:
+            pages_removed += 1
+            lines_removed += len(kept)
+            # Keep the page's place so later page numbers stay aligned
+            prepared_pages.append("")
+            continue
+        seen_pages.add(digest)
+        prepared_pages.append(page_text)
+
+    prepared_text = PAGE_BREAK.join(prepared_pages)
+    original_tokens = sum(estimate_tokens(page) for page in pages)
+    prepared_tokens = estimate_tokens(prepared_text)
+    report = {
+        "original_tokens": original_tokens,
+        "prepared_tokens": prepared_tokens,
+        "saved_tokens": max(0, original_tokens - prepared_tokens),
+        "lines_removed": lines_removed,
+        "pages_removed": pages_removed,
+    }
+    return prepared_text, report
+
+
+def _is_section_start(page: str) -> bool:
+    """Check whether a page opens with what looks like a section heading."""
+    for line in page.splitlines():
+        if line.strip():
+            return bool(_SECTION_HEADING.match(line))
+    return False
+
+
+def split_oversized_page(page: str, max_tokens: int) -> List[str]:
+    """
+    Split text that is over budget at paragraph, then line, boundaries.
+
+    Used for single pages too large for one chunk, and for retrieval passages.
+
+    Args:
+        page: Text of one page (or any block of text)
+        max_tokens: Estimated token budget of each piece
+
+    Returns:
+        Pieces of the text, in order, each within budget where a break allows
+    """
+    pieces: List[str] = []
+    current = ""
+    for paragraph in re.split(r"(\n\s*\n)", page):
+        if current and estimate_tokens(current + paragraph) > max_tokens:
+            pieces.append(current)
+            current = ""
+        while estimate_tokens(paragraph) > max_tokens:
+            # No paragraph breaks to use: cut on a line boundary, or hard-cut as a last resort
+            cut = paragraph.rfind("\n", 0, max_tokens * 4) + 1 or max_tokens * 4
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:]
+        current += paragraph
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[Dict[str, Any]]:
+    """
+    Split prepared document text into chunks of whole pages, preferring section boundaries.
+
+    Pages (separated by PAGE_BREAK) are grouped in order until the next page
+    would exceed max_tokens. Once a chunk is half full, a page starting with
+    a section heading begins a new chunk, so sections stay together where
+    possible. A page larger than max_tokens is split by paragraphs. Each
+    chunk's text marks where its pages start with "[Page N]".
+
+    Args:
+        text: Document text with pages joined by PAGE_BREAK
+        max_tokens: Estimated token budget per chunk
+
+    Returns:
+        List of dicts with text, first_page and last_page
+    """
+    chunks: List[Dict[str, Any]] = []
+    current: List[str] = []
+    current_tokens = 0
+    first_page = 1
+
+    def flush(last_page: int):
+        nonlocal current, current_tokens
+        if current:
+            chunks.append({"text": "\n\n".join(current), "first_page": first_page, "last_page": last_page})
+        current, current_tokens = [], 0
+
+    for page_number, page in enumerate(text.split(PAGE_BREAK), 1):
+        if not page.strip():
+            continue
+        labelled = f"[Page {page_number}]\n{page}"
+        tokens = estimate_tokens(labelled)
+
+        if tokens > max_tokens:
+            flush(page_number - 1)
+            for piece in split_oversized_page(page, max_tokens):
+                chunks.append({"text": f"[Page {page_number}]\n{piece}", "first_page": page_number, "last_page": page_number})
+            first_page = page_number + 1
+            continue
+
+        over_budget = current_tokens + tokens > max_tokens
+        section_break = current_tokens >= max_tokens // 2 and _is_section_start(page)
+        if current and (over_budget or section_break):
+            flush(page_number - 1)
+        if not current:
+            first_page = page_number
+        current.append(labelled)
+        current_tokens += tokens
+
+    flush(len(text.split(PAGE_BREAK)))
+    return chunks
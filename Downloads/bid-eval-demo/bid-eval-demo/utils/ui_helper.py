@@ -1,6 +1,8 @@
 """UI helper functions for Airo Bid Evaluation Platform."""
 
+import time
 from pathlib import Path
+from typing import Dict, List
 
 import streamlit as st
 from utils.state import (
@@ -10,6 +12,9 @@ from utils.state import (
     get_tender_data,
     get_supplier_evaluations,
 )
+from utils.ai_engine import get_llm_cache_stats, get_retry_stats, get_usage_stats
+from utils.answer_cache import answer_cache
+from utils.pdf_parser import get_page_count, iter_file_pages
 
 # Logo path relative to this file so it works locally and on Streamlit Cloud
 _LOGO_PATH = Path(__file__).resolve().parent.parent / "assets" / "AiroLogo.png"
@@ -106,6 +111,22 @@ def setup_sidebar():
         else:
             st.info("○ No bids evaluated")
 
+        cache_stats = get_llm_cache_stats()
+        if cache_stats["enabled"]:
+            st.caption(f"LLM cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        usage = get_usage_stats()
+        if usage["cache_read_input_tokens"] or usage["cache_creation_input_tokens"]:
+            st.caption(
+                f"Prompt cache: {usage['cache_read_input_tokens']:,} tokens read / "
+                f"{usage['cache_creation_input_tokens']:,} written"
+            )
+        answer_stats = answer_cache.stats()
+        if answer_stats["hits"]:
+            st.caption(f"Answer cache: {answer_stats['hits']} repeated questions answered instantly")
+        retry_stats = get_retry_stats()
+        if retry_stats["retries"]:
+            st.caption(f"API retries: {retry_stats['retries']} ({retry_stats['gave_up']} gave up)")
+
         st.markdown("---")
 
         # Reset Button
@@ -124,3 +145,53 @@ def setup_sidebar():
         )
 
         return page
+
+
+def read_document(file_name: str, file_content: bytes, preview_pages: int = 2) -> List[str]:
+    """
+    Extract an uploaded document page by page with live feedback.
+
+    Shows a page counter while decoding and a preview of the first pages as
+    soon as they are available.
+
+    Args:
+        file_name: Uploaded file name (its extension selects the parser)
+        file_content: Raw bytes of the file
+        preview_pages: Number of leading pages to show in the preview
+
+    Returns:
+        Extracted text of each page
+    """
+    file_extension = file_name.split(".")[-1].lower()
+    page_count = get_page_count(file_content, file_extension)
+    counter = st.empty()
+    preview = st.expander(f"👀 Preview: {file_name}", expanded=False)
+
+    pages = []
+    last_update = 0.0
+    for page_number, text in iter_file_pages(file_content, file_extension):
+        pages.append(text)
+        if page_number <= preview_pages:
+            with preview:
+                st.caption(f"Page {page_number}")
+                st.text(text[:3000])
+        # Throttle counter updates so long documents don't flood the browser
+        now = time.monotonic()
+        if now - last_update > 0.1 or page_number == page_count:
+            total = f" of {page_count}" if page_count else ""
+            counter.caption(f"Decoding {file_name}: page {page_number}{total}")
+            last_update = now
+
+    counter.empty()
+    return pages
+
+
+def show_prep_report(file_name: str, report: Dict[str, int]):
+    """Show how many prompt tokens boilerplate stripping saved for a document."""
+    if report["original_tokens"]:
+        saved_pct = 100 * report["saved_tokens"] / report["original_tokens"]
+        st.caption(
+            f"✂️ {file_name}: removed {report['lines_removed']} boilerplate line(s) and "
+            f"{report['pages_removed']} duplicate page(s), saving ~{report['saved_tokens']:,} "
+            f"tokens ({saved_pct:.0f}%)"
+        )
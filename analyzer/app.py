@@ -5,6 +5,7 @@ import os
 from dotenv import load_dotenv
 from fpdf import FPDF
 import io
+import hashlib
 
 load_dotenv()
 
@@ -13,18 +14,57 @@ st.write('Upload an RBI PDF document to analyze.')
 
 openai_api_key = os.getenv('OPENAI_API_KEY')
 
+# Connection pool, timeout and retry settings for the shared OpenAI client
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '20'))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '10'))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '120'))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '10'))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+# The SDK's own pool limits type; its HTTP library differs between openai releases
+OpenAILimits = type(openai.DEFAULT_CONNECTION_LIMITS)
+
+
+@st.cache_resource
+def get_openai_client(api_key, base_url=None):
+    """One pooled OpenAI client per API key and endpoint, shared across reruns and sessions."""
+    limits = OpenAILimits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    )
+    timeout = openai.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout,
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=openai.DefaultHttpxClient(limits=limits, timeout=timeout),
+    )
+
+
 uploaded_file = st.file_uploader('Choose a PDF file', type='pdf')
 
 full_text = ''
 tables_content = []
 
 if uploaded_file and openai_api_key:
-    with pdfplumber.open(uploaded_file) as pdf:
-        for page in pdf.pages:
-            full_text += page.extract_text() or ''
-            tables = page.extract_tables()
-            for table in tables:
-                tables_content.append(table)
+    # Parse the PDF only when a different file arrives; button clicks rerun the script
+    file_bytes = uploaded_file.getvalue()
+    fingerprint = f"{uploaded_file.name}:{len(file_bytes)}:{hashlib.sha256(file_bytes).hexdigest()}"
+    if st.session_state.get('upload_fingerprint') != fingerprint:
+        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+            for page in pdf.pages:
+                full_text += page.extract_text() or ''
+                tables = page.extract_tables()
+                for table in tables:
+                    tables_content.append(table)
+        st.session_state.upload_fingerprint = fingerprint
+        st.session_state.full_text = full_text
+        st.session_state.tables_content = tables_content
+    else:
+        full_text = st.session_state.full_text
+        tables_content = st.session_state.tables_content
 
     # Filter out tables with signature/closing phrases
     signature_phrases = [
@@ -69,7 +109,7 @@ Document text:
 Please provide ONLY the extracted information in a clear, structured format. Do NOT include any introductory or summary lines.
 """
         try:
-            client = openai.OpenAI(api_key=openai_api_key)
+            client = get_openai_client(openai_api_key, os.getenv('OPENAI_BASE_URL'))
             response = client.chat.completions.create(
                 model='gpt-4o',
                 messages=[{"role": "user", "content": prompt}],